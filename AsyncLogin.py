@@ -0,0 +1,45 @@
+import asyncio
+import allure
+
+# pytest-asyncio is not a dependency: each test drives its own event loop with asyncio.run()
+
+
+@allure.feature('Authentication')
+@allure.story('Concurrent Login')
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title('Verify Fileroom and SCD logins run concurrently from one worker')
+@allure.description('Logs in to Fileroom and SCD Dashboard in two contexts of one browser at the same time using the async Playwright API; PingID is driven in an executor')
+@allure.tag('authentication', 'async', 'fileroom', 'scd')
+def test_concurrent_logins(sso_credentials, sso_urls, shared_mfa_provider, browser_name, browser_type_launch_args,
+                           attachments):
+    """Fileroom and SCD logins share one browser and one event loop"""
+    # playwright.async_api is only loaded when the test runs, not at collection
+    from playwright.async_api import expect
+    from async_sso_pages import AsyncFileroomLoginPage, AsyncSCDLoginPage, async_browser, login_concurrently
+    fileroom_urls = sso_urls.get("fileroom", {})
+    scd_urls = sso_urls.get("scd", {})
+
+    async def scenario():
+        async with async_browser(browser_name, **browser_type_launch_args) as browser:
+            sessions = await login_concurrently(browser, [
+                {"page_class": AsyncFileroomLoginPage, "credentials": sso_credentials, "domain": "Automation-01",
+                 "url": fileroom_urls.get("url"), "mfa_provider": shared_mfa_provider},
+                {"page_class": AsyncSCDLoginPage, "credentials": sso_credentials, "location": "Test",
+                 "url": scd_urls.get("url"), "mfa_provider": shared_mfa_provider},
+            ])
+            try:
+                (_, fileroom_page), (_, scd_page) = sessions
+                await expect(fileroom_page).to_have_url(
+                    fileroom_urls.get("listing_url", AsyncFileroomLoginPage.listing_url))
+                # As in SCDLogin.py: the dashboard loads and shows its navigation
+                scd_home = scd_urls.get("home_url", AsyncSCDLoginPage.home_url)
+                await scd_page.goto(scd_home)
+                await expect(scd_page).to_have_url(scd_home)
+                await expect(scd_page.get_by_role("button", name="Toggle navigation")).to_be_visible()
+                return fileroom_page.url, scd_page.url
+            finally:
+                for context, _ in sessions:
+                    await context.close()
+
+    fileroom_url, scd_url = asyncio.run(scenario())
+    attachments.text("Final URLs", f"{fileroom_url}\n{scd_url}")
@@ -1,9 +1,23 @@
-import time
-from pywinauto.application import Application
-from pywinauto import Desktop
-import subprocess
+import operator
 import allure
 import pytest
+from calculator_harness import BUTTON_IDS
+from instrumentation import event, span
+
+
+def _expected(a, op, b):
+    return {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv}[op](a, b)
+
+
+# Every single-digit a <op> b combination (division by zero checked separately)
+CALCULATOR_CASES = [
+    (f"{a}{op}{b}", _expected(a, op, b))
+    for op in "+-*/"
+    for a in range(10)
+    for b in range(10)
+    if not (op == "/" and b == 0)
+]
+
 
 @allure.feature('Calculator Application')
 @allure.story('Basic Arithmetic Operations')
@@ -11,112 +25,79 @@ import pytest
 @allure.title('Verify Calculator Addition: 9 + 1 = 10')
 @allure.description('Test validates basic addition operation in Windows Calculator using pywinauto UI automation')
 @allure.tag('calculator', 'desktop-app', 'arithmetic')
-def test_calculator_addition():
+def test_calculator_addition(calculator, attachments):
     """Test calculator addition operation using pywinauto"""
 
-    with allure.step("Launch Calculator application"):
-        print("Launching Calculator...")
-        subprocess.Popen("calc.exe")
-        time.sleep(3)
-        allure.attach("calc.exe", name="Application", attachment_type=allure.attachment_type.TEXT)
-
-    with allure.step("Verify Calculator launched successfully"):
+    with span("Verify Calculator launched successfully"):
         try:
-            desktop = Desktop(backend="uia")
-            calc_window = desktop.window(title="Calculator", class_name="ApplicationFrameWindow")
-            calc_window.set_focus()
-            print("Calculator launched successfully!")
-            print(f"Window Title: {calc_window.window_text()}")
-            allure.attach(f"Window Title: {calc_window.window_text()}",
-                         name="Calculator Window Info",
-                         attachment_type=allure.attachment_type.TEXT)
-            time.sleep(1)
-
+            calculator.clear()
+            event(f"Window Title: {calculator.window.window_text()}")
+            attachments.text("Calculator Window Info", f"Window Title: {calculator.window.window_text()}")
         except Exception as e:
-            allure.attach(str(e), name="Launch Error", attachment_type=allure.attachment_type.TEXT)
-            print(f"\nError occurred during launch: {str(e)}")
+            attachments.text("Launch Error", str(e))
+            event(f"Error occurred during launch: {str(e)}", level="error")
             pytest.fail(f"Failed to launch Calculator: {str(e)}")
 
-    with allure.step("Click on number 9"):
-        try:
-            print("\nClicking on Nine...")
-            nine_button = calc_window.child_window(auto_id="num9Button", control_type="Button")
-            nine_button.click()
-            time.sleep(0.5)
-        except Exception as e:
-            allure.attach(str(e), name="Click Error", attachment_type=allure.attachment_type.TEXT)
-            pytest.fail(f"Failed to click number 9: {str(e)}")
-
-    with allure.step("Click on Plus operator"):
-        try:
-            print("Clicking on Plus...")
-            plus_button = calc_window.child_window(auto_id="plusButton", control_type="Button")
-            plus_button.click()
-            time.sleep(0.5)
-        except Exception as e:
-            allure.attach(str(e), name="Click Error", attachment_type=allure.attachment_type.TEXT)
-            pytest.fail(f"Failed to click Plus operator: {str(e)}")
-
-    with allure.step("Click on number 1"):
-        try:
-            print("Clicking on One...")
-            one_button = calc_window.child_window(auto_id="num1Button", control_type="Button")
-            one_button.click()
-            time.sleep(0.5)
-        except Exception as e:
-            allure.attach(str(e), name="Click Error", attachment_type=allure.attachment_type.TEXT)
-            pytest.fail(f"Failed to click number 1: {str(e)}")
-
-    with allure.step("Click on Equals button"):
-        try:
-            print("Clicking on Equals...")
-            equals_button = calc_window.child_window(auto_id="equalButton", control_type="Button")
-            equals_button.click()
-            time.sleep(0.5)
-        except Exception as e:
-            allure.attach(str(e), name="Click Error", attachment_type=allure.attachment_type.TEXT)
-            pytest.fail(f"Failed to click Equals: {str(e)}")
+    for label, key in (("number 9", "9"), ("Plus operator", "+"), ("number 1", "1"), ("Equals button", "=")):
+        with span(f"Click on {label}"):
+            try:
+                event(f"Clicking on {label}...")
+                calculator.press(BUTTON_IDS[key])
+            except Exception as e:
+                attachments.text("Click Error", str(e))
+                pytest.fail(f"Failed to click {label}: {str(e)}")
 
-    with allure.step("Verify calculation result equals 10"):
+    with span("Verify calculation result equals 10"):
         try:
-            print("\nGetting result...")
-            result_display = calc_window.child_window(auto_id="CalculatorResults", control_type="Text")
-            result_text = result_display.window_text()
-            print(f"\nCalculation Result: {result_text}")
-            allure.attach(result_text,
-                         name="Calculation Result",
-                         attachment_type=allure.attachment_type.TEXT)
+            event("Getting result...")
+            # Poll the display: it may still show the previous value right after the click
+            result = calculator.read_result(expected=10, description="9 + 1 = 10")
+            result_text = calculator.display_text()
+            event(f"Calculation Result: {result_text}")
+            attachments.text("Calculation Result", result_text)
 
-            # Assert the result contains 10
-            assert "10" in result_text, f"Expected result to contain '10', but got: {result_text}"
+            assert result == 10, f"Expected result 10, but got: {result_text}"
 
         except AssertionError as e:
-            allure.attach(str(e), name="Assertion Error", attachment_type=allure.attachment_type.TEXT)
+            attachments.text("Assertion Error", str(e))
             raise
         except Exception as e:
-            allure.attach(str(e), name="Verification Error", attachment_type=allure.attachment_type.TEXT)
-            print(f"\nError occurred: {str(e)}")
-            print("\nInspecting Calculator structure for debugging...")
+            attachments.text("Verification Error", str(e))
+            event(f"Error occurred: {str(e)}", level="error")
+            event("Inspecting Calculator structure for debugging...")
 
             try:
-                desktop = Desktop(backend="uia")
-                calc_window = desktop.window(title="Calculator")
-                print("\nPrinting Calculator control identifiers...")
-                calc_window.print_control_identifiers(depth=5, filename="calculator_structure.txt")
-                print("Structure saved to calculator_structure.txt")
-                allure.attach.file("calculator_structure.txt",
-                                  name="Calculator Structure",
-                                  attachment_type=allure.attachment_type.TEXT)
+                import ui_snapshot
+                event("Capturing Calculator control tree...")
+                snapshot = ui_snapshot.capture(calculator.window, depth=5)
+                previous = ui_snapshot.load("calculator_structure.json")
+                ui_snapshot.save(snapshot, "calculator_structure.json")
+                event("Structure saved to calculator_structure.json")
+                attachments.file("calculator_structure.json", name="Calculator Structure",
+                                 attachment_type=allure.attachment_type.JSON)
+                if previous is not None:
+                    attachments.text("Calculator Structure Changes",
+                                     ui_snapshot.format_diff(ui_snapshot.diff(previous, snapshot)))
             except Exception as debug_error:
-                print(f"Debug error: {debug_error}")
+                event(f"Debug error: {debug_error}", level="error")
 
             pytest.fail(f"Failed to verify result: {str(e)}")
 
-    with allure.step("Close Calculator application"):
-        try:
-            print("\nClosing Calculator...")
-            calc_window.close()
-            print("\nTest completed successfully!")
-        except Exception as e:
-            print(f"Warning: Failed to close Calculator: {str(e)}")
-            # Don't fail the test if closing fails
\ No newline at end of file
+
+@allure.feature('Calculator Application')
+@allure.story('Basic Arithmetic Operations')
+@allure.severity(allure.severity_level.NORMAL)
+@allure.tag('calculator', 'desktop-app', 'arithmetic', 'data-driven')
+@pytest.mark.parametrize("expression, expected", CALCULATOR_CASES)
+def test_calculator_expression(calculator, expression, expected):
+    """Evaluate one expression in the shared Calculator window"""
+    result = calculator.evaluate(expression, expected)
+    assert result == pytest.approx(expected), f"{expression}: expected {expected}, got {result}"
+
+
+@allure.feature('Calculator Application')
+@allure.story('Basic Arithmetic Operations')
+@allure.tag('calculator', 'desktop-app', 'arithmetic')
+def test_calculator_divide_by_zero(calculator):
+    """Division by zero shows an error message instead of a number"""
+    assert calculator.evaluate("5/0", "Cannot divide by zero") == "Cannot divide by zero"
@@ -0,0 +1,217 @@
+"""
+Async SSO Login Page Objects
+asyncio variants of the sso_pages flows for playwright.async_api; the
+desktop MFA retrieval runs in an executor, so one worker process can log
+in to several browser contexts / apps concurrently
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import allure
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, async_playwright
+
+from instrumentation import span
+from retry import MFACodeRejected, MFACodeUnavailable
+from sso_pages import FileroomLoginPage, SCDLoginPage, SSOLoginPage
+
+
+class AsyncSSOLoginPage(SSOLoginPage):
+    """SSOLoginPage for an async Page; locators and timeouts are shared with the sync classes"""
+
+    async def open(self):
+        """Navigate to the application entry URL"""
+        await self.page.goto(self.url)
+        self.record("Initial URL", self.page.url)
+
+    async def check_remember_username(self):
+        await self.remember_username.check()
+
+    async def submit_identity(self, credentials):
+        """Continue to SSO and submit the email address"""
+        await self.continue_button.click()
+        await self.email_input.fill(credentials["email"])
+        self.record("Email Entered", credentials["email"])
+        await self.email_submit.click()
+
+    async def submit_credentials(self, credentials):
+        """Enter employee ID and password and press Sign On"""
+        await self.employee_id_input.fill(credentials["employee_id"])
+        self.record("Employee ID", credentials["employee_id"])
+        await self.password_input.fill(credentials["password"])
+        await self.check_remember_username()
+        await self.sign_on_button.click(force=True)
+
+    async def complete_mfa(self, mfa_provider):
+        """
+        Fetch a PingID code in an executor and submit it on the passcode page;
+        the event loop keeps driving other contexts meanwhile
+
+        Raises:
+            MFACodeUnavailable: If the provider does not return a code
+            MFACodeRejected: If the passcode page is still shown after submitting
+        """
+        loop = asyncio.get_running_loop()
+        if getattr(mfa_provider, "just_in_time", False):
+            await self.passcode_input.wait_for(state="visible")
+            mfa_code = await loop.run_in_executor(None, mfa_provider)
+        else:
+            pending_code = loop.run_in_executor(None, mfa_provider)
+            await self.passcode_input.wait_for(state="visible")
+            mfa_code = await pending_code
+        if not mfa_code:
+            raise MFACodeUnavailable("Failed to retrieve MFA code from PingID")
+        self.record("MFA Code Retrieved", mfa_code)
+
+        await self.passcode_input.fill(mfa_code)
+        await self.body.click()
+        await self.passcode_submit.click()
+        try:
+            await self.passcode_input.wait_for(state="hidden")
+        except PlaywrightTimeoutError as e:
+            raise MFACodeRejected("Passcode page still shown after submitting the MFA code") from e
+
+    async def run_step(self, step, profile, action, recover=None):
+        """run_step() for coroutine function actions; recover is a blocking callable run in an executor"""
+        name = f"{self.name}.{step}"
+
+        async def attempt():
+            with self.timeouts.track(self.page, name, profile):
+                return await action()
+
+        async def recover_async(error):
+            await asyncio.get_running_loop().run_in_executor(None, recover, error)
+
+        return await self.retries.run_async(name, attempt, recover=recover_async if recover else None)
+
+    async def after_mfa(self):
+        """App specific steps once the SSO round trip is complete"""
+
+    async def login(self, credentials, mfa_provider=None, post_mfa=None):
+        """
+        Run the full login flow
+
+        Args:
+            credentials: Dict with email, employee_id and password
+            mfa_provider: Blocking callable returning an MFA code (optional, defaults to an
+                          MFAPrefetch started here)
+            post_mfa: Coroutine function run after MFA instead of after_mfa() (optional)
+        """
+        prefetch = None
+        if mfa_provider is None:
+            from mfa_prefetch import MFAPrefetch
+            mfa_provider = prefetch = MFAPrefetch().start()
+
+        run = self.run_step
+        try:
+            with span("Open application and continue to SSO"):
+                await run("open", "navigation", self.open)
+                await run("submit_identity", "sso_redirect", lambda: self.submit_identity(credentials))
+
+            with span("Submit SSO credentials"):
+                await run("submit_credentials", "sso_redirect", lambda: self.submit_credentials(credentials))
+
+            with span("Handle PingID MFA authentication"):
+                await run("mfa", "mfa_wait", lambda: self.complete_mfa(mfa_provider),
+                          recover=lambda error: self.recover_mfa(mfa_provider, error))
+
+            with span("Complete application sign-in"):
+                await run("after_mfa", "navigation", post_mfa or self.after_mfa)
+        finally:
+            if prefetch is not None:
+                await asyncio.get_running_loop().run_in_executor(None, prefetch.close)
+            allure.attach("\n".join(self.details),
+                          name="Login Details",
+                          attachment_type=allure.attachment_type.TEXT)
+
+
+class AsyncFileroomLoginPage(AsyncSSOLoginPage, FileroomLoginPage):
+    """Fileroom production login with domain selection (async)"""
+
+    async def after_mfa(self):
+        """Select and submit the Fileroom domain"""
+        await self.domain_select.select_option(value=self.domain)
+        self.record("Selected Domain", self.domain)
+        await self.domain_submit.click()
+
+
+class AsyncSCDLoginPage(AsyncSSOLoginPage, SCDLoginPage):
+    """SCD Dashboard QAT login with location selection (async)"""
+
+    async def check_remember_username(self):
+        # Custom checkbox: the visible div has to be clicked
+        await self.remember_username.click()
+
+    async def after_mfa(self):
+        """Select and submit the SCD location"""
+        await self.location_dropdown.click()
+        await self.location_option.click()
+        self.record("Selected Location", self.location)
+        async with self.page.expect_navigation():
+            await self.location_submit.click()
+
+
+@asynccontextmanager
+async def async_browser(browser_name="chromium", **launch_args):
+    """Async counterpart of pytest-playwright's browser fixture"""
+    async with async_playwright() as p:
+        browser = await getattr(p, browser_name).launch(**launch_args)
+        try:
+            yield browser
+        finally:
+            await browser.close()
+
+
+async def login_in_new_context(browser, page_class, credentials, url=None, mfa_provider=None, **page_args):
+    """
+    Log in with a page object in a fresh context of `browser`
+
+    Args:
+        browser: Async Browser
+        page_class: AsyncSSOLoginPage subclass
+        credentials: Dict with email, employee_id and password
+        url: Entry URL overriding page_class.url (e.g. a stand-in server)
+        mfa_provider: Blocking callable returning an MFA code (optional)
+        page_args: Extra page object arguments (domain=..., location=..., timeouts=...)
+
+    Returns:
+        tuple: (context, page) of the authenticated session
+    """
+    context = await browser.new_context()
+    page = await context.new_page()
+    login_page = page_class(page, **page_args)
+    if url:
+        login_page.url = url
+    try:
+        await login_page.login(credentials, mfa_provider=mfa_provider)
+    except BaseException:
+        await context.close()
+        raise
+    return context, page
+
+
+async def login_concurrently(browser, logins):
+    """
+    Run several logins at once in one browser
+
+    Args:
+        browser: Async Browser
+        logins: Dicts of login_in_new_context keyword arguments
+
+    Returns:
+        list: (context, page) per login, in order
+
+    Raises:
+        The first login's error, once every login has finished and the
+        contexts of the successful ones are closed
+    """
+    results = await asyncio.gather(*(login_in_new_context(browser, **login) for login in logins),
+                                   return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        # Failed logins closed their own context
+        for result in results:
+            if not isinstance(result, BaseException):
+                await result[0].close()
+        raise errors[0]
+    return results
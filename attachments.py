@@ -0,0 +1,134 @@
+"""
+Allure Attachment Manager
+Buffers attachments in memory and flushes them once per test; heavy
+attachments (screenshots, control dumps) are only captured when the test
+fails, or for a configurable sample of passing tests, and are compressed
+and downscaled on a background thread
+"""
+
+import io
+import random
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+
+try:
+    from config import ATTACHMENT_CONFIG
+except ImportError:
+    ATTACHMENT_CONFIG = {}
+
+
+class AttachmentWarning(UserWarning):
+    """An attachment could not be processed and was written unprocessed"""
+
+
+# Shared by every test in the process: image work never runs on the test thread
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="attachments")
+
+
+def _downscale(image_bytes, max_width, jpeg_quality):
+    """Shrink a JPEG/PNG to max_width when Pillow is installed, else return it unchanged"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return image_bytes
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.width <= max_width:
+        return image_bytes
+    image.thumbnail((max_width, max_width * image.height // image.width))
+    output = io.BytesIO()
+    image.convert("RGB").save(output, format="JPEG", quality=jpeg_quality)
+    return output.getvalue()
+
+
+class AttachmentManager:
+    """Per-test attachment buffer"""
+
+    def __init__(self, sample_rate=None, jpeg_quality=None, max_width=None, rng=random.random):
+        """
+        Initialize the manager (arguments default to ATTACHMENT_CONFIG)
+
+        Args:
+            sample_rate: Fraction of passing tests that still keep heavy attachments
+            jpeg_quality: JPEG quality used for screenshots
+            max_width: Screenshots wider than this are downscaled (requires Pillow)
+            rng: Random source used for sampling
+        """
+        self.sample_rate = ATTACHMENT_CONFIG.get("success_sample_rate", 0.0) if sample_rate is None else sample_rate
+        self.jpeg_quality = jpeg_quality or ATTACHMENT_CONFIG.get("jpeg_quality", 60)
+        self.max_width = max_width or ATTACHMENT_CONFIG.get("max_width", 1280)
+        self.rng = rng
+        self.texts = []
+        self.deferred = []
+        self.ready = []
+
+    def text(self, name, body):
+        """Buffer a small text attachment (always written)"""
+        self.texts.append((name, str(body)))
+
+    def capture(self, name, capture, attachment_type, process=None):
+        """
+        Register a heavy attachment that is only captured if it will be kept
+
+        Args:
+            name: Attachment name
+            capture: Zero-argument callable returning the bytes (runs on the test thread)
+            attachment_type: allure.attachment_type of the result
+            process: Optional callable(bytes) -> bytes run on the background thread
+        """
+        self.deferred.append((name, capture, attachment_type, process))
+
+    def screenshot(self, page, name):
+        """Register a compressed screenshot of the page"""
+        self.capture(
+            name,
+            lambda: page.screenshot(type="jpeg", quality=self.jpeg_quality, scale="css"),
+            allure.attachment_type.JPG,
+            process=lambda data: _downscale(data, self.max_width, self.jpeg_quality),
+        )
+
+    def file(self, path, name, attachment_type=allure.attachment_type.TEXT):
+        """Register a file (e.g. a control dump) to attach if it will be kept"""
+        def _read():
+            with open(path, "rb") as f:
+                return f.read()
+        self.capture(name, _read, attachment_type)
+
+    def keep_heavy(self, failed):
+        """Decide whether heavy attachments are kept for this outcome"""
+        return failed or (self.sample_rate > 0 and self.rng() < self.sample_rate)
+
+    def resolve(self, failed):
+        """
+        Capture the deferred attachments if they will be kept; must run while
+        the page/app is still open (the conftest hook calls it right after the
+        test body finishes)
+        """
+        deferred, self.deferred = self.deferred, []
+        if not self.keep_heavy(failed):
+            return
+        for name, capture, attachment_type, process in deferred:
+            try:
+                data = capture()
+            except Exception as e:
+                self.text(f"{name} (capture failed)", str(e))
+                continue
+            future = _executor.submit(process, data) if process else None
+            self.ready.append((name, data, future, attachment_type))
+
+    def flush(self):
+        """Write every buffered attachment to the Allure results"""
+        if self.texts:
+            allure.attach("\n\n".join(f"[{name}]\n{body}" for name, body in self.texts),
+                          name="Test Details",
+                          attachment_type=allure.attachment_type.TEXT)
+        for name, data, future, attachment_type in self.ready:
+            if future is not None:
+                try:
+                    data = future.result()
+                except Exception as e:
+                    # Shown in pytest's warnings summary; the unprocessed data is still attached
+                    warnings.warn(f"Attachment processing failed for {name}: {str(e)}", AttachmentWarning)
+            allure.attach(data, name=name, attachment_type=attachment_type)
+        self.texts, self.ready = [], []
@@ -0,0 +1,323 @@
+"""
+Login and MFA Benchmark
+Drives the Fileroom / SCD login page objects against the local stand-in SSO
+server, with PingID served by the fake desktop backend, records per-phase
+latencies over N iterations and compares their percentiles with a stored
+baseline
+
+Phases:
+    <app>.open                 navigation to the application
+    <app>.submit_identity      Continue + email (SSO redirect)
+    <app>.submit_credentials   employee ID + password (SSO submit)
+    <app>.mfa                  MFA retrieval + passcode submit
+    <app>.after_mfa            domain / location selection
+    mfa.retrieve               PingID code retrieval alone
+    pingid.<step>              PingIDAutomation.get_mfa_code steps (launch, connect_window, ...)
+    async.<phase>              the same login phases with the async page objects (--compare-async)
+
+Usage:
+    python benchmark.py --iterations 20 --output benchmark_results.json
+    python benchmark.py --save-baseline
+    python benchmark.py --flows pingid --threshold 0.3
+    python benchmark.py --flows fileroom,scd --compare-async 4   # sync vs async logins per second
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from timeouts import TimeoutPolicy, percentile
+
+try:
+    from config import BENCHMARK_CONFIG
+except ImportError:
+    BENCHMARK_CONFIG = {}
+
+
+FLOWS = ("fileroom", "scd", "pingid")
+PERCENTILES = (50, 90, 95, 99)
+
+BENCHMARK_CREDENTIALS = {
+    "email": "benchmark@example.com",
+    "employee_id": "0000000",
+    "password": "benchmark-password",
+}
+
+
+class PhaseRecorder:
+    """Collects latency samples (ms) per phase"""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, phase, duration_ms):
+        self.samples.setdefault(phase, []).append(round(duration_ms, 3))
+
+    @contextmanager
+    def time(self, phase):
+        """Time the enclosed block as one sample of a phase"""
+        start = time.perf_counter()
+        yield
+        self.add(phase, (time.perf_counter() - start) * 1000)
+
+    def summary(self):
+        """Return {phase: {count, mean, max, p50, p90, p95, p99}}"""
+        result = {}
+        for phase, values in sorted(self.samples.items()):
+            stats = {"count": len(values), "mean": round(sum(values) / len(values), 3), "max": max(values)}
+            stats.update({f"p{pct}": percentile(values, pct) for pct in PERCENTILES})
+            result[phase] = stats
+        return result
+
+
+class RecordingPolicy(TimeoutPolicy):
+    """Timeout policy that reports every tracked page-object step to a recorder"""
+
+    def __init__(self, recorder, prefix=""):
+        # No history: budgets stay at the profile maximums and nothing is persisted
+        super().__init__(history_path=os.devnull)
+        self.recorder = recorder
+        self.prefix = prefix
+
+    @contextmanager
+    def track(self, page, step, profile):
+        start = time.perf_counter()
+        with super().track(page, step, profile) as budget:
+            yield budget
+        self.recorder.add(f"{self.prefix}{step}", (time.perf_counter() - start) * 1000)
+
+
+def _fake_pingid():
+    from desktop_backend import FakeBackend
+    from pingid_automation import PingIDAutomation
+    return PingIDAutomation(exe_path="PingID.exe", pin="0000", timeout=5, backend=FakeBackend())
+
+
+def _pingid_code(pingid, recorder):
+    """Run one cold PingID flow, recording its steps as pingid.<step>"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        pingid.timer.reset()
+        code = pingid.get_mfa_code()
+    for name, duration in pingid.timer.steps:
+        recorder.add(f"pingid.{name}", duration * 1000)
+    return code
+
+
+def bench_pingid(iterations, recorder):
+    pingid = _fake_pingid()
+    for _ in range(iterations):
+        with recorder.time("mfa.retrieve"):
+            if not _pingid_code(pingid, recorder):
+                raise RuntimeError("Fake PingID did not return a code")
+
+
+def _mfa_provider(recorder):
+    """Fake PingID provider; the lock keeps concurrent (async) logins to one PingID at a time"""
+    pingid = _fake_pingid()
+    lock = threading.Lock()
+
+    def provider():
+        with lock, recorder.time("mfa.retrieve"):
+            return _pingid_code(pingid, recorder)
+
+    return provider
+
+
+def bench_logins(flows, iterations, recorder, server):
+    """
+    Run each login flow `iterations` times in fresh browser contexts, one after another
+
+    Returns:
+        float: Wall-clock seconds for all logins
+    """
+    from playwright.sync_api import sync_playwright
+    from sso_pages import FileroomLoginPage, SCDLoginPage
+
+    page_classes = {"fileroom": FileroomLoginPage, "scd": SCDLoginPage}
+    policy = RecordingPolicy(recorder)
+    provider = _mfa_provider(recorder)
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            start = time.perf_counter()
+            for flow in flows:
+                for _ in range(iterations):
+                    context = browser.new_context()
+                    page = context.new_page()
+                    login_page = page_classes[flow](page, timeouts=policy)
+                    login_page.url = f"{server.url}{flow}/"
+                    with recorder.time(f"{flow}.total"):
+                        login_page.login(BENCHMARK_CREDENTIALS, mfa_provider=provider)
+                    context.close()
+            return time.perf_counter() - start
+        finally:
+            browser.close()
+
+
+def bench_async_logins(flows, iterations, recorder, server, concurrency):
+    """
+    Run the same logins with the async page objects, `concurrency` at a time
+    in one browser (phases recorded as async.<phase>)
+
+    Returns:
+        float: Wall-clock seconds for all logins
+    """
+    from async_sso_pages import AsyncFileroomLoginPage, AsyncSCDLoginPage, async_browser, login_in_new_context
+
+    page_classes = {"fileroom": AsyncFileroomLoginPage, "scd": AsyncSCDLoginPage}
+    policy = RecordingPolicy(recorder, prefix="async.")
+    provider = _mfa_provider(recorder)
+
+    async def run():
+        slots = asyncio.Semaphore(concurrency)
+        async with async_browser(headless=True) as browser:
+            async def login(flow):
+                async with slots:
+                    with recorder.time(f"async.{flow}.total"):
+                        context, _ = await login_in_new_context(
+                            browser, page_classes[flow], BENCHMARK_CREDENTIALS, url=f"{server.url}{flow}/",
+                            mfa_provider=provider, timeouts=policy)
+                    await context.close()
+
+            start = time.perf_counter()
+            await asyncio.gather(*(login(flow) for flow in flows for _ in range(iterations)))
+            return time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def bench_throughput(flows, iterations, recorder, concurrency=None):
+    """
+    Run the browser login flows against a stand-in server, sync and (when
+    `concurrency` is set) async
+
+    Returns:
+        dict: Logins per second for each mode
+    """
+    from standin_server import StandInServer
+
+    logins = len(flows) * iterations
+    server = StandInServer().start()
+    try:
+        throughput = {"sync_logins_per_s": round(logins / bench_logins(flows, iterations, recorder, server), 3)}
+        if concurrency:
+            elapsed = bench_async_logins(flows, iterations, recorder, server, concurrency)
+            throughput["async_logins_per_s"] = round(logins / elapsed, 3)
+            throughput["async_concurrency"] = concurrency
+        return throughput
+    finally:
+        server.stop()
+
+
+def compare(results, baseline, threshold, min_delta_ms, stat="p95"):
+    """
+    Compare a run with a baseline
+
+    Args:
+        results: Phase summary of this run
+        baseline: Phase summary of the baseline run
+        threshold: Allowed relative slowdown (0.2 = 20%)
+        min_delta_ms: Slowdowns smaller than this are treated as noise
+        stat: Statistic compared
+
+    Returns:
+        list: (phase, baseline_ms, current_ms) for every regressed phase
+    """
+    regressions = []
+    for phase, current in results.items():
+        previous = baseline.get(phase)
+        if previous is None:
+            continue
+        before, after = previous[stat], current[stat]
+        if after > before * (1 + threshold) and after - before >= min_delta_ms:
+            regressions.append((phase, before, after))
+    return regressions
+
+
+def format_summary(summary, baseline=None):
+    lines = [f"  {'phase':<28} {'p50':>9} {'p95':>9} {'p99':>9} {'base p95':>9}"]
+    for phase, stats in summary.items():
+        base = (baseline or {}).get(phase, {}).get("p95")
+        base_text = f"{base:9.2f}" if base is not None else f"{'-':>9}"
+        lines.append(f"  {phase:<28} {stats['p50']:9.2f} {stats['p95']:9.2f} {stats['p99']:9.2f} {base_text}")
+    return "\n".join(lines)
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the login and MFA hot path")
+    parser.add_argument("--iterations", type=int, default=BENCHMARK_CONFIG.get("iterations", 20))
+    parser.add_argument("--flows", default=",".join(FLOWS), help="Comma separated subset of: " + ", ".join(FLOWS))
+    parser.add_argument("--output", default=BENCHMARK_CONFIG.get("output_file", "benchmark_results.json"))
+    parser.add_argument("--baseline", default=BENCHMARK_CONFIG.get("baseline_file", "benchmark_baseline.json"))
+    parser.add_argument("--threshold", type=float, default=BENCHMARK_CONFIG.get("regression_threshold", 0.2))
+    parser.add_argument("--min-delta-ms", type=float, default=BENCHMARK_CONFIG.get("min_delta_ms", 5))
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--compare-async", type=int, metavar="CONCURRENCY", default=0,
+                        help="Also run the logins with the async page objects, CONCURRENCY at a time")
+    args = parser.parse_args(argv)
+
+    flows = [flow.strip() for flow in args.flows.split(",") if flow.strip()]
+    unknown = set(flows) - set(FLOWS)
+    if unknown:
+        parser.error(f"Unknown flows: {', '.join(sorted(unknown))}")
+
+    recorder = PhaseRecorder()
+    if "pingid" in flows:
+        bench_pingid(args.iterations, recorder)
+    login_flows = [flow for flow in flows if flow != "pingid"]
+    throughput = {}
+    if login_flows:
+        throughput = bench_throughput(login_flows, args.iterations, recorder, args.compare_async)
+
+    summary = recorder.summary()
+    baseline_data = _read_json(args.baseline)
+    baseline = baseline_data["phases"] if baseline_data else None
+    regressions = compare(summary, baseline, args.threshold, args.min_delta_ms) if baseline else []
+
+    run = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "iterations": args.iterations,
+        "flows": flows,
+        "threshold": args.threshold,
+        "phases": summary,
+        "throughput": throughput,
+        "regressions": [{"phase": phase, "baseline_p95": before, "p95": after}
+                        for phase, before, after in regressions],
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+
+    print(f"Benchmark ({args.iterations} iterations, ms):\n{format_summary(summary, baseline)}")
+    for mode, value in throughput.items():
+        print(f"  {mode}: {value}")
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    for phase, before, after in regressions:
+        print(f"REGRESSION: {phase} p95 {after:.2f}ms vs baseline {before:.2f}ms (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
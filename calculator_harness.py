@@ -0,0 +1,235 @@
+"""
+Calculator Desktop Harness
+Keeps one Windows Calculator window open for many cases: button wrappers
+are resolved once and cached by auto_id, state is cleared between cases,
+and results are polled instead of sleeping after every click
+"""
+
+import re
+
+from desktop_backend import get_backend
+from instrumentation import event, span
+from waits import WaitTimeoutError, wait_until
+
+
+# Expression characters -> Calculator button auto_ids
+BUTTON_IDS = {
+    **{str(digit): f"num{digit}Button" for digit in range(10)},
+    "+": "plusButton",
+    "-": "minusButton",
+    "*": "multiplyButton",
+    "/": "divideButton",
+    ".": "decimalSeparatorButton",
+    "=": "equalButton",
+}
+CLEAR_BUTTON_ID = "clearButton"
+RESULT_ID = "CalculatorResults"
+
+
+def parse_display(text):
+    """Return the number shown by 'Display is 1,234.5', or the raw text if it is not a number"""
+    value = text.replace("Display is", "").replace(",", "").strip()
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def launch_calculator(timeout=10, backend=None):
+    """Launch calc.exe and return its main window once it is ready"""
+    backend = backend or get_backend()
+    backend.launch("calc.exe")
+
+    def _window():
+        window = backend.window(title="Calculator", class_name="ApplicationFrameWindow")
+        return window if window.exists(timeout=0) else None
+
+    calc_window = wait_until(_window, timeout, description="Calculator window")
+    calc_window.set_focus()
+    return calc_window
+
+
+class CalculatorSession:
+    """Drives an open Calculator window through expressions"""
+
+    def __init__(self, window, result_timeout=2):
+        """
+        Initialize the session
+
+        Args:
+            window: Calculator main window (pywinauto spec or fake)
+            result_timeout: Seconds to poll the display for the expected result
+        """
+        self.window = window
+        self.result_timeout = result_timeout
+        self._buttons = {}
+        self._display = None
+
+    def button(self, auto_id):
+        """Return the button wrapper for an auto_id, resolving it only once"""
+        if auto_id not in self._buttons:
+            spec = self.window.child_window(auto_id=auto_id, control_type="Button")
+            self._buttons[auto_id] = spec.wrapper_object()
+        return self._buttons[auto_id]
+
+    @property
+    def display(self):
+        if self._display is None:
+            spec = self.window.child_window(auto_id=RESULT_ID, control_type="Text")
+            self._display = spec.wrapper_object()
+        return self._display
+
+    def display_text(self):
+        return self.display.window_text()
+
+    def press(self, auto_id):
+        self.button(auto_id).click()
+
+    def clear(self):
+        """Reset the calculator between cases"""
+        self.press(CLEAR_BUTTON_ID)
+
+    def evaluate(self, expression, expected=None):
+        """
+        Enter an expression such as '9+1' followed by '=' and read the result
+
+        Args:
+            expression: Digits and + - * / . characters
+            expected: Value the display is polled for (optional)
+
+        Returns:
+            The parsed display value (float, or the raw text for messages like
+            'Cannot divide by zero')
+        """
+        with span("calculator.evaluate", expression=expression) as step:
+            self.clear()
+            for char in expression.replace(" ", "") + "=":
+                self.press(BUTTON_IDS[char])
+
+            result = self.read_result(expected, description=f"{expression} = {expected}")
+            step.set(result=result)
+            return result
+
+    def read_result(self, expected=None, description="result"):
+        """
+        Read the display, polling it for `expected` when given
+
+        Args:
+            expected: Value the display is polled for (optional, else read once)
+            description: Condition name for the poll
+
+        Returns:
+            The parsed display value; the last one read if `expected` never showed
+        """
+        if expected is None:
+            return parse_display(self.display_text())
+        try:
+            # A one-element tuple keeps a 0 result truthy for wait_until
+            return wait_until(lambda: _match(parse_display(self.display_text()), expected),
+                              self.result_timeout, description=description,
+                              initial_interval=0.01, max_interval=0.1)[0]
+        except WaitTimeoutError:
+            return parse_display(self.display_text())
+
+    def close(self):
+        try:
+            self.window.close()
+        except Exception as e:
+            event(f"Failed to close Calculator: {str(e)}", level="warning")
+
+
+def _match(actual, expected):
+    """Return (actual,) when the display shows the expected value, else None"""
+    if isinstance(actual, float) and isinstance(expected, (int, float)):
+        if abs(actual - expected) <= 1e-9 * max(1.0, abs(expected)):
+            return (actual,)
+    elif actual == expected:
+        return (actual,)
+    return None
+
+
+class FakeCalculatorControl:
+    """Button or display control of FakeCalculatorWindow"""
+
+    def __init__(self, window, auto_id):
+        self.window = window
+        self.auto_id = auto_id
+
+    def wrapper_object(self):
+        self.window.resolutions += 1
+        return self
+
+    def click(self):
+        self.window.press(self.auto_id)
+
+    def window_text(self):
+        return f"Display is {self.window.display}"
+
+
+class FakeCalculatorWindow:
+    """
+    In-memory Calculator (standard mode, left-to-right evaluation) exposing the
+    auto_ids used by CalculatorSession, for running the harness on Linux CI
+    """
+
+    _OPERATORS = {"plusButton": "+", "minusButton": "-", "multiplyButton": "*", "divideButton": "/"}
+
+    def __init__(self):
+        self.resolutions = 0
+        self.clicks = 0
+        self._reset()
+
+    def _reset(self):
+        self.display = "0"
+        self.accumulator = None
+        self.operator = None
+        self.entering = False
+
+    def window_text(self):
+        return "Calculator"
+
+    def child_window(self, auto_id, control_type=None):
+        known = set(BUTTON_IDS.values()) | {CLEAR_BUTTON_ID, RESULT_ID}
+        if auto_id not in known:
+            raise LookupError(f"No control with auto_id={auto_id}")
+        return FakeCalculatorControl(self, auto_id)
+
+    def _apply(self):
+        value = float(self.display)
+        if self.operator is None:
+            return value
+        if self.operator == "+":
+            return self.accumulator + value
+        if self.operator == "-":
+            return self.accumulator - value
+        if self.operator == "*":
+            return self.accumulator * value
+        return self.accumulator / value
+
+    def press(self, auto_id):
+        self.clicks += 1
+        if auto_id == CLEAR_BUTTON_ID:
+            self._reset()
+        elif auto_id.startswith("num"):
+            digit = re.match(r"num(\d)Button", auto_id).group(1)
+            self.display = digit if not self.entering or self.display == "0" else self.display + digit
+            self.entering = True
+        elif auto_id == "decimalSeparatorButton":
+            if not self.entering:
+                self.display, self.entering = "0", True
+            if "." not in self.display:
+                self.display += "."
+        else:
+            try:
+                result = self._apply()
+            except ZeroDivisionError:
+                self._reset()
+                self.display = "Cannot divide by zero"
+                return
+            self.display = f"{result:.15g}"
+            self.accumulator = result
+            self.operator = self._OPERATORS.get(auto_id)
+            self.entering = False
+
+    def close(self):
+        pass
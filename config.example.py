@@ -7,7 +7,54 @@ Copy this file to config.py and update with your actual values
 PINGID_CONFIG = {
     "exe_path": r"C:\Program Files (x86)\Ping Identity\PingID\PingID.exe",  # Update this path to your actual PingID.exe location
     "pin": "YOUR_PIN_HERE",  # Update this with your actual PIN
-    "wait_timeout": 10  # Seconds to wait for PingID window to appear
+    "wait_timeout": 10,  # Seconds to wait for PingID window to appear
+    "step_timeout": 10,  # Seconds each PingID step (PIN ready, Next enabled, Copy enabled, clipboard) may take
+    "keystroke_pause": 0.02,  # Seconds between PIN keystrokes
+    "mfa_budget": 15,  # Expected total seconds for the MFA handshake (reported as EXCEEDED when over)
+    "locator_cache": ".pingid_locators.json",  # Winning control lookup strategies, keyed by PingID version
+    "snapshot_file": "pingid_snapshot.json",  # Control tree stored by the inspector scripts (see ui_snapshot.py)
+    "code_source": "clipboard",  # "text" reads the code from the PingID window (clipboard stays the fallback)
+    "code_pattern": r"\d{6}",  # Regex a valid MFA code must fully match (whitespace ignored)
+    "code_validity": 30,  # Seconds a generated code is reused by MFAPrefetch before a new one is generated
+    "lock_file": None,  # Lock file shared by parallel workers (None uses <temp dir>/pingid.lock)
+    "lock_timeout": 300  # Seconds a worker waits for its turn at PingID
+}
+
+# PingID MFA service (python pingid_service.py keeps one warm PingID and serves codes to all workers)
+PINGID_SERVICE_CONFIG = {
+    "host": "127.0.0.1",
+    "port": 47615,
+    "request_timeout": 120  # Seconds a client waits for its turn and the code
+}
+
+# Desktop automation backend for PingID and Calculator
+DESKTOP_CONFIG = {
+    "backend": None,  # "uia" (pywinauto) or "fake" (recorded control trees); None picks uia on Windows, fake elsewhere
+    "fake_trees": None  # Recorded tree JSON files for the fake backend (None loads every file in desktop_trees/)
+}
+
+# Login / MFA benchmark (python benchmark.py)
+BENCHMARK_CONFIG = {
+    "iterations": 20,  # Runs per flow
+    "output_file": "benchmark_results.json",  # Machine-readable results of the latest run
+    "baseline_file": "benchmark_baseline.json",  # Run compared against (written by --save-baseline)
+    "regression_threshold": 0.2,  # Allowed p95 slowdown per phase (0.2 = 20%)
+    "min_delta_ms": 5  # Slowdowns smaller than this are ignored as noise
+}
+
+# Startup profiling (python startup_profile.py): import time and pytest collection time
+STARTUP_PROFILE_CONFIG = {
+    "runs": 3,  # Collection runs per profile; the fastest one is reported
+    "output_file": "startup_profile.json",
+    "baseline_file": "startup_baseline.json",  # Written by --save-baseline, compared by --check
+    "regression_threshold": 0.3,  # Allowed slowdown of collection / import time (0.3 = 30%)
+    "min_delta_ms": 100  # Slowdowns smaller than this are ignored as noise
+}
+
+# Step instrumentation (spans replace print tracing; see instrumentation.py)
+INSTRUMENTATION_CONFIG = {
+    "echo_level": "error",  # Events at or above this level are printed: debug, info, warning, error, off
+    "jsonl_file": None  # Also write every span as a JSON line here (pytest: --spans-jsonl PATH)
 }
 
 # SSO Credentials
@@ -22,3 +69,90 @@ BROWSER_CONFIG = {
     "headless": False,
     "slow_mo": 500  # Milliseconds to slow down browser actions for visibility
 }
+
+# Authenticated session cache (see conftest.py)
+SESSION_CACHE_CONFIG = {
+    "cache_dir": ".auth",  # Directory for cached storage_state files (keep out of version control)
+    "ttl_seconds": 3600  # Re-run the full SSO + MFA login once a cached session is older than this
+}
+
+# Test scheduling (see scheduler.py): per-test durations / outcomes recorded across runs
+SCHEDULER_CONFIG = {
+    "order": "file",  # Default for --schedule: file, longest (best with -n) or failed (fast feedback)
+    # Also decides the --shard split: every shard must start from the same file (see shards.py)
+    "history_file": ".test_durations.json",
+    "keep_copied_tests": False  # True runs tests collected again from copies like "FileroomLogin copy.py"
+}
+
+# Context pooling (see context_pool.py, or pass --context-pool): tests reuse reset browser
+# contexts instead of creating one each; a context is closed after max_reuse tests or a failure
+CONTEXT_POOL_CONFIG = {
+    "enabled": False,
+    "size": 2,
+    "max_reuse": 20
+}
+
+# Timeout profiles (see timeouts.py). Values are upper bounds in milliseconds; once a step
+# has min_samples recorded durations its budget tightens to max(floor_ms, p95 * p95_multiplier)
+TIMEOUT_CONFIG = {
+    "profiles": {
+        "navigation": 30000,
+        "sso_redirect": 45000,
+        "mfa_wait": 60000,
+        "ui_action": 10000
+    },
+    "history_file": ".step_latencies.json",
+    "p95_multiplier": 2.0,
+    "floor_ms": 2000,
+    "min_samples": 5
+}
+
+# Step retries (see retry.py): only the failing login phase is retried, and only for transient
+# errors (timeouts, missing / rejected MFA code, network errors); backoff doubles from base_delay
+RETRY_CONFIG = {
+    "attempts": 1,  # Default attempts per phase (1 = no retry)
+    "steps": {"open": 2, "mfa": 3},  # Per-phase attempts, by phase name or "<app>.<phase>"
+    "base_delay": 0.5,
+    "max_delay": 5,
+    "jitter": 0.5  # Fraction of each delay randomly taken off
+}
+
+# Lean mode resource filtering for tests marked @pytest.mark.lean (see resource_filter.py)
+# Per-app entries extend the built-in rules (block images/fonts/media and common analytics hosts)
+RESOURCE_FILTER_CONFIG = {
+    "apps": {
+        "default": {"block_patterns": [], "allow_patterns": []},
+        "fileroom": {"allow_patterns": ["*production.sureprep.com/Content/*"]},
+        "scd": {"block_types": ["stylesheet"]}
+    }
+}
+
+# HAR record / replay (see har_replay.py, or pass --har record|replay): replay serves each browser
+# test from har/<module>-<test>.har and returns the recorded MFA codes instead of running PingID
+HAR_CONFIG = {
+    "mode": "off",  # off, record or replay
+    "dir": "har",
+    "url": None,  # Glob / regex of the URLs recorded and replayed (None = all)
+    "not_found": "abort",  # Replay of a request missing from the HAR: abort, or fallback to the network
+    "update_mode": "minimal"  # "full" also records timings, cookies and security details
+}
+
+# Failure-only Playwright tracing (see trace_buffer.py, or pass --trace-on-failure): the trace is
+# cut into one chunk per top-level step, only the newest chunks are kept in memory, and they are
+# attached to Allure when the test fails
+TRACE_BUFFER_CONFIG = {
+    "enabled": False,
+    "max_chunks": 8,  # Newest step chunks kept per test
+    "max_mb": 50,  # Size cap of the kept chunks; oldest are dropped first
+    "chunk_depth": 0,  # Span depth that ends a chunk (0 = login phases / top-level test steps)
+    "screenshots": True,
+    "snapshots": True
+}
+
+# Allure attachments (see attachments.py): screenshots and control dumps are only
+# captured for failing tests, plus this fraction of passing tests
+ATTACHMENT_CONFIG = {
+    "success_sample_rate": 0.0,
+    "jpeg_quality": 60,
+    "max_width": 1280  # Downscale wider screenshots (skipped if Pillow is not installed)
+}
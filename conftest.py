@@ -1,11 +1,538 @@
+import os
+
 import pytest
 from playwright.sync_api import Page
 
+# Duration-aware ordering and de-duplication of tests (--schedule, see scheduler.py)
+pytest_plugins = ("scheduler",)
+
+
+def pytest_addoption(parser):
+    from har_replay import MODES
+    parser.addoption(
+        "--auth-standin",
+        action="store_true",
+        default=False,
+        help="Run the login tests and session fixtures against a local stand-in SSO server (no real hosts or PingID)",
+    )
+    parser.addoption(
+        "--desktop-backend",
+        choices=("uia", "fake"),
+        default=None,
+        help="Desktop automation backend for Calculator and PingID (default: uia on Windows, fake elsewhere)",
+    )
+    parser.addoption(
+        "--context-pool",
+        action="store_true",
+        default=False,
+        help="Recycle browser contexts between tests (see context_pool.py)",
+    )
+    parser.addoption(
+        "--har",
+        choices=MODES,
+        default=None,
+        help="Record each browser test's traffic to har/, or replay it offline with a fake PingID (see har_replay.py)",
+    )
+    parser.addoption(
+        "--trace-on-failure",
+        action="store_true",
+        default=False,
+        help="Keep a ring-buffered Playwright trace per test and attach it to Allure only on failure",
+    )
+    parser.addoption(
+        "--spans-jsonl",
+        default=None,
+        metavar="PATH",
+        help="Write every instrumentation span as a JSON line to PATH (suffixed per xdist worker)",
+    )
+
+
+def pytest_configure(config):
+    if config.getoption("--desktop-backend"):
+        # Also the backend of PingID automation, which picks it through get_backend()
+        from desktop_backend import select_backend
+        select_backend(config.getoption("--desktop-backend"))
+
+    from har_replay import HAR_CONFIG
+    if (config.getoption("--har") or HAR_CONFIG.get("mode", "off")) == "replay":
+        # Replayed steps take milliseconds: recording them would tighten the live budgets to floor_ms
+        import timeouts
+        timeouts._policy = timeouts.TimeoutPolicy(record=False)
+
+    path = config.getoption("--spans-jsonl")
+    if path:
+        from instrumentation import JsonLinesExporter, get_tracer
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        get_tracer().add_exporter(JsonLinesExporter(f"{path}.{worker}" if worker else path))
+
+
+def pytest_sessionfinish(session):
+    """Persist the step latencies recorded by the timeout policy; xdist workers hand over their summaries"""
+    import timeouts
+    if timeouts._policy is not None:
+        timeouts._policy.save()
+    # Only the controller's terminal summary is shown under xdist
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput[SUMMARIES_KEY] = _export_summaries(session.config)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """xdist controller: merge the summary data of a finished worker"""
+    summaries = getattr(node, "workeroutput", {}).get(SUMMARIES_KEY)
+    if summaries:
+        _merge_summaries(node.config, summaries)
+
+
+def _export_summaries(config):
+    """This process's data behind the terminal summary tables"""
+    summaries = {}
+    if POOL_COUNTERS_KEY in config.stash:
+        summaries["context_pool"] = config.stash[POOL_COUNTERS_KEY]
+    import retry
+    if retry._policy is not None and retry._policy.counts:
+        summaries["retries"] = retry._policy.counts
+    import instrumentation
+    if instrumentation._tracer is not None and instrumentation.summary_exporter() is not None:
+        summaries["spans"] = instrumentation.summary_exporter().export()
+    return summaries
+
+
+def _merge_summaries(config, summaries):
+    if "context_pool" in summaries:
+        from context_pool import merge_counters
+        config.stash[POOL_COUNTERS_KEY] = merge_counters(config.stash.get(POOL_COUNTERS_KEY, None),
+                                                         summaries["context_pool"])
+    if "retries" in summaries:
+        from retry import get_retry_policy
+        get_retry_policy().merge(summaries["retries"])
+    if "spans" in summaries:
+        from instrumentation import summary_exporter
+        exporter = summary_exporter()
+        if exporter is not None:
+            exporter.merge(summaries["spans"])
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Context pool metrics, step retries and the per-span timing table of this process and its xdist workers"""
+    pool_counters = terminalreporter.config.stash.get(POOL_COUNTERS_KEY, None)
+    if pool_counters:
+        from context_pool import format_report
+        terminalreporter.write_sep("-", "context pool")
+        terminalreporter.write_line(format_report(pool_counters))
+
+    import retry
+    if retry._policy is not None and retry._policy.report():
+        terminalreporter.write_sep("-", "step retries")
+        terminalreporter.write_line(retry._policy.report())
+
+    import instrumentation
+    if instrumentation._tracer is None:
+        return
+    table = instrumentation.summary_table()
+    if table:
+        terminalreporter.write_sep("-", "step timings")
+        terminalreporter.write_line(table)
+    instrumentation._tracer.close()
+
+
+# workeroutput key of the data an xdist worker sends for the terminal summary tables
+SUMMARIES_KEY = "session_summaries"
+ATTACHMENTS_KEY = pytest.StashKey()
+CALL_FAILED_KEY = pytest.StashKey()
+POOL_COUNTERS_KEY = pytest.StashKey()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Capture deferred attachments while the page/app is still open"""
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == "call":
+        item.stash[CALL_FAILED_KEY] = report.failed
+    manager = item.stash.get(ATTACHMENTS_KEY, None)
+    if manager is not None and report.when == "call":
+        manager.resolve(failed=report.failed)
+
+
+@pytest.fixture
+def attachments(request):
+    """
+    Buffered Allure attachments for the test (see attachments.py).
+    Request it after 'page' so screenshots are taken before the page closes.
+    """
+    from attachments import AttachmentManager
+    manager = AttachmentManager()
+    request.node.stash[ATTACHMENTS_KEY] = manager
+    yield manager
+    if manager.deferred:
+        # Setup failed before the test body ran
+        manager.resolve(failed=True)
+    manager.flush()
+
+
+@pytest.fixture(scope="session")
+def timeout_policy():
+    """Named timeout profiles tightened by recorded step latencies (see timeouts.py)"""
+    from timeouts import get_policy
+    return get_policy()
+
+
 @pytest.fixture(autouse=True)
-def set_default_timeout(page: Page):
+def set_default_timeout(request, timeout_policy):
     """
     Automatically applies to all tests that use 'page'.
-    Sets timeout for all tests without explicitly calling it.
+    Sets the ui_action / navigation profile timeouts for all tests without
+    explicitly calling it; page objects tighten them per step.
+    Desktop-only tests do not start a browser.
+    """
+    if "page" in request.fixturenames:
+        page: Page = request.getfixturevalue("page")
+        timeout_policy.apply_defaults(page)
+
+
+@pytest.fixture(scope="session")
+def desktop_backend(request):
+    """'uia' (pywinauto) on Windows, 'fake' (in-memory) elsewhere unless overridden"""
+    from desktop_backend import backend_name
+    return backend_name()
+
+
+@pytest.fixture(scope="session")
+def calculator(desktop_backend):
+    """One Calculator window shared by every calculator test in the session"""
+    from calculator_harness import CalculatorSession, FakeCalculatorWindow, launch_calculator
+    from desktop_backend import get_backend
+    window = launch_calculator(backend=get_backend("uia")) if desktop_backend == "uia" else FakeCalculatorWindow()
+    session = CalculatorSession(window)
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def standin_server(request):
+    """Local stand-in SSO server (one per worker) with --auth-standin, else None"""
+    if not request.config.getoption("--auth-standin"):
+        yield None
+        return
+
+    from standin_server import StandInServer
+    server = StandInServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def sso_urls(standin_server):
+    """Page object URL overrides for login_flows.app_page(): the stand-in flows with --auth-standin, else none"""
+    if standin_server is None:
+        return {}
+    from standin_server import standin_urls
+    return standin_urls(standin_server)
+
+
+@pytest.fixture(scope="session")
+def shared_mfa_provider(standin_server):
+    """MFA provider for flows needing several codes: the stand-in one with --auth-standin, else None (PingID)"""
+    if standin_server is None:
+        return None
+    from standin_server import standin_mfa_code
+    return standin_mfa_code
+
+
+@pytest.fixture(scope="session")
+def sso_credentials(standin_server):
+    """SSO_CREDENTIALS from config.py, imported on first use so collection does not need config.py"""
+    if standin_server is not None:
+        from standin_server import STANDIN_CREDENTIALS
+        return STANDIN_CREDENTIALS
+    try:
+        from config import SSO_CREDENTIALS
+    except ImportError:
+        pytest.skip("config.py with SSO_CREDENTIALS not found (copy config.example.py)")
+    return SSO_CREDENTIALS
+
+
+@pytest.fixture(scope="session")
+def har_mode(request):
+    """off, record or replay (--har / HAR_CONFIG["mode"])"""
+    from har_replay import HAR_CONFIG
+    return request.config.getoption("--har") or HAR_CONFIG.get("mode", "off")
+
+
+def _har_name(request):
+    return f"{request.node.path.stem}-{request.node.originalname}"
+
+
+@pytest.fixture
+def mfa_prefetch(request, har_mode, shared_mfa_provider):
+    """
+    PingID launched and connected in the background from test start; pass as mfa_provider.
+    With --har record the codes are saved next to the HAR, with --har replay they are
+    returned instead of running PingID, as are stand-in codes with --auth-standin.
+    """
+    if shared_mfa_provider is not None:
+        yield shared_mfa_provider
+        return
+
+    if har_mode == "replay":
+        from har_replay import ReplayMFAProvider, har_paths
+        yield ReplayMFAProvider(har_paths(_har_name(request))[1])
+        return
+
+    from mfa_prefetch import MFAPrefetch
+    prefetch = MFAPrefetch().start()
+    if har_mode == "record":
+        from har_replay import RecordingMFAProvider, har_paths
+        recorder = RecordingMFAProvider(prefetch, har_paths(_har_name(request))[1])
+        yield recorder
+        recorder.save()
+    else:
+        yield prefetch
+    prefetch.close()
+
+
+@pytest.fixture(scope="session")
+def worker_name():
+    """xdist worker id (gw0, gw1, ...) or 'master' when running in a single process"""
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+@pytest.fixture(scope="session")
+def worker_artifacts_dir(tmp_path_factory, worker_name):
+    """Scratch directory private to this worker (downloads, HAR files, ...)"""
+    return tmp_path_factory.mktemp(f"artifacts-{worker_name}")
+
+
+@pytest.fixture(scope="session")
+def browser_type_launch_args(browser_type_launch_args, worker_artifacts_dir):
+    """Give each worker's browser its own downloads directory"""
+    return {**browser_type_launch_args, "downloads_path": str(worker_artifacts_dir / "downloads")}
+
+
+@pytest.fixture(scope="session")
+def context_pool(request, browser, browser_context_args, har_mode):
+    """
+    Pool of recycled contexts for this worker's browser, or None when disabled
+    (--context-pool / CONTEXT_POOL_CONFIG["enabled"]). Pooling is skipped when
+    pytest-playwright records traces, videos or screenshots, or HARs are recorded
+    or replayed, which need their own contexts.
+    """
+    from context_pool import CONTEXT_POOL_CONFIG, ContextPool
+    enabled = request.config.getoption("--context-pool") or CONTEXT_POOL_CONFIG.get("enabled", False)
+    recording = har_mode != "off" or any(request.config.getoption(option, default="off") != "off"
+                                         for option in ("--tracing", "--video", "--screenshot"))
+    if not enabled or recording:
+        yield None
+        return
+
+    pool = ContextPool(browser, browser_context_args)
+    yield pool
+    pool.close()
+    request.config.stash[POOL_COUNTERS_KEY] = pool.export()
+
+
+def _poolable(request):
+    return (request.node.get_closest_marker("browser_context_args") is None
+            and request.node.get_closest_marker("fresh_context") is None)
+
+
+@pytest.fixture
+def context(request, new_context, context_pool):
+    """pytest-playwright's context, recycled from the context pool when it is enabled"""
+    if context_pool is None or not _poolable(request):
+        yield new_context()
+        return
+
+    pooled = context_pool.acquire()
+    yield pooled
+    context_pool.release(pooled, reusable=not request.node.stash.get(CALL_FAILED_KEY, True))
+
+
+@pytest.fixture
+def page(context):
+    """The context's existing page (recycled contexts keep one), else a new one"""
+    return context.pages[0] if context.pages else context.new_page()
+
+
+@pytest.fixture(autouse=True)
+def har(request, har_mode):
+    """
+    Record the test's traffic to, or replay it from, har/<module>-<test>.har
+    (--har record / replay); tests without a browser context are unaffected
+    """
+    if har_mode == "off" or "context" not in request.fixturenames:
+        yield None
+        return
+
+    import har_replay
+    har_path = har_replay.har_paths(_har_name(request))[0]
+    context = request.getfixturevalue("context")
+    if har_mode == "record":
+        har_replay.record(context, har_path)
+    else:
+        try:
+            har_replay.replay(context, har_path)
+        except FileNotFoundError as e:
+            pytest.skip(str(e))
+    yield har_path
+
+
+@pytest.fixture(autouse=True)
+def failure_trace(request):
+    """
+    Ring-buffered Playwright trace of the test's context, chunked per step and
+    attached to Allure only if the test fails (--trace-on-failure /
+    TRACE_BUFFER_CONFIG["enabled"]; off while pytest-playwright's --tracing is on)
+    """
+    from trace_buffer import TRACE_BUFFER_CONFIG
+    enabled = request.config.getoption("--trace-on-failure") or TRACE_BUFFER_CONFIG.get("enabled", False)
+    if (not enabled or "context" not in request.fixturenames
+            or request.config.getoption("--tracing", default="off") != "off"):
+        yield None
+        return
+
+    from instrumentation import get_tracer
+    from trace_buffer import trace_context
+    buffer, exporter = trace_context(request.getfixturevalue("context"))
+    yield buffer
+    get_tracer().remove_exporter(exporter)
+    failed = request.node.stash.get(CALL_FAILED_KEY, True)
+    buffer.stop(keep=failed)
+    if failed:
+        buffer.attach()
+
+
+@pytest.fixture(autouse=True)
+def lean_mode(request, har):
+    """
+    Opt-in resource filtering: tests marked @pytest.mark.lean (or
+    @pytest.mark.lean("fileroom") for app specific rules) abort images, fonts,
+    media and analytics requests, and report the savings. Installed after the
+    HAR route, so allowed requests fall back to it.
     """
-    page.set_default_timeout(300000)
-    page.set_default_navigation_timeout(300000)
\ No newline at end of file
+    marker = request.node.get_closest_marker("lean")
+    if marker is None:
+        yield None
+        return
+
+    from resource_filter import ResourceFilter
+    import allure
+    resource_filter = ResourceFilter(app=marker.args[0] if marker.args else None)
+    resource_filter.install(request.getfixturevalue("context"))
+    yield resource_filter
+
+    request.node.user_properties.append(("requests_blocked", resource_filter.blocked))
+    request.node.user_properties.append(("bytes_saved", resource_filter.bytes_saved))
+    allure.attach(resource_filter.report(), name="Resource Filter",
+                  attachment_type=allure.attachment_type.TEXT)
+
+
+@pytest.fixture(scope="session")
+def session_cache(standin_server, tmp_path_factory):
+    """Disk cache of authenticated storage_state, one file per target (a temporary directory with --auth-standin)"""
+    from session_cache import SessionCache
+    if standin_server is not None:
+        return SessionCache(cache_dir=str(tmp_path_factory.mktemp("auth")))
+    return SessionCache()
+
+
+@pytest.fixture(scope="session")
+def auth_targets(standin_server, sso_urls, shared_mfa_provider):
+    """
+    Applications that can hand out pre-authenticated contexts.
+    With --auth-standin the Fileroom / SCD logins run against the local
+    StandInServer (one per worker); override this fixture to point at other hosts.
+    """
+    from login_flows import AUTH_TARGETS, build_targets
+    if standin_server is None:
+        return dict(AUTH_TARGETS)
+
+    from standin_server import STANDIN_CREDENTIALS
+    return build_targets(sso_urls, STANDIN_CREDENTIALS, shared_mfa_provider)
+
+
+def _login_once(browser, target, cache, rejected_state=None):
+    """
+    Log in under a per-target lock so parallel workers with an empty (or
+    rejected) cache wait for the first worker's login instead of all
+    running SSO + MFA
+    """
+    from process_lock import FileLock
+    with FileLock(cache.path_for(target.cache_key) + ".lock"):
+        storage_state = cache.load(target.cache_key)
+        if storage_state is None or storage_state == rejected_state:
+            storage_state = _login_and_cache(browser, target, cache)
+    return storage_state
+
+
+def _login_and_cache(browser, target, cache):
+    """Run the full SSO + MFA login once and persist the resulting storage_state"""
+    context = browser.new_context()
+    try:
+        target.login(context.new_page())
+        storage_state = context.storage_state()
+    finally:
+        context.close()
+    cache.save(target.cache_key, storage_state)
+    return storage_state
+
+
+@pytest.fixture
+def authenticated_context(request, browser, new_context, context_pool, session_cache, auth_targets):
+    """
+    Factory returning a browser context that is already logged in to a target.
+    The cached storage_state is reused until it expires or the target rejects it,
+    in which case the full login runs again and the cache is refreshed. With the
+    context pool enabled the storage_state is loaded into a recycled context.
+    """
+    pool = context_pool if _poolable(request) else None
+    pooled = []
+
+    def _open(storage_state):
+        if pool is None:
+            context = new_context(storage_state=storage_state)
+            context.new_page()
+            return context
+        context = pool.acquire(storage_state=storage_state)
+        pooled.append(context)
+        return context
+
+    def _close(context):
+        if context in pooled:
+            pooled.remove(context)
+            pool.discard(context)
+        else:
+            context.close()
+
+    def _authenticated_context(name):
+        target = auth_targets[name]
+        storage_state = session_cache.load(target.cache_key)
+        if storage_state is None:
+            storage_state = _login_once(browser, target, session_cache)
+            return _open(storage_state)
+
+        context = _open(storage_state)
+        if target.is_authenticated(context.pages[0]):
+            return context
+
+        _close(context)
+        storage_state = _login_once(browser, target, session_cache, rejected_state=storage_state)
+        return _open(storage_state)
+
+    yield _authenticated_context
+    reusable = not request.node.stash.get(CALL_FAILED_KEY, True)
+    for context in pooled:
+        pool.release(context, reusable=reusable)
+
+
+@pytest.fixture
+def fileroom_page(authenticated_context):
+    """Page already logged in to Fileroom production (the stand-in with --auth-standin)"""
+    return authenticated_context("fileroom").pages[0]
+
+
+@pytest.fixture
+def scd_page(authenticated_context):
+    """Page already logged in to SCD Dashboard QAT (the stand-in with --auth-standin)"""
+    return authenticated_context("scd").pages[0]
@@ -0,0 +1,222 @@
+"""
+Browser Context Pool
+Recycles browser contexts between tests instead of creating a new one per
+test: a returned context has its pages, routes, permissions and storage
+reset (or replaced by a cached storage_state) and is handed to the next
+test, up to a maximum number of reuses
+"""
+
+import re
+import time
+
+from instrumentation import event
+
+try:
+    from config import CONTEXT_POOL_CONFIG
+except ImportError:
+    CONTEXT_POOL_CONFIG = {}
+
+
+EMPTY_STORAGE_STATE = {"cookies": [], "origins": []}
+
+# Restores an origin's localStorage on the blank stand-in document of _restore_storage
+RESTORE_LOCAL_STORAGE = """items => {
+    localStorage.clear();
+    for (const {name, value} of items) localStorage.setItem(name, value);
+}"""
+
+
+class ContextPool:
+    """Warm contexts of one browser, with hit/miss and warm-up metrics"""
+
+    def __init__(self, browser, context_args=None, size=None, max_reuse=None):
+        """
+        Initialize the pool
+
+        Args:
+            browser: Playwright Browser the contexts belong to
+            context_args: Keyword arguments for browser.new_context (viewport, base_url, ...)
+            size: Maximum number of idle contexts kept (optional, defaults to CONTEXT_POOL_CONFIG)
+            max_reuse: Tests a context may serve before it is closed (optional, defaults to config)
+        """
+        self.browser = browser
+        self.context_args = dict(context_args or {})
+        self.size = size or CONTEXT_POOL_CONFIG.get("size", 2)
+        self.max_reuse = max_reuse or CONTEXT_POOL_CONFIG.get("max_reuse", 20)
+        self.idle = []
+        self.uses = {}
+        self.hits = 0
+        self.misses = 0
+        self.retired = 0
+        self.warmup_ms = 0.0
+        self.reset_ms = 0.0
+        self.reset_failures = 0
+        self.reset_error = None
+
+    def acquire(self, storage_state=None):
+        """
+        Return a context with one blank page, recycled when possible
+
+        Args:
+            storage_state: Cookies / local storage to start from (optional, defaults to empty)
+        """
+        while self.idle:
+            context = self.idle.pop()
+            start = time.perf_counter()
+            try:
+                self._reset(context, storage_state)
+            except Exception as e:
+                # Browser side state we cannot restore: drop it and try the next one
+                self.reset_failures += 1
+                self.reset_error = f"{type(e).__name__}: {e}"
+                event(f"Could not reset a pooled context, closing it: {self.reset_error}", level="warning")
+                self._close(context)
+                continue
+            self.reset_ms += (time.perf_counter() - start) * 1000
+            self.hits += 1
+            self.uses[context] += 1
+            return context
+
+        start = time.perf_counter()
+        context = self.browser.new_context(**self.context_args, storage_state=storage_state)
+        context.new_page()
+        self.warmup_ms += (time.perf_counter() - start) * 1000
+        self.misses += 1
+        self.uses[context] = 1
+        return context
+
+    def release(self, context, reusable=True):
+        """
+        Give a context back; it is kept for the next test unless it is not
+        reusable (e.g. its test failed), has reached max_reuse or the pool is full
+        """
+        if context not in self.uses:
+            return
+        if (not reusable or context.is_closed() or self.uses[context] >= self.max_reuse
+                or len(self.idle) >= self.size):
+            self._close(context)
+            return
+        self.idle.append(context)
+
+    def discard(self, context):
+        """Close a context instead of returning it to the pool"""
+        self._close(context)
+
+    def close(self):
+        """Close every idle context (call before the browser closes)"""
+        while self.idle:
+            self._close(self.idle.pop())
+
+    def _close(self, context):
+        self.uses.pop(context, None)
+        self.retired += 1
+        try:
+            context.close()
+        except Exception:
+            pass
+
+    @classmethod
+    def _reset(cls, context, storage_state):
+        pages = context.pages
+        for page in pages[1:]:
+            page.close()
+        page = pages[0] if pages and not pages[0].is_closed() else context.new_page()
+        context.unroute_all(behavior="ignoreErrors")
+        context.clear_permissions()
+        context.set_extra_http_headers({})
+        context.set_offline(False)
+        if hasattr(context, "set_storage_state"):
+            context.set_storage_state(storage_state or EMPTY_STORAGE_STATE)
+        else:
+            cls._restore_storage(context, page, storage_state or EMPTY_STORAGE_STATE)
+        page.goto("about:blank")
+
+    @staticmethod
+    def _restore_storage(context, page, storage_state):
+        """
+        set_storage_state() for Playwright before 1.59: cookies through the
+        context, then localStorage origin by origin (both the origins the last
+        test used and the ones to restore) on a blank document served by a route
+        """
+        local_storage = {entry["origin"]: entry.get("localStorage", []) for entry in storage_state["origins"]}
+        used = [entry["origin"] for entry in context.storage_state()["origins"]]
+        context.clear_cookies()
+        if storage_state["cookies"]:
+            context.add_cookies(storage_state["cookies"])
+
+        def _blank(route):
+            route.fulfill(body="<html></html>", content_type="text/html")
+
+        for origin in dict.fromkeys(used + list(local_storage)):
+            url = re.compile(f"^{re.escape(origin)}/")
+            page.route(url, _blank)
+            try:
+                page.goto(f"{origin}/")
+                page.evaluate(RESTORE_LOCAL_STORAGE, local_storage.get(origin, []))
+            finally:
+                page.unroute(url, _blank)
+
+    def export(self):
+        """Raw counters of the pool, to be combined across processes with merge_counters()"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "retired": self.retired,
+            "warmup_ms": self.warmup_ms,
+            "reset_ms": self.reset_ms,
+            "reset_failures": self.reset_failures,
+            "reset_error": self.reset_error,
+        }
+
+    def stats(self):
+        return pool_stats(self.export())
+
+    def report(self):
+        """Return a printable summary of the pool metrics"""
+        return format_report(self.export())
+
+
+def merge_counters(total, counters):
+    """
+    Add the exported counters of one pool to a running total
+
+    Args:
+        total: Counters merged so far, or None for the first pool
+        counters: ContextPool.export() of another pool (e.g. of an xdist worker)
+    """
+    if total is None:
+        return dict(counters)
+    merged = {key: total[key] + counters[key]
+              for key in ("hits", "misses", "retired", "warmup_ms", "reset_ms", "reset_failures")}
+    merged["reset_error"] = counters["reset_error"] or total["reset_error"]
+    return merged
+
+
+def pool_stats(counters):
+    """Hit rate and mean warm-up / reset times of exported pool counters"""
+    hits, misses = counters["hits"], counters["misses"]
+    requests = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / requests, 3) if requests else 0.0,
+        "retired": counters["retired"],
+        "warmup_ms_total": round(counters["warmup_ms"], 1),
+        "warmup_ms_mean": round(counters["warmup_ms"] / misses, 1) if misses else 0.0,
+        "reset_ms_mean": round(counters["reset_ms"] / hits, 1) if hits else 0.0,
+        "reset_failures": counters["reset_failures"],
+        "reset_error": counters["reset_error"],
+    }
+
+
+def format_report(counters):
+    """Return a printable summary of exported pool counters"""
+    stats = pool_stats(counters)
+    report = (f"contexts: {stats['hits']} reused / {stats['misses']} created "
+              f"(hit rate {stats['hit_rate']:.0%}), {stats['retired']} closed\n"
+              f"warm-up: {stats['warmup_ms_mean']:.1f}ms per new context "
+              f"({stats['warmup_ms_total']:.0f}ms total), reset: {stats['reset_ms_mean']:.1f}ms per reuse")
+    if stats["reset_failures"]:
+        report += (f"\nreset failed {stats['reset_failures']} time(s), contexts were closed instead of "
+                   f"reused: {stats['reset_error']}")
+    return report
@@ -4,6 +4,7 @@ Run this script to see all available controls in the PingID window
 This helps identify correct control names if automation fails
 """
 
+import sys
 import time
 from pingid_automation import PingIDAutomation
 
@@ -38,12 +39,13 @@ def main():
 
     # Print window information
     print("\n[3/3] Inspecting window controls...")
-    pingid.print_window_info()
+    pingid.inspect_window(full="--full" in sys.argv)
 
     print("\n" + "=" * 60)
     print("Inspection complete!")
-    print("Use the control identifiers above to update pingid_automation.py")
-    print("if the automation is not working correctly.")
+    print("Use the control identifiers above to update PINGID_LOCATORS in")
+    print("pingid_automation.py for any locator reported as MISS.")
+    print("Later runs only list changed controls (--full prints the whole tree).")
     print("=" * 60)
 
 
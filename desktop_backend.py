@@ -0,0 +1,344 @@
+"""
+Desktop Automation Backends
+A thin interface over the desktop calls the PingID and Calculator flows
+need (launch, find window, child lookup, click, type_keys, read text,
+clipboard), implemented by pywinauto on Windows and by an in-memory fake
+driven by recorded control trees everywhere else
+
+Recorded trees are JSON:
+    {"exe": "PingID.exe", "title": "PingID", "control_type": "Window",
+     "children": [{"control_type": "Edit", "auto_id": "JavaFX42"},
+                  {"control_type": "Button", "title": "Next", "auto_id": "JavaFX49",
+                   "on_click": [{"target": "JavaFX32", "set": {"enabled": true}}]}]}
+
+on_click actions: {"target": <auto_id or title>, "set": {...}} updates a node
+("{code}" in a value becomes a fresh 6 digit code), {"clipboard_from": <auto_id>}
+copies a node's text to the fake clipboard, {"close": true} closes the window
+"""
+
+import copy
+import json
+import ntpath
+import os
+import re
+import subprocess
+import sys
+from itertools import count
+
+try:
+    from config import DESKTOP_CONFIG
+except ImportError:
+    DESKTOP_CONFIG = {}
+
+
+TREES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "desktop_trees")
+
+
+class PywinautoBackend:
+    """Backend for real desktop apps through pywinauto's UIA backend"""
+
+    name = "uia"
+
+    def __init__(self):
+        from pywinauto import Desktop
+        self.desktop = Desktop(backend="uia")
+
+    def launch(self, path):
+        """Start an application and return its process handle"""
+        return subprocess.Popen(path)
+
+    def windows(self, process_id=None):
+        """Return top-level windows, optionally only those owned by a process"""
+        if process_id is None:
+            return self.desktop.windows()
+        return self.desktop.windows(process=process_id)
+
+    def window(self, **criteria):
+        """Return a lazy top-level window specification"""
+        return self.desktop.window(**criteria)
+
+    def connect(self, handle):
+        """Attach to a window by handle; the result has top_window()"""
+        from pywinauto import Application
+        return Application(backend="uia").connect(handle=handle)
+
+    def read_clipboard(self):
+        import pyperclip
+        return pyperclip.paste()
+
+
+class ElementNotFound(LookupError):
+    """Raised when a fake lookup matches no control"""
+
+
+def _matches(element, criteria):
+    for key, value in criteria.items():
+        if key == "found_index":
+            continue
+        if key == "title_re":
+            if not re.match(value, element.title):
+                return False
+        elif getattr(element, key, None) != value:
+            return False
+    return True
+
+
+class FakeSpec:
+    """Lazy lookup mirroring pywinauto's WindowSpecification"""
+
+    def __init__(self, candidates, criteria):
+        self._candidates = candidates
+        self._criteria = criteria
+
+    def wrapper_object(self):
+        matches = [element for element in self._candidates() if _matches(element, self._criteria)]
+        index = self._criteria.get("found_index", 0)
+        if index >= len(matches):
+            raise ElementNotFound(f"No control matching {self._criteria}")
+        return matches[index]
+
+    def exists(self, timeout=None, retry_interval=None):
+        try:
+            return self.wrapper_object().exists()
+        except ElementNotFound:
+            return False
+
+    def __getattr__(self, name):
+        return getattr(self.wrapper_object(), name)
+
+
+class FakeElement:
+    """A control of a recorded tree"""
+
+    _handles = count(1000)
+
+    def __init__(self, node, backend, process_id, parent=None):
+        self.backend = backend
+        self.pid = process_id
+        self.parent = parent
+        self.handle = next(self._handles)
+        self.title = node.get("title", "")
+        self.auto_id = node.get("auto_id", "")
+        self.control_type = node.get("control_type", "Custom")
+        self.class_name = node.get("class_name", "")
+        self.enabled = node.get("enabled", True)
+        self.visible = node.get("visible", True)
+        self.on_click = node.get("on_click", [])
+        self.closed = False
+        self.child_elements = [FakeElement(child, backend, process_id, self) for child in node.get("children", [])]
+
+    @property
+    def root(self):
+        return self.parent.root if self.parent else self
+
+    # Lookup
+
+    def child_window(self, **criteria):
+        return FakeSpec(self.descendants, criteria)
+
+    def children(self):
+        return [child for child in self.child_elements if child.visible]
+
+    def descendants(self, **criteria):
+        found = []
+        for child in self.children():
+            if _matches(child, criteria):
+                found.append(child)
+            found.extend(child.descendants(**criteria))
+        return found
+
+    def find(self, key):
+        """Find a descendant (or self) by auto_id or title, including hidden ones"""
+        if key in (self.auto_id, self.title):
+            return self
+        for child in self.child_elements:
+            element = child.find(key)
+            if element is not None:
+                return element
+        return None
+
+    def wrapper_object(self):
+        return self
+
+    # State
+
+    def window_text(self):
+        return self.title
+
+    def exists(self, timeout=None, retry_interval=None):
+        return self.visible and not self.root.closed
+
+    def is_enabled(self):
+        return self.enabled
+
+    def is_visible(self):
+        return self.visible
+
+    def process_id(self):
+        return self.pid
+
+    # Actions
+
+    def set_focus(self):
+        self.backend.focused = self
+        return self
+
+    def click(self):
+        self.backend.clicks += 1
+        for action in self.on_click:
+            self.backend.run_action(self.root, action)
+
+    click_input = click
+    invoke = click
+
+    def type_keys(self, keys, with_spaces=False, pause=None, **kwargs):
+        text = re.sub(r"\{[^}]*\}", "", keys)
+        if not with_spaces:
+            text = text.replace(" ", "")
+        self.title += text
+        self.backend.keystrokes += len(text)
+
+    def close(self):
+        self.root.closed = True
+
+    def top_window(self):
+        return self.root
+
+    def print_control_identifiers(self, depth=None, filename=None):
+        lines = []
+
+        def _walk(element, level):
+            if depth is not None and level > depth:
+                return
+            lines.append(f"{'   ' * level}{element.control_type} - '{element.title}'"
+                         f"    auto_id=\"{element.auto_id}\"")
+            for child in element.children():
+                _walk(child, level + 1)
+
+        _walk(self, 0)
+        output = "\n".join(lines)
+        if filename:
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(output)
+        else:
+            print(output)
+
+
+class FakeProcess:
+    """Popen-like handle returned by FakeBackend.launch; it 'exits' once its windows are closed"""
+
+    def __init__(self, pid, backend):
+        self.pid = pid
+        self.backend = backend
+
+    def poll(self):
+        return None if self.backend.windows(process_id=self.pid) else 0
+
+
+class FakeApplication:
+    def __init__(self, window):
+        self.window = window
+
+    def top_window(self):
+        return self.window
+
+
+class FakeBackend:
+    """In-memory desktop driven by recorded control trees"""
+
+    name = "fake"
+
+    def __init__(self, trees=None):
+        """
+        Initialize the fake desktop
+
+        Args:
+            trees: Recorded tree dicts or JSON paths (optional, defaults to DESKTOP_CONFIG
+                   "fake_trees", else every file in desktop_trees/)
+        """
+        if trees is None:
+            trees = DESKTOP_CONFIG.get("fake_trees") or sorted(
+                os.path.join(TREES_DIR, name) for name in os.listdir(TREES_DIR) if name.endswith(".json"))
+        self.trees = {}
+        for tree in trees:
+            if isinstance(tree, str):
+                with open(tree, "r", encoding="utf-8") as f:
+                    tree = json.load(f)
+            self.trees[tree["exe"].lower()] = tree
+        self.open_windows = []
+        self.clipboard = ""
+        self.focused = None
+        self.clicks = 0
+        self.keystrokes = 0
+        self._pids = count(4000)
+        self._codes = count(100000)
+
+    def next_code(self):
+        return str(next(self._codes) % 1000000).zfill(6)
+
+    def launch(self, path):
+        """'Start' the recorded app whose exe name matches the path"""
+        # ntpath splits on both separators: configured paths are Windows paths
+        tree = self.trees.get(ntpath.basename(path).lower())
+        if tree is None:
+            raise FileNotFoundError(f"No recorded tree for {path}")
+        process = FakeProcess(next(self._pids), self)
+        self.open_windows.append(FakeElement(copy.deepcopy(tree), self, process.pid))
+        return process
+
+    def windows(self, process_id=None):
+        return [window for window in self.open_windows
+                if not window.closed and (process_id is None or window.pid == process_id)]
+
+    def window(self, **criteria):
+        return FakeSpec(self.windows, criteria)
+
+    def connect(self, handle):
+        for window in self.windows():
+            if window.handle == handle:
+                return FakeApplication(window)
+        raise ElementNotFound(f"No window with handle {handle}")
+
+    def read_clipboard(self):
+        return self.clipboard
+
+    def run_action(self, root, action):
+        if action.get("close"):
+            root.close()
+            return
+        if "clipboard_from" in action:
+            self.clipboard = root.find(action["clipboard_from"]).title
+            return
+        target = root.find(action["target"])
+        code = self.next_code()
+        for key, value in action.get("set", {}).items():
+            if isinstance(value, str):
+                value = value.replace("{code}", code)
+            setattr(target, key, value)
+
+
+_backends = {}
+_selected = None
+
+
+def select_backend(name):
+    """Make `name` the default backend of this process (pytest --desktop-backend), None to unset"""
+    global _selected
+    _selected = name
+
+
+def backend_name():
+    """
+    Configured backend: select_backend(), DESKTOP_BACKEND env var, DESKTOP_CONFIG,
+    or uia on Windows / fake elsewhere
+    """
+    return (_selected or os.environ.get("DESKTOP_BACKEND") or DESKTOP_CONFIG.get("backend")
+            or ("uia" if sys.platform == "win32" else "fake"))
+
+
+def get_backend(name=None):
+    """Return the shared backend instance for a name (defaults to backend_name())"""
+    name = name or backend_name()
+    if name not in _backends:
+        _backends[name] = PywinautoBackend() if name == "uia" else FakeBackend()
+    return _backends[name]
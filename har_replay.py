@@ -0,0 +1,135 @@
+"""
+HAR Record and Replay
+Record mode captures each browser test's traffic to a HAR file (Playwright
+route_from_har with update=True) together with the MFA codes PingID
+produced; replay mode serves the responses from the HAR and substitutes
+PingID with a provider returning the recorded codes, so a login runs
+offline, deterministically and at local-disk speed
+
+    pytest FileroomLogin.py --har record     # once, against the live hosts with PingID
+    pytest FileroomLogin.py --har replay     # afterwards, no network or PingID needed
+"""
+
+import json
+import os
+import re
+
+from retry import FatalError
+
+try:
+    from config import HAR_CONFIG
+except ImportError:
+    HAR_CONFIG = {}
+
+
+MODES = ("off", "record", "replay")
+
+
+def har_paths(name, har_dir=None):
+    """
+    Return the HAR file and the recorded MFA codes file of a flow
+
+    Args:
+        name: Flow name, e.g. "FileroomLogin-test_fileroomLogin"
+        har_dir: Directory of the recordings (optional, defaults to HAR_CONFIG "dir", else "har")
+    """
+    har_dir = har_dir or HAR_CONFIG.get("dir", "har")
+    name = re.sub(r"[^\w.-]+", "_", name)
+    return os.path.join(har_dir, f"{name}.har"), os.path.join(har_dir, f"{name}.mfa.json")
+
+
+def record(context, har_path):
+    """Record the context's traffic; Playwright writes the HAR when the context closes"""
+    directory = os.path.dirname(har_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    context.route_from_har(har_path, url=HAR_CONFIG.get("url"), update=True,
+                           update_content="embed", update_mode=HAR_CONFIG.get("update_mode", "minimal"))
+
+
+def replay(context, har_path):
+    """
+    Serve the context's requests from a recorded HAR
+
+    Requests missing from the HAR are aborted (HAR_CONFIG "not_found": "abort"),
+    or sent to the network with "fallback".
+
+    Raises:
+        FileNotFoundError: If the flow was never recorded
+    """
+    if not os.path.exists(har_path):
+        raise FileNotFoundError(f"No HAR recorded at {har_path} (run with --har record first)")
+    context.route_from_har(har_path, url=HAR_CONFIG.get("url"), not_found=HAR_CONFIG.get("not_found", "abort"))
+
+
+class RecordingMFAProvider:
+    """Wraps an MFA provider and remembers every code it returned, for replay"""
+
+    def __init__(self, provider, codes_path):
+        self.provider = provider
+        self.codes_path = codes_path
+        self.just_in_time = getattr(provider, "just_in_time", False)
+        self.codes = []
+
+    def __call__(self):
+        code = self.provider()
+        self.codes.append(code)
+        return code
+
+    def invalidate(self):
+        invalidate = getattr(self.provider, "invalidate", None)
+        if invalidate is not None:
+            invalidate()
+
+    def save(self):
+        if not self.codes:
+            return
+        directory = os.path.dirname(self.codes_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.codes_path, "w", encoding="utf-8") as f:
+            json.dump(self.codes, f, indent=2)
+
+
+class RecordedCodesExhausted(FatalError):
+    """Raised when a replayed flow asks for more MFA codes than were recorded"""
+
+
+class ReplayMFAProvider:
+    """
+    Stands in for PingID during replay: returns the recorded codes in order,
+    since the replayed passcode POST only matches the HAR with the same code
+    """
+
+    just_in_time = True
+
+    def __init__(self, codes_path):
+        self.codes_path = codes_path
+        try:
+            with open(codes_path, "r", encoding="utf-8") as f:
+                self.codes = json.load(f)
+        except (OSError, ValueError):
+            self.codes = []
+        self.calls = 0
+
+    def __call__(self):
+        """
+        Return the next recorded code (HAR_CONFIG "default_code" if no codes were recorded)
+
+        Raises:
+            RecordedCodesExhausted: If every recorded code was already used
+        """
+        self.calls += 1
+        if not self.codes:
+            return HAR_CONFIG.get("default_code", "000000")
+        if self.calls > len(self.codes):
+            raise RecordedCodesExhausted(
+                f"Replay needs MFA code #{self.calls} but {self.codes_path} recorded {len(self.codes)}; "
+                f"the flow changed since it was recorded (run with --har record again)")
+        return self.codes[self.calls - 1]
+
+    def invalidate(self):
+        pass
+
+    def close(self):
+        pass
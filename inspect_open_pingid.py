@@ -3,6 +3,7 @@ Inspect an already-open PingID window
 Run this AFTER manually opening PingID.exe
 """
 
+import sys
 import time
 from pingid_automation import PingIDAutomation
 
@@ -33,7 +34,7 @@ def main():
     print("\n[2/2] Inspecting controls...")
     print("=" * 70)
 
-    pingid.print_window_info()
+    pingid.inspect_window(full="--full" in sys.argv)
 
     print("\n" + "=" * 70)
     print("✅ Inspection Complete!")
@@ -45,7 +46,8 @@ def main():
     print("\nNext steps:")
     print("  1. Find the Edit control for PIN input")
     print("  2. Find Button controls for 'Next' and 'Copy'")
-    print("  3. Update pingid_automation.py with correct identifiers")
+    print("  3. Update PINGID_LOCATORS in pingid_automation.py for any locator reported as MISS")
+    print("\nLater runs only list the controls that changed (--full prints the whole tree)")
 
 
 if __name__ == "__main__":
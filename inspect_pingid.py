@@ -3,6 +3,7 @@ Automatic PingID window inspector - No user input required
 Launches PingID and displays all controls
 """
 
+import sys
 import time
 from pingid_automation import PingIDAutomation
 
@@ -31,14 +32,15 @@ def main():
     # Print window information
     print("\n[3/3] Inspecting window controls...")
     print("=" * 60)
-    pingid.print_window_info()
+    pingid.inspect_window(full="--full" in sys.argv)
     print("=" * 60)
 
     print("\n Inspection complete!")
     print("\nLook for controls with these types:")
     print("  - Edit (for PIN input)")
     print("  - Button (for Next and Copy buttons)")
-    print("\nUse the control identifiers to update pingid_automation.py")
+    print("\nUse the control identifiers to update PINGID_LOCATORS for any locator reported as MISS")
+    print("Later runs only list changed controls (--full prints the whole tree)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,286 @@
+"""
+Step Instrumentation
+Nested context-manager spans with monotonic timing and attributes, plus
+events that replace print() tracing; finished spans go to exporters
+(JSON lines, Allure steps, session summary table)
+
+    with span("pingid.enter_pin", keystrokes=4) as s:
+        ...
+        s.set(strategy="auto_id")
+        event("Clicked Next button")
+"""
+
+import asyncio
+import contextvars
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from config import INSTRUMENTATION_CONFIG
+except ImportError:
+    INSTRUMENTATION_CONFIG = {}
+
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40, "off": 100}
+
+
+class Span:
+    """One timed step"""
+
+    __slots__ = ("name", "attributes", "parent", "depth", "started_at", "start", "end", "status", "error", "events")
+
+    def __init__(self, name, attributes, parent):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.end = None
+        self.status = "ok"
+        self.error = None
+        self.events = []
+
+    @property
+    def duration_ms(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def set(self, **attributes):
+        """Add or update attributes while the span is running"""
+        self.attributes.update(attributes)
+        return self
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "parent": self.parent.name if self.parent else None,
+            "depth": self.depth,
+            "started_at": round(self.started_at, 6),
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+class JsonLinesExporter:
+    """Appends one JSON object per finished span to a file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def on_start(self, span):
+        pass
+
+    def on_end(self, span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+def _on_test_thread():
+    """True on the main thread outside asyncio tasks, where Allure steps nest predictably"""
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    try:
+        return asyncio.current_task() is None
+    except RuntimeError:
+        return True
+
+
+class AllureExporter:
+    """
+    Mirrors spans as Allure steps; attributes known at start become step
+    parameters. Spans of background threads and concurrent asyncio tasks are
+    skipped so they cannot interleave with the test's step tree.
+    """
+
+    def __init__(self):
+        self._steps = threading.local()
+
+    def on_start(self, span):
+        if not _on_test_thread():
+            return
+        from allure_commons._allure import StepContext
+        step = StepContext(span.name, {key: str(value) for key, value in span.attributes.items()})
+        step.__enter__()
+        self._stack().append(step)
+
+    def on_end(self, span):
+        if not _on_test_thread():
+            return
+        step = self._stack().pop()
+        error = span.error
+        step.__exit__(type(error) if error else None, error, error.__traceback__ if error else None)
+
+    def _stack(self):
+        if not hasattr(self._steps, "stack"):
+            self._steps.stack = []
+        return self._steps.stack
+
+    def close(self):
+        pass
+
+
+class SummaryExporter:
+    """Aggregates durations per span name for an end-of-session table"""
+
+    def __init__(self, max_samples=1000):
+        self.max_samples = max_samples
+        self.durations = {}
+        self.failures = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span):
+        pass
+
+    def on_end(self, span):
+        with self._lock:
+            values = self.durations.setdefault(span.name, [])
+            values.append(span.duration_ms)
+            del values[:-self.max_samples]
+            if span.status != "ok":
+                self.failures[span.name] = self.failures.get(span.name, 0) + 1
+
+    def export(self):
+        """Durations and failure counts, to merge into another process's summary (xdist)"""
+        with self._lock:
+            return {"durations": {name: list(values) for name, values in self.durations.items()},
+                    "failures": dict(self.failures)}
+
+    def merge(self, data):
+        """Add the spans exported by another process"""
+        with self._lock:
+            for name, values in data.get("durations", {}).items():
+                merged = self.durations.setdefault(name, [])
+                merged.extend(values)
+                del merged[:-self.max_samples]
+            for name, count in data.get("failures", {}).items():
+                self.failures[name] = self.failures.get(name, 0) + count
+
+    def table(self):
+        """Return a printable per-span summary, slowest total first"""
+        from timeouts import percentile
+        if not self.durations:
+            return ""
+        rows = sorted(self.durations.items(), key=lambda item: -sum(item[1]))
+        width = max(len(name) for name, _ in rows)
+        lines = [f"{'span':<{width}} {'count':>6} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'fail':>5}"]
+        for name, values in rows:
+            lines.append(f"{name:<{width}} {len(values):>6} {sum(values):>10.1f} {sum(values) / len(values):>9.1f}"
+                         f" {percentile(values, 95):>9.1f} {self.failures.get(name, 0):>5}")
+        return "\n".join(lines)
+
+    def close(self):
+        pass
+
+
+class Tracer:
+    """Creates spans, tracks nesting per thread / asyncio task and feeds the exporters"""
+
+    def __init__(self, exporters=None, echo_level=None):
+        """
+        Initialize the tracer
+
+        Args:
+            exporters: Objects with on_start(span), on_end(span) and close()
+            echo_level: Events at or above this level are also written to stdout
+                        (defaults to INSTRUMENTATION_CONFIG "echo_level", else "error")
+        """
+        self.exporters = list(exporters or [])
+        self.echo_level = LEVELS[echo_level or INSTRUMENTATION_CONFIG.get("echo_level", "error")]
+        self._stack = contextvars.ContextVar(f"spans-{id(self)}", default=())
+
+    def add_exporter(self, exporter):
+        self.exporters.append(exporter)
+        return exporter
+
+    def remove_exporter(self, exporter):
+        if exporter in self.exporters:
+            self.exporters.remove(exporter)
+
+    @property
+    def current(self):
+        stack = self._stack.get()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time the enclosed block as a (possibly nested) span"""
+        stack = self._stack.get()
+        current = Span(name, attributes, stack[-1] if stack else None)
+        self._stack.set(stack + (current,))
+        for exporter in self.exporters:
+            exporter.on_start(current)
+        try:
+            yield current
+        except BaseException as e:
+            current.status = f"{type(e).__name__}: {e}"
+            current.error = e
+            raise
+        finally:
+            current.end = time.perf_counter()
+            self._stack.set(stack)
+            for exporter in reversed(self.exporters):
+                exporter.on_end(current)
+
+    def event(self, message, level="info", **attributes):
+        """Record a message on the current span, echoing it if its level is high enough"""
+        current = self.current
+        if current is not None:
+            current.events.append({"t_ms": round(current.duration_ms, 3), "level": level,
+                                   "message": message, **attributes})
+        if LEVELS.get(level, 20) >= self.echo_level:
+            prefix = f"[{current.name}] " if current is not None else ""
+            print(f"{prefix}{message}", file=sys.stdout)
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+        self.exporters = []
+
+
+_tracer = None
+
+
+def get_tracer():
+    """Return the process-wide tracer (Allure + summary exporters, JSON lines when configured)"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer([AllureExporter(), SummaryExporter()])
+        if INSTRUMENTATION_CONFIG.get("jsonl_file"):
+            _tracer.add_exporter(JsonLinesExporter(INSTRUMENTATION_CONFIG["jsonl_file"]))
+    return _tracer
+
+
+def span(name, **attributes):
+    """Shortcut for get_tracer().span()"""
+    return get_tracer().span(name, **attributes)
+
+
+def event(message, level="info", **attributes):
+    """Shortcut for get_tracer().event()"""
+    get_tracer().event(message, level, **attributes)
+
+
+def summary_exporter():
+    """The tracer's SummaryExporter, or None if it was removed"""
+    for exporter in get_tracer().exporters:
+        if isinstance(exporter, SummaryExporter):
+            return exporter
+    return None
+
+
+def summary_table():
+    """Summary of the spans finished so far in this process (and merged from xdist workers)"""
+    exporter = summary_exporter()
+    return exporter.table() if exporter is not None else ""
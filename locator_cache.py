@@ -0,0 +1,139 @@
+"""
+Control Locator Cache
+Remembers which lookup strategy found each logical desktop control and
+tries it first on later runs; the cache is keyed by application version
+so an app update starts from a clean slate
+"""
+
+import json
+import os
+
+from waits import wait_until
+
+
+def executable_version(exe_path):
+    """
+    Return a version string for an executable
+
+    Uses the Windows file version resource when available, otherwise the
+    file size and modification time, so an upgraded binary gets a new key.
+    """
+    try:
+        import win32api
+        info = win32api.GetFileVersionInfo(exe_path, "\\")
+        ms, ls = info["FileVersionMS"], info["FileVersionLS"]
+        return f"{ms >> 16}.{ms & 0xFFFF}.{ls >> 16}.{ls & 0xFFFF}"
+    except Exception:
+        pass
+    try:
+        stat = os.stat(exe_path)
+        return f"{stat.st_size}-{int(stat.st_mtime)}"
+    except OSError:
+        return "unknown"
+
+
+class LocatorCache:
+    """On-disk map of app version -> logical control -> winning strategy name"""
+
+    def __init__(self, path, version):
+        """
+        Initialize the cache
+
+        Args:
+            path: JSON file the cache is stored in
+            version: Application version the entries apply to
+        """
+        self.path = path
+        self.version = version
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Entries for other versions are dropped on the next save
+        return data.get(self.version, {})
+
+    def get(self, control_name):
+        """Return the cached strategy name for a control, or None"""
+        return self._entries.get(control_name)
+
+    def record(self, control_name, strategy_name):
+        """Remember the strategy that found a control (persisted only on change)"""
+        if self._entries.get(control_name) == strategy_name:
+            return
+        self._entries[control_name] = strategy_name
+        self._save()
+
+    def invalidate(self, control_name):
+        """Forget the cached strategy for a control"""
+        if self._entries.pop(control_name, None) is not None:
+            self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({self.version: self._entries}, f, indent=2)
+        except OSError as e:
+            print(f"Could not write locator cache {self.path}: {str(e)}")
+
+
+class LocatorResolver:
+    """Resolves logical controls by trying lookup strategies, cached winner first"""
+
+    def __init__(self, strategies, cache=None):
+        """
+        Initialize the resolver
+
+        Args:
+            strategies: Dict of control name -> list of (strategy name, callable(root))
+                        where the callable returns the control or None
+            cache: LocatorCache to read and record winning strategies (optional)
+        """
+        self.strategies = strategies
+        self.cache = cache
+
+    def ordered_strategies(self, control_name):
+        """Return the strategies for a control with the cached winner first"""
+        strategies = list(self.strategies[control_name])
+        cached = self.cache.get(control_name) if self.cache else None
+        strategies.sort(key=lambda strategy: strategy[0] != cached)
+        return strategies
+
+    def find(self, root, control_name):
+        """
+        Try each strategy once
+
+        Returns:
+            The control, or None if no strategy found it
+        """
+        for strategy_name, locate in self.ordered_strategies(control_name):
+            try:
+                control = locate(root)
+            except Exception:
+                control = None
+            if control is not None:
+                if self.cache:
+                    self.cache.record(control_name, strategy_name)
+                return control
+        return None
+
+    def resolve(self, root, control_name, timeout, clock=None):
+        """
+        Wait until any strategy finds the control
+
+        Raises:
+            WaitTimeoutError: If no strategy finds the control within the timeout
+        """
+        try:
+            return wait_until(lambda: self.find(root, control_name), timeout,
+                              description=control_name, clock=clock)
+        except Exception:
+            if self.cache:
+                self.cache.invalidate(control_name)
+            raise
@@ -0,0 +1,120 @@
+"""
+Reusable SSO login flows used to build authenticated sessions
+Each target describes how to log in to an application and how to check
+that a cached session is still accepted
+"""
+
+from playwright.sync_api import Page, expect
+from session_cache import SessionCache
+from sso_pages import FileroomLoginPage, SCDLoginPage
+
+
+class AuthTarget:
+    """Describes an application that sits behind the SSO + PingID login"""
+
+    def __init__(self, name, base_url, check_url, login):
+        """
+        Initialize an auth target
+
+        Args:
+            name: Short name of the application (e.g. "fileroom")
+            base_url: URL the login flow starts from
+            check_url: Protected URL that only loads for an authenticated session
+            login: Callable taking a Page and performing the full login
+        """
+        self.name = name
+        self.base_url = base_url
+        self.check_url = check_url
+        self.login = login
+
+    @property
+    def host(self):
+        return SessionCache.host_for(self.base_url)
+
+    @property
+    def cache_key(self):
+        """Session cache / login lock key: targets can share a host (the stand-in serves both apps)"""
+        return f"{self.name}@{self.host}"
+
+    def is_authenticated(self, page: Page):
+        """
+        Check whether the page's context holds a session accepted by the target
+
+        Returns:
+            bool: True if the protected URL loads without a redirect to SSO
+        """
+        try:
+            page.goto(self.check_url)
+        except Exception:
+            return False
+        return page.url.startswith(self.check_url)
+
+
+def app_page(page_class, page: Page, urls=None, **page_args):
+    """
+    Create an app page object, pointed at other hosts when `urls` has
+    overrides for it
+
+    Args:
+        page_class: SSOLoginPage subclass
+        page: Playwright page to drive
+        urls: {page name: {attribute: URL}} overrides, e.g. standin_server.standin_urls() (optional)
+        page_args: Extra page object arguments (domain=..., location=...)
+    """
+    app = page_class(page, **page_args)
+    for attribute, url in (urls or {}).get(page_class.name, {}).items():
+        setattr(app, attribute, url)
+    return app
+
+
+def build_targets(urls=None, credentials=None, mfa_provider=None):
+    """
+    Build the Fileroom and SCD targets
+
+    Args:
+        urls: Page object URL overrides, as for app_page() (optional, defaults to the real hosts)
+        credentials: SSO credentials (optional, defaults to config.py SSO_CREDENTIALS at login time)
+        mfa_provider: Callable returning an MFA code (optional, defaults to PingID)
+
+    Returns:
+        dict: name -> AuthTarget
+    """
+    urls = urls or {}
+
+    def _credentials():
+        if credentials is not None:
+            return credentials
+        from config import SSO_CREDENTIALS
+        return SSO_CREDENTIALS
+
+    def fileroom_login(page: Page):
+        """Log in to Fileroom and select the Automation-01 domain"""
+        fileroom = app_page(FileroomLoginPage, page, urls, domain="Automation-01")
+        fileroom.login(_credentials(), mfa_provider=mfa_provider)
+        expect(page).to_have_url(fileroom.listing_url)
+
+    def scd_login(page: Page):
+        """Log in to SCD Dashboard and select the Test location"""
+        app_page(SCDLoginPage, page, urls, location="Test").login(_credentials(), mfa_provider=mfa_provider)
+
+    fileroom_urls = urls.get(FileroomLoginPage.name, {})
+    scd_urls = urls.get(SCDLoginPage.name, {})
+    targets = (
+        AuthTarget(
+            name="fileroom",
+            base_url=fileroom_urls.get("url", FileroomLoginPage.url),
+            check_url=fileroom_urls.get("listing_url", FileroomLoginPage.listing_url),
+            login=fileroom_login,
+        ),
+        AuthTarget(
+            name="scd",
+            base_url=scd_urls.get("url", SCDLoginPage.url),
+            check_url=scd_urls.get("home_url", SCDLoginPage.home_url),
+            login=scd_login,
+        ),
+    )
+    return {target.name: target for target in targets}
+
+
+# Fileroom production and SCD Dashboard QAT
+AUTH_TARGETS = build_targets()
@@ -0,0 +1,176 @@
+"""
+Pre-fetched MFA Codes
+Starts launching and connecting PingID in the background as soon as a test
+begins, so the desktop work overlaps the SSO navigation in the browser; the
+code itself is only generated when the passcode page is visible, keeping it
+well inside its validity window
+
+The cross-process PingID lock is only held for desktop work: the background
+warm-up runs only if PingID is free at that moment, and the code is read
+under the lock, reconnecting first if another worker used PingID meanwhile.
+
+    mfa = MFAPrefetch().start()         # at test start
+    ...                                 # browser navigates through SSO
+    code = mfa.result()                 # passcode page visible: generate now
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentation import event, span
+
+try:
+    from config import PINGID_CONFIG
+except ImportError:
+    PINGID_CONFIG = {}
+
+
+class MFAPrefetch:
+    """Future-style MFA provider; also callable, so it can be passed as an mfa_provider"""
+
+    # Tells SSOLoginPage.complete_mfa to wait for the passcode page before asking for the code
+    just_in_time = True
+
+    def __init__(self, pingid=None, validity=None, use_service=True):
+        """
+        Initialize the prefetch
+
+        Args:
+            pingid: PingIDAutomation to drive (optional, created on the worker thread)
+            validity: Seconds a generated code may be reused (optional, defaults to
+                      PINGID_CONFIG "code_validity", else 30)
+            use_service: Use a running PingID service instead of local PingID when available
+        """
+        self.pingid = pingid
+        self.validity = validity or PINGID_CONFIG.get("code_validity", 30)
+        self.use_service = use_service
+        self.mode = None
+        self._code = None
+        self._code_at = None
+        # One thread: every PingID (UIA) call happens on the same thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mfa-prefetch")
+        self._prepared = None
+
+    def start(self):
+        """Begin preparing PingID in the background; returns self"""
+        if self._prepared is None:
+            self._prepared = self._executor.submit(self._prepare)
+        return self
+
+    def ready(self):
+        """True once preparation finished (PingID warmed up if it was free, or the service was found)"""
+        return self._prepared is not None and self._prepared.done() and self._prepared.result()
+
+    def result(self, timeout=None):
+        """
+        Return a valid MFA code, generating it now unless a code produced less
+        than `validity` seconds ago is still available
+
+        Args:
+            timeout: Seconds to wait for preparation and the code (optional)
+
+        Returns:
+            str: The MFA code, or None if PingID could not produce one
+        """
+        if self._code is not None:
+            if time.monotonic() - self._code_at < self.validity:
+                return self._code
+            # Expired: PingID was closed after the last code, prepare it again
+            self._code, self._prepared = None, None
+        self.start()
+        with span("mfa.result", mode=self.mode or "pending") as step:
+            waited = time.monotonic()
+            prepared = self._prepared.result(timeout)
+            step.set(waited_for_prepare_ms=round((time.monotonic() - waited) * 1000, 1))
+            if not prepared:
+                event("PingID could not be prepared", level="error")
+                return None
+            code = self._executor.submit(self._produce).result(timeout)
+        if code:
+            self._code, self._code_at = code, time.monotonic()
+        return code
+
+    __call__ = result
+
+    def invalidate(self):
+        """Drop the last code (e.g. it was rejected) so the next result() generates a new one"""
+        if self._prepared is not None:
+            self._executor.submit(self._invalidate).result()
+
+    def close(self):
+        """Close a PingID window this prefetch opened if the code was never requested"""
+        if self._prepared is not None:
+            self._executor.submit(self._discard)
+        self._executor.shutdown(wait=True)
+
+    # Worker thread
+
+    def _prepare(self):
+        with span("mfa.prefetch") as step:
+            if self.use_service:
+                from pingid_service import service_available
+                if service_available():
+                    self.mode = "service"
+                    step.set(mode=self.mode)
+                    return True
+
+            from pingid_automation import PingIDAutomation, pingid_lock
+            self.mode = "local"
+            step.set(mode=self.mode)
+            try:
+                if self.pingid is None:
+                    self.pingid = PingIDAutomation()
+            except Exception as e:
+                event(f"Error preparing PingID: {str(e)}", level="error")
+                return False
+            self.pingid.timer.reset()
+
+            # Warm up only if no other worker is driving PingID; otherwise _produce
+            # launches and connects once it gets the lock
+            lock = pingid_lock()
+            if not lock.try_acquire():
+                step.set(warmed=False)
+                return True
+            try:
+                step.set(warmed=self.pingid.prepare())
+            except Exception as e:
+                event(f"Error warming up PingID: {str(e)}", level="warning")
+            finally:
+                lock.release()
+            return True
+
+    def _produce(self):
+        if self.mode == "service":
+            from pingid_service import request_mfa_code
+            return request_mfa_code()
+        from pingid_automation import pingid_lock
+        try:
+            with pingid_lock():
+                # No-op while the warmed-up window is still open
+                if not self.pingid.prepare():
+                    return None
+                return self.pingid.enter_pin_and_get_code()
+        except Exception as e:
+            event(f"Error reading the MFA code: {str(e)}", level="error")
+            return None
+
+    def _invalidate(self):
+        # Prepare again before the next code: PingID closes its window after each one
+        self._code = None
+        self._prepared = None
+
+    def _discard(self):
+        if self._code is not None or self.pingid is None:
+            return
+        from pingid_automation import pingid_lock
+        lock = pingid_lock()
+        # Busy: another worker is using the window now
+        if not lock.try_acquire():
+            return
+        try:
+            if self.pingid.is_connected():
+                self.pingid.app.top_window().close()
+        except Exception:
+            pass
+        finally:
+            lock.release()
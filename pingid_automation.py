@@ -3,199 +3,301 @@ PingID Desktop Automation Module
 Handles PingID.exe automation for MFA code retrieval
 """
 
-import time
-import subprocess
-import pyperclip
-from pywinauto import Application, Desktop
-from pywinauto.findwindows import ElementNotFoundError
-from config import PINGID_CONFIG
+import re
+import weakref
+
+from desktop_backend import get_backend
+from instrumentation import event, span
+from locator_cache import LocatorCache, LocatorResolver, executable_version
+from process_lock import FileLock, default_lock_path
+from waits import StepTimer, wait_until
+from window_watcher import WindowWatcher
+
+try:
+    from config import PINGID_CONFIG
+except ImportError:
+    PINGID_CONFIG = {}
+
+
+def _existing(dlg, **criteria):
+    """Return a child window specification if it currently exists, else None"""
+    spec = dlg.child_window(**criteria)
+    return spec if spec.exists(timeout=0) else None
+
+
+# Expected shape of an MFA code (spaces are ignored, e.g. "123 456")
+CODE_PATTERN = re.compile(PINGID_CONFIG.get("code_pattern", r"\d{6}"))
+
+
+# Code handed out last per desktop backend, by any PingIDAutomation of the process: PingID may
+# still show it when the next login asks (automate_pingid_mfa() creates an instance per call)
+_last_codes = weakref.WeakKeyDictionary()
+
+
+def _normalize_code(text):
+    return "".join(text.split())
+
+
+def _code_text(dlg):
+    """Return the Text element displaying the MFA code, else None"""
+    for control in dlg.descendants(control_type="Text"):
+        if CODE_PATTERN.fullmatch(_normalize_code(control.window_text())):
+            return control
+    return None
+
+
+def _resolved(control):
+    """Pin a child window specification to its element, so reading it again skips the lookup"""
+    wrapper_object = getattr(control, "wrapper_object", None)
+    return wrapper_object() if wrapper_object is not None else control
+
+
+def _first_descendant(dlg, **criteria):
+    """Return the first matching descendant (full UIA tree walk), else None"""
+    controls = dlg.descendants(**criteria)
+    return controls[0] if controls else None
+
+
+# Lookup strategies per logical control, in default order of preference
+PINGID_LOCATORS = {
+    "pin_input": [
+        ("edit_found_index_0", lambda dlg: _existing(dlg, control_type="Edit", found_index=0)),
+        ("auto_id_JavaFX42", lambda dlg: _existing(dlg, auto_id="JavaFX42", control_type="Edit")),
+        ("descendants_edit", lambda dlg: _first_descendant(dlg, control_type="Edit")),
+    ],
+    "next_button": [
+        ("title_Next", lambda dlg: _existing(dlg, title="Next", control_type="Button")),
+        ("auto_id_JavaFX49", lambda dlg: _existing(dlg, auto_id="JavaFX49", control_type="Button")),
+    ],
+    "copy_button": [
+        ("title_Copy", lambda dlg: _existing(dlg, title="Copy", control_type="Button")),
+        ("auto_id_JavaFX32", lambda dlg: _existing(dlg, auto_id="JavaFX32", control_type="Button")),
+    ],
+    "code_text": [
+        ("auto_id_JavaFX50", lambda dlg: _existing(dlg, auto_id="JavaFX50", control_type="Text")),
+        ("text_matching_code", _code_text),
+    ],
+}
+
+
+def _is_ready(control):
+    """True once a control exists and accepts input"""
+    exists = getattr(control, "exists", None)
+    if exists is not None and not exists(timeout=0):
+        return False
+    return control.is_enabled()
+
+
+def _clipboard_changed(backend, previous):
+    """Return the clipboard contents once they differ from `previous`"""
+    current = backend.read_clipboard()
+    if current and current != previous:
+        return current
+    return None
 
 
 class PingIDAutomation:
     """Automates PingID desktop application for MFA"""
 
-    def __init__(self, exe_path=None, pin=None, timeout=None):
+    def __init__(self, exe_path=None, pin=None, timeout=None, window_provider=None, clock=None, backend=None):
         """
         Initialize PingID automation
 
         Args:
-            exe_path: Path to PingID.exe (optional, defaults to config)
-            pin: PIN code (optional, defaults to config)
-            timeout: Wait timeout in seconds (optional, defaults to config)
+            exe_path: Path to PingID.exe (optional, defaults to config; required with the uia backend)
+            pin: PIN code (optional, defaults to config; required with the uia backend)
+            timeout: Wait timeout in seconds (optional, defaults to config, else 10)
+            window_provider: Window provider for the watcher (optional, defaults to the backend)
+            clock: Clock used by condition waits (optional, defaults to real time)
+            backend: Desktop backend (optional, defaults to desktop_backend.get_backend())
+
+        Raises:
+            ValueError: If the uia backend is used without an exe path or PIN
         """
-        self.exe_path = exe_path or PINGID_CONFIG["exe_path"]
-        self.pin = pin or PINGID_CONFIG["pin"]
-        self.timeout = timeout or PINGID_CONFIG["wait_timeout"]
+        self.backend = backend or get_backend()
+        self.exe_path = exe_path or PINGID_CONFIG.get("exe_path")
+        self.pin = pin or PINGID_CONFIG.get("pin")
+        if self.backend.name == "uia" and not (self.exe_path and self.pin):
+            raise ValueError("PINGID_CONFIG needs 'exe_path' and 'pin' to drive the real PingID app (see config.example.py)")
+        # The fake backend replays desktop_trees/pingid.json and accepts any PIN
+        self.exe_path = self.exe_path or "PingID.exe"
+        self.pin = self.pin or "0000"
+        self.timeout = timeout or PINGID_CONFIG.get("wait_timeout", 10)
         self.app = None
+        self.process = None
+        self.window_provider = window_provider
+        self._watcher = None
+        self.clock = clock
+        self.step_timeout = PINGID_CONFIG.get("step_timeout", 10)
+        self.keystroke_pause = PINGID_CONFIG.get("keystroke_pause", 0.02)
+        self.timer = StepTimer(budget=PINGID_CONFIG.get("mfa_budget"), clock=clock, prefix="pingid.")
+        self._locators = None
+        self.code_source = PINGID_CONFIG.get("code_source", "clipboard")
+
+    @property
+    def watcher(self):
+        """Window watcher used to discover the PingID window"""
+        if self._watcher is None:
+            self._watcher = WindowWatcher(self.window_provider or self.backend, clock=self.clock)
+        return self._watcher
+
+    @property
+    def last_code(self):
+        """The MFA code handed out last on this desktop, or None"""
+        return _last_codes.get(self.backend)
+
+    @last_code.setter
+    def last_code(self, code):
+        _last_codes[self.backend] = code
+
+    @property
+    def locators(self):
+        """Locator resolver for PingID controls, cached per PingID version"""
+        if self._locators is None:
+            cache = LocatorCache(PINGID_CONFIG.get("locator_cache", ".pingid_locators.json"),
+                                 executable_version(self.exe_path))
+            self._locators = LocatorResolver(PINGID_LOCATORS, cache)
+        return self._locators
 
     def launch_pingid(self):
         """Launch PingID application"""
         try:
-            print(f"Launching PingID from: {self.exe_path}")
-            subprocess.Popen(self.exe_path)
-            time.sleep(2)  # Wait for application to start
+            event(f"Launching PingID from: {self.exe_path}")
+            self.process = self.backend.launch(self.exe_path)
             return True
         except Exception as e:
-            print(f"Error launching PingID: {str(e)}")
+            event(f"Error launching PingID: {str(e)}", level="error")
             return False
 
     def connect_to_pingid_window(self):
         """Connect to the PingID application window"""
         try:
-            # Wait for PingID window to appear
-            for attempt in range(self.timeout):
-                try:
-                    # Try to find PingID window by title (adjust title if needed)
-                    desktop = Desktop(backend="uia")
-                    windows = desktop.windows()
-
-                    # Find PingID window (you may need to adjust the window title)
-                    pingid_window = None
-                    for window in windows:
-                        window_text = window.window_text()
-                        if "PingID" in window_text or "Ping" in window_text:
-                            pingid_window = window
-                            break
-
-                    if pingid_window:
-                        self.app = Application(backend="uia").connect(handle=pingid_window.handle)
-                        print(f"Connected to PingID window: {window_text}")
-                        return True
-
-                    time.sleep(1)
-                except ElementNotFoundError:
-                    time.sleep(1)
-                    continue
-
-            print("PingID window not found within timeout period")
+            # Resolve the window as soon as it appears, preferring the launched process
+            window = self.watcher.wait_for_window(self.timeout, process=self.process)
+
+            if window:
+                self.app = self.backend.connect(window.handle)
+                event(f"Connected to PingID window: {window.window_text()}")
+                return True
+
+            event("PingID window not found within timeout period", level="error")
             return False
 
         except Exception as e:
-            print(f"Error connecting to PingID window: {str(e)}")
+            event(f"Error connecting to PingID window: {str(e)}", level="error")
             return False
 
-    def enter_pin_and_get_code(self):
+    def enter_pin_and_get_code(self, close_window=True):
         """
         Enter PIN in PingID and retrieve the MFA code
 
+        Args:
+            close_window: Close the PingID window afterwards (False keeps it warm)
+
         Returns:
             str: The MFA code copied from PingID, or None if failed
         """
         try:
-            # Wait for window to fully load
-            time.sleep(1)
-
             # Get the main window
             dlg = self.app.top_window()
 
-            # Find and fill the PIN input field - try multiple methods
-            print("Looking for PIN input field...")
-            pin_input = None
+            with self.timer.step("load_window"):
+                # Find the PIN input field, trying the last winning strategy first
+                event("Looking for PIN input field...")
+                pin_input = self._locate(dlg, "pin_input")
 
-            # Method 1: Try by found_index (most reliable - gets first Edit control)
-            try:
-                pin_input = dlg.child_window(control_type="Edit", found_index=0)
-                print("Found PIN input by found_index")
-            except Exception as e1:
-                print(f"Method 1 failed: {str(e1)}")
+                # Wait for the window to finish loading instead of sleeping
+                self._wait(lambda: _is_ready(pin_input), "PIN input ready")
 
-                # Method 2: Try by auto_id
+            # Enter the PIN
+            with self.timer.step("enter_pin"):
                 try:
-                    pin_input = dlg.child_window(auto_id="JavaFX42", control_type="Edit")
-                    print("Found PIN input by auto_id")
-                except Exception as e2:
-                    print(f"Method 2 failed: {str(e2)}")
-
-                    # Method 3: Try getting all Edit controls
-                    try:
-                        edit_controls = dlg.descendants(control_type="Edit")
-                        if edit_controls:
-                            pin_input = edit_controls[0]
-                            print("Found PIN input from descendants")
-                        else:
-                            print("No Edit controls found")
-                    except Exception as e3:
-                        print(f"Method 3 failed: {str(e3)}")
-
-            if pin_input is None:
-                raise Exception("Could not find PIN input field with any method")
+                    pin_input.set_focus()
+                    pin_input.type_keys(self.pin, with_spaces=False, pause=self.keystroke_pause)
+                    event("Entered PIN successfully")
+                except Exception as e:
+                    event(f"Error entering PIN: {str(e)}", level="error")
+                    raise
 
-            # Enter the PIN
-            try:
-                pin_input.set_focus()
-                time.sleep(0.3)
-                pin_input.type_keys(self.pin, with_spaces=False, pause=0.1)
-                print(f"Entered PIN successfully")
-                time.sleep(0.5)
-            except Exception as e:
-                print(f"Error entering PIN: {str(e)}")
-                raise
+                event("Looking for Next button...")
+                next_button = self._locate(dlg, "next_button")
 
-            # Find and click Next button - try multiple methods
-            print("Looking for Next button...")
-            next_button = None
+                self._wait(lambda: _is_ready(next_button), "Next button enabled")
+                next_button.click()
+                event("Clicked Next button")
 
-            # Try by title first (most reliable for buttons)
-            try:
-                next_button = dlg.child_window(title="Next", control_type="Button")
-                print("Found Next button by title")
-            except Exception as e1:
-                print(f"Method 1 failed: {str(e1)}")
+            with self.timer.step("generate_code"):
+                event("Looking for Copy button...")
+                copy_button = self._locate(dlg, "copy_button")
 
-                # Try by auto_id
-                try:
-                    next_button = dlg.child_window(auto_id="JavaFX49", control_type="Button")
-                    print("Found Next button by auto_id")
-                except Exception as e2:
-                    print(f"Method 2 failed: {str(e2)}")
+                # Wait for the code to be generated (Copy becomes enabled)
+                self._wait(lambda: _is_ready(copy_button), "Copy button enabled")
 
-            if next_button is None:
-                raise Exception("Could not find Next button")
+            with self.timer.step("read_code"):
+                mfa_code = self._read_code(dlg, copy_button)
+                self.last_code = mfa_code
 
-            next_button.click()
-            print("Clicked Next button")
-            time.sleep(3)  # Wait for code to be generated
+            # Close PingID window (optional)
+            if close_window:
+                try:
+                    dlg.close()
+                except:
+                    pass
 
-            # Find and click Copy button - try multiple methods
-            print("Looking for Copy button...")
-            copy_button = None
+            return mfa_code
 
-            # Try by title first (most reliable for buttons)
-            try:
-                copy_button = dlg.child_window(title="Copy", control_type="Button")
-                print("Found Copy button by title")
-            except Exception as e1:
-                print(f"Method 1 failed: {str(e1)}")
+        except Exception as e:
+            event(f"Error in enter_pin_and_get_code: {str(e)}", level="error")
+            return None
 
-                # Try by auto_id
-                try:
-                    copy_button = dlg.child_window(auto_id="JavaFX32", control_type="Button")
-                    print("Found Copy button by auto_id")
-                except Exception as e2:
-                    print(f"Method 2 failed: {str(e2)}")
+    def _read_code(self, dlg, copy_button):
+        """
+        Read a fresh MFA code, from the PingID text element when configured
+        (no clipboard involved) with the Copy button + clipboard as fallback
+        """
+        if self.code_source == "text":
+            try:
+                # One lookup (cached strategy first), then only the control's text is polled
+                code_text = _resolved(self._locate(dlg, "code_text"))
+                mfa_code = self._wait(lambda: self._fresh_code(code_text.window_text()), "MFA code text")
+                event(f"Read MFA code from PingID window: {mfa_code}")
+                return mfa_code
+            except Exception as e:
+                event(f"Reading code text failed, falling back to clipboard: {str(e)}", level="warning")
 
-            if copy_button is None:
-                raise Exception("Could not find Copy button")
+        previous_clipboard = self.backend.read_clipboard()
 
+        def _copied_code():
+            # Click on every poll: a click before the code is rendered copies nothing
             copy_button.click()
-            print("Clicked Copy button")
-            time.sleep(0.5)
+            return self._fresh_code(_clipboard_changed(self.backend, previous_clipboard))
 
-            # Get the code from clipboard
-            mfa_code = pyperclip.paste()
-            print(f"Retrieved MFA code from clipboard: {mfa_code}")
+        # Get the code from clipboard once it changes
+        mfa_code = self._wait(_copied_code, "clipboard update")
+        event(f"Retrieved MFA code from clipboard: {mfa_code}")
+        return mfa_code
 
-            # Close PingID window (optional)
-            try:
-                dlg.close()
-            except:
-                pass
+    def _fresh_code(self, code):
+        """Return the code if it has the expected format and differs from the previous one"""
+        if code is None:
+            return None
+        code = _normalize_code(code)
+        if not CODE_PATTERN.fullmatch(code):
+            return None
+        if code == self.last_code:
+            # Still showing the code we already handed out
+            return None
+        return code
 
-            return mfa_code
+    def _locate(self, dlg, control_name):
+        """Resolve a logical PingID control (pin_input, next_button, copy_button, code_text)"""
+        control = self.locators.resolve(dlg, control_name, self.step_timeout, clock=self.clock)
+        event(f"Found {control_name} using '{self.locators.cache.get(control_name)}'")
+        return control
 
-        except Exception as e:
-            print(f"Error in enter_pin_and_get_code: {str(e)}")
-            return None
+    def _wait(self, predicate, description):
+        """Wait for a PingID condition using the per-step deadline"""
+        return wait_until(predicate, self.step_timeout, description=description, clock=self.clock)
 
     def get_mfa_code(self):
         """
@@ -204,23 +306,91 @@ class PingIDAutomation:
         Returns:
             str: The MFA code, or None if failed
         """
-        try:
-            # Launch PingID
-            if not self.launch_pingid():
-                return None
+        with span("pingid.get_mfa_code", code_source=self.code_source):
+            try:
+                # Launch PingID
+                with self.timer.step("launch"):
+                    if not self.launch_pingid():
+                        return None
+
+                # Connect to PingID window
+                with self.timer.step("connect_window"):
+                    if not self.connect_to_pingid_window():
+                        return None
+
+                # Enter PIN and get code
+                mfa_code = self.enter_pin_and_get_code()
+
+                return mfa_code
 
-            # Connect to PingID window
-            if not self.connect_to_pingid_window():
+            except Exception as e:
+                event(f"Error in get_mfa_code: {str(e)}", level="error")
                 return None
 
-            # Enter PIN and get code
-            mfa_code = self.enter_pin_and_get_code()
+            finally:
+                self._report_timings()
 
-            return mfa_code
+    def is_connected(self):
+        """True if a previously connected PingID window is still open"""
+        if not self.app:
+            return False
+        try:
+            return self.app.top_window().exists(timeout=0)
+        except Exception:
+            return False
 
-        except Exception as e:
-            print(f"Error in get_mfa_code: {str(e)}")
-            return None
+    def prepare(self):
+        """
+        Launch PingID and connect to its window unless a previous window is
+        still open, so a later enter_pin_and_get_code() only has to generate
+        the code
+
+        Returns:
+            bool: True once connected
+        """
+        if self.is_connected():
+            return True
+
+        with self.timer.step("launch"):
+            if (self.process is None or self.process.poll() is not None) and not self.launch_pingid():
+                return False
+
+        with self.timer.step("connect_window"):
+            return self.connect_to_pingid_window()
+
+    def get_mfa_code_warm(self):
+        """
+        Retrieve an MFA code while keeping PingID running for the next request.
+        Launch and connect are skipped when the window from a previous call is
+        still open.
+
+        Returns:
+            str: The MFA code, or None if failed
+        """
+        with span("pingid.get_mfa_code_warm", code_source=self.code_source):
+            self.timer.reset()
+            try:
+                if not self.prepare():
+                    return None
+
+                mfa_code = self.enter_pin_and_get_code(close_window=False)
+                if mfa_code is None:
+                    # Force a reconnect next time in case the window is in an unknown state
+                    self.app = None
+                return mfa_code
+
+            except Exception as e:
+                event(f"Error in get_mfa_code_warm: {str(e)}", level="error")
+                self.app = None
+                return None
+
+            finally:
+                self._report_timings()
+
+    def _report_timings(self):
+        """Timings are kept as spans; the breakdown is only echoed when over budget"""
+        level = "warning" if self.timer.over_budget else "debug"
+        event(f"PingID MFA timings:\n{self.timer.report()}", level=level)
 
     def print_window_info(self):
         """Debug helper: Print information about PingID window and controls"""
@@ -238,6 +408,42 @@ class PingIDAutomation:
         except Exception as e:
             print(f"Error printing window info: {str(e)}")
 
+    def inspect_window(self, snapshot_path=None, full=False):
+        """
+        Debug helper: capture the PingID control tree once, print only the
+        controls that changed since the stored snapshot and which
+        PINGID_LOCATORS strategies still find their control
+
+        Args:
+            snapshot_path: Stored snapshot (optional, defaults to PINGID_CONFIG "snapshot_file")
+            full: Print the whole tree even when a stored snapshot exists
+
+        Returns:
+            dict: The diff against the stored snapshot, or None on the first capture or error
+        """
+        import ntpath
+        from ui_snapshot import inspect
+        try:
+            if not self.app:
+                print("App not connected. Run connect_to_pingid_window first.")
+                return None
+
+            dlg = self.app.top_window()
+            print("\n=== PingID Window Information ===")
+            print(f"Window Title: {dlg.window_text()}\n")
+            return inspect(dlg, snapshot_path or PINGID_CONFIG.get("snapshot_file", "pingid_snapshot.json"),
+                           exe=ntpath.basename(self.exe_path), locators=PINGID_LOCATORS, full=full)
+
+        except Exception as e:
+            print(f"Error inspecting window: {str(e)}")
+            return None
+
+
+def pingid_lock():
+    """Cross-process lock guarding the single PingID desktop instance"""
+    return FileLock(PINGID_CONFIG.get("lock_file") or default_lock_path("pingid"),
+                    timeout=PINGID_CONFIG.get("lock_timeout", 300))
+
 
 def automate_pingid_mfa():
     """
@@ -246,8 +452,10 @@ def automate_pingid_mfa():
     Returns:
         str: The MFA code, or None if failed
     """
-    pingid = PingIDAutomation()
-    return pingid.get_mfa_code()
+    # Only one worker at a time may drive the PingID window and clipboard
+    with pingid_lock():
+        pingid = PingIDAutomation()
+        return pingid.get_mfa_code()
 
 
 if __name__ == "__main__":
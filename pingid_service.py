@@ -0,0 +1,196 @@
+"""
+PingID MFA Service
+Keeps one warm PingID instance and serves MFA codes to any number of test
+workers over a local socket; requests are serialized through a queue so
+workers never fight over the PingID window or the clipboard
+
+Start the service:   python pingid_service.py
+Use from a test:     the MFAPrefetch provider (mfa_prefetch.py) requests codes
+                     from the service whenever it is running
+"""
+
+import json
+import queue
+import socket
+import socketserver
+import threading
+
+from instrumentation import event
+
+try:
+    from config import PINGID_SERVICE_CONFIG
+except ImportError:
+    PINGID_SERVICE_CONFIG = {}
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47615
+DEFAULT_REQUEST_TIMEOUT = 120
+
+
+class PingIDService:
+    """Local socket server that hands out MFA codes one request at a time"""
+
+    def __init__(self, code_source=None, host=None, port=None):
+        """
+        Initialize the service
+
+        Args:
+            code_source: Callable returning an MFA code or None
+                         (optional, defaults to a warm PingIDAutomation)
+            host: Interface to bind (optional, defaults to config / loopback)
+            port: Port to bind (optional, defaults to config; 0 picks a free port)
+        """
+        if code_source is None:
+            code_source = _warm_pingid_code_source()
+        self.code_source = code_source
+        self.requests = queue.Queue()
+        self.served = 0
+        host = host or PINGID_SERVICE_CONFIG.get("host", DEFAULT_HOST)
+        port = PINGID_SERVICE_CONFIG.get("port", DEFAULT_PORT) if port is None else port
+        self._server = socketserver.ThreadingTCPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._worker = threading.Thread(target=self._process_requests, daemon=True)
+
+    @property
+    def address(self):
+        return self._server.server_address[:2]
+
+    def start(self):
+        """Start the request worker and the socket server on background threads"""
+        self._worker.start()
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        """Start the request worker and serve on the calling thread"""
+        self._worker.start()
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self._server.shutdown()
+        self._server.server_close()
+        self.requests.put(None)
+
+    def submit(self):
+        """
+        Queue a code request and wait for the worker to answer it
+
+        Returns:
+            dict: {"code": "..."} or {"error": "..."}
+        """
+        done = threading.Event()
+        response = {}
+        self.requests.put((done, response))
+        done.wait()
+        return response
+
+    def _process_requests(self):
+        # Single consumer: PingID is only ever driven by this thread
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return
+            done, response = item
+            try:
+                code = self.code_source()
+                if code:
+                    response["code"] = code
+                    self.served += 1
+                else:
+                    response["error"] = "PingID did not return an MFA code"
+            except Exception as e:
+                event(f"Error producing MFA code: {str(e)}", level="error")
+                response["error"] = str(e)
+            finally:
+                done.set()
+
+    def _make_handler(self):
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                try:
+                    command = json.loads(line or b"{}").get("cmd")
+                except ValueError:
+                    command = None
+
+                if command == "code":
+                    response = service.submit()
+                elif command == "ping":
+                    response = {"ok": True, "served": service.served}
+                else:
+                    response = {"error": f"Unknown command: {command}"}
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+
+        return Handler
+
+
+def _warm_pingid_code_source():
+    """Code source backed by one PingID instance that stays open between requests"""
+    from pingid_automation import PingIDAutomation, pingid_lock
+    pingid = PingIDAutomation()
+
+    def code_source():
+        # Also guards against in-process fallbacks running alongside the service
+        with pingid_lock():
+            return pingid.get_mfa_code_warm()
+
+    return code_source
+
+
+class PingIDServiceUnavailable(Exception):
+    """Raised when no PingID service is listening"""
+
+
+def service_available(host=None, port=None, timeout=1):
+    """True if a PingID service answers a ping on the configured address"""
+    host = host or PINGID_SERVICE_CONFIG.get("host", DEFAULT_HOST)
+    port = port or PINGID_SERVICE_CONFIG.get("port", DEFAULT_PORT)
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock, sock.makefile("rwb") as stream:
+            stream.write(json.dumps({"cmd": "ping"}).encode() + b"\n")
+            stream.flush()
+            return bool(json.loads(stream.readline() or b"{}").get("ok"))
+    except (OSError, ValueError):
+        return False
+
+
+def request_mfa_code(host=None, port=None, timeout=None):
+    """
+    Ask a running PingID service for an MFA code
+
+    Returns:
+        str: The MFA code, or None if the service could not produce one
+
+    Raises:
+        PingIDServiceUnavailable: If nothing is listening on the service address
+    """
+    host = host or PINGID_SERVICE_CONFIG.get("host", DEFAULT_HOST)
+    port = port or PINGID_SERVICE_CONFIG.get("port", DEFAULT_PORT)
+    timeout = timeout or PINGID_SERVICE_CONFIG.get("request_timeout", DEFAULT_REQUEST_TIMEOUT)
+    try:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    except OSError as e:
+        raise PingIDServiceUnavailable(f"No PingID service at {host}:{port}: {str(e)}")
+
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps({"cmd": "code"}).encode() + b"\n")
+        stream.flush()
+        response = json.loads(stream.readline() or b"{}")
+
+    if "error" in response:
+        event(f"PingID service error: {response['error']}", level="error")
+    return response.get("code")
+
+
+if __name__ == "__main__":
+    service = PingIDService()
+    host, port = service.address
+    print(f"PingID service listening on {host}:{port} (Ctrl+C to stop)")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        service.stop()
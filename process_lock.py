@@ -0,0 +1,97 @@
+"""
+Cross-process file lock
+Serializes access to single-instance resources (the PingID desktop app,
+the session cache) across parallel test workers; the OS releases the lock
+if a worker dies, so a crashed holder never blocks the others
+"""
+
+import os
+import tempfile
+
+from waits import WaitTimeoutError, wait_until
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+
+def default_lock_path(name):
+    """Return a lock file path in the system temp directory shared by all workers"""
+    return os.path.join(tempfile.gettempdir(), f"{name}.lock")
+
+
+class FileLock:
+    """Exclusive lock on a file, usable as a context manager"""
+
+    def __init__(self, path, timeout=300, clock=None):
+        """
+        Initialize the lock
+
+        Args:
+            path: Lock file path (created if missing)
+            timeout: Seconds to wait for the lock before giving up
+            clock: Clock used while waiting (optional, defaults to real time)
+        """
+        self.path = path
+        self.timeout = timeout
+        self.clock = clock
+        self._fd = None
+
+    def _try_acquire(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        try:
+            if msvcrt:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def try_acquire(self):
+        """Take the lock only if it is free right now; True if it is held"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return self._fd is not None or self._try_acquire()
+
+    def acquire(self):
+        """
+        Block until the lock is held
+
+        Raises:
+            TimeoutError: If the lock could not be acquired within the timeout
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            wait_until(self._try_acquire, self.timeout, description=f"lock {self.path}",
+                       max_interval=0.25, clock=self.clock)
+        except WaitTimeoutError as e:
+            raise TimeoutError(str(e))
+
+    def release(self):
+        """Release the lock if held"""
+        if self._fd is None:
+            return
+        try:
+            if msvcrt:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
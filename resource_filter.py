@@ -0,0 +1,110 @@
+"""
+Resource Filter
+Playwright route interception for "lean" login runs: aborts resource types
+and third-party URLs the tests never assert on (images, fonts, analytics)
+and reports how many requests and roughly how many bytes were saved
+"""
+
+from fnmatch import fnmatch
+
+try:
+    from config import RESOURCE_FILTER_CONFIG
+except ImportError:
+    RESOURCE_FILTER_CONFIG = {}
+
+
+DEFAULT_RULES = {
+    "block_types": ["image", "font", "media"],
+    "block_patterns": [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*doubleclick.net*",
+        "*hotjar.com*",
+        "*newrelic.com*",
+        "*nr-data.net*",
+    ],
+    "allow_patterns": [],
+}
+
+# Rough transfer sizes per blocked request, used for the bytes-saved estimate
+DEFAULT_SIZE_ESTIMATES = {
+    "image": 30000,
+    "font": 40000,
+    "media": 200000,
+    "script": 50000,
+    "stylesheet": 20000,
+}
+
+
+def rules_for(app=None):
+    """
+    Return the allow/deny rules for an app
+
+    Per-app entries in RESOURCE_FILTER_CONFIG["apps"] extend the default rules.
+    """
+    rules = {key: list(value) for key, value in DEFAULT_RULES.items()}
+    configured = RESOURCE_FILTER_CONFIG.get("apps", {})
+    for name in ("default", app):
+        for key, values in configured.get(name, {}).items():
+            rules.setdefault(key, []).extend(values)
+    return rules
+
+
+class ResourceFilter:
+    """Aborts non-essential requests on a page or context and counts the savings"""
+
+    def __init__(self, app=None, rules=None, size_estimates=None):
+        """
+        Initialize the filter
+
+        Args:
+            app: App name used to pick rules from config (optional)
+            rules: Explicit rules dict (optional, overrides config)
+            size_estimates: Approximate bytes per blocked request by resource type (optional)
+        """
+        self.rules = rules or rules_for(app)
+        self.size_estimates = size_estimates or RESOURCE_FILTER_CONFIG.get("size_estimates", DEFAULT_SIZE_ESTIMATES)
+        self.reset()
+
+    def reset(self):
+        """Clear the counters"""
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type = {}
+        self.bytes_saved = 0
+
+    def should_block(self, url, resource_type):
+        if any(fnmatch(url, pattern) for pattern in self.rules["allow_patterns"]):
+            return False
+        if resource_type in self.rules["block_types"]:
+            return True
+        return any(fnmatch(url, pattern) for pattern in self.rules["block_patterns"])
+
+    def _handle(self, route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.blocked += 1
+            self.blocked_by_type[request.resource_type] = self.blocked_by_type.get(request.resource_type, 0) + 1
+            self.bytes_saved += self.size_estimates.get(request.resource_type, 0)
+            route.abort()
+        else:
+            self.allowed += 1
+            # Not continue_(): handlers registered before this one (HAR replay, auth routes) still run
+            route.fallback()
+
+    def install(self, target):
+        """
+        Start filtering requests on a Page or BrowserContext; install it after
+        other routes, as the last registered handler runs first
+        """
+        target.route("**/*", self._handle)
+
+    def uninstall(self, target):
+        target.unroute("**/*", self._handle)
+
+    def report(self):
+        """Return a printable summary of what was blocked"""
+        by_type = ", ".join(f"{name}={count}" for name, count in sorted(self.blocked_by_type.items()))
+        return (f"Requests allowed: {self.allowed}\n"
+                f"Requests blocked: {self.blocked} ({by_type or 'none'})\n"
+                f"Bytes saved (approx.): {self.bytes_saved}")
@@ -0,0 +1,209 @@
+"""
+Step Retries
+Retries a single failing phase of a flow (fetching the MFA code, submitting
+the passcode form, ...) instead of rerunning the whole login: bounded
+attempts per step, jittered exponential backoff, transient vs fatal error
+classification and retry counts per step
+"""
+
+import asyncio
+import random
+import time
+
+from instrumentation import event, span
+
+try:
+    from config import RETRY_CONFIG
+except ImportError:
+    RETRY_CONFIG = {}
+
+
+class TransientError(Exception):
+    """A failure worth retrying (timing, a code that expired, a flaky page)"""
+
+
+class FatalError(Exception):
+    """A failure that retrying cannot fix (bad credentials, missing app, ...)"""
+
+
+class MFACodeUnavailable(TransientError):
+    """Raised when the MFA provider returns no code"""
+
+
+class MFACodeRejected(TransientError):
+    """Raised when the passcode page is still shown after submitting a code"""
+
+
+def _transient_types():
+    types = [TransientError, TimeoutError, ConnectionError]
+    try:
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+        types.append(PlaywrightTimeoutError)
+    except ImportError:
+        pass
+    from timeouts import StepBudgetExceeded
+    from waits import WaitTimeoutError
+    return tuple(types + [StepBudgetExceeded, WaitTimeoutError])
+
+
+# Playwright errors with these messages are network / navigation hiccups
+TRANSIENT_MESSAGES = ("net::ERR_", "NS_ERROR_", "Navigation failed", "frame was detached",
+                      "Execution context was destroyed")
+
+
+def classify(error):
+    """
+    Return "transient" or "fatal" for an exception
+
+    Timeouts, missing or rejected MFA codes and network errors are
+    transient; everything else (assertions, bad config, programming errors)
+    fails fast.
+    """
+    if isinstance(error, FatalError):
+        return "fatal"
+    if isinstance(error, _transient_types()):
+        return "transient"
+    if any(message in str(error) for message in TRANSIENT_MESSAGES):
+        return "transient"
+    return "fatal"
+
+
+class RetryPolicy:
+    """Per-step retry settings and counters"""
+
+    def __init__(self, attempts=None, base_delay=None, max_delay=None, jitter=None,
+                 steps=None, classifier=None, clock=None, rng=None):
+        """
+        Initialize the policy
+
+        Args:
+            attempts: Default attempts per step, 1 = no retry (optional, defaults to RETRY_CONFIG, else 1)
+            base_delay: Seconds before the first retry; doubles per retry (optional, defaults to 0.5)
+            max_delay: Upper bound for the backoff in seconds (optional, defaults to 5)
+            jitter: Fraction of the delay randomly taken off, 0-1 (optional, defaults to 0.5)
+            steps: Dict of step name (or its last dotted part, e.g. "mfa") -> attempts
+            classifier: Callable(exception) -> "transient" / "fatal" (optional, defaults to classify)
+            clock: Clock with sleep() (optional, defaults to real time)
+            rng: random.Random for the jitter (optional)
+        """
+        self.attempts = attempts or RETRY_CONFIG.get("attempts", 1)
+        self.base_delay = base_delay if base_delay is not None else RETRY_CONFIG.get("base_delay", 0.5)
+        self.max_delay = max_delay if max_delay is not None else RETRY_CONFIG.get("max_delay", 5)
+        self.jitter = jitter if jitter is not None else RETRY_CONFIG.get("jitter", 0.5)
+        self.steps = steps if steps is not None else RETRY_CONFIG.get("steps", {"open": 2, "mfa": 3})
+        self.classifier = classifier or classify
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.counts = {}
+
+    def attempts_for(self, step):
+        """Attempts allowed for a step"""
+        if step in self.steps:
+            return self.steps[step]
+        return self.steps.get(step.rsplit(".", 1)[-1], self.attempts)
+
+    def delay(self, retry):
+        """Backoff before retry number `retry` (1-based), with jitter"""
+        delay = min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        return delay * (1 - self.jitter * self.rng.random())
+
+    def _count(self, step):
+        return self.counts.setdefault(step, {"runs": 0, "retries": 0, "recovered": 0, "failed": 0})
+
+    def _should_retry(self, step, error, attempt, attempts):
+        """Record a failed attempt; True if the step gets another one"""
+        kind = self.classifier(error)
+        if kind != "transient" or attempt >= attempts:
+            self._count(step)["failed"] += 1
+            if attempt > 1 or kind != "transient":
+                event(f"{step} failed ({kind}) after {attempt} attempt(s): {error}", level="error")
+            return False
+        self._count(step)["retries"] += 1
+        event(f"{step} attempt {attempt}/{attempts} failed ({kind}), retrying: {error}", level="warning")
+        return True
+
+    def run(self, step, action, recover=None):
+        """
+        Run a step, retrying it on transient errors
+
+        Args:
+            step: Step name used for the counters and spans (e.g. "fileroom.mfa")
+            action: Zero-argument callable performing the step
+            recover: Callable(exception) run before each retry (optional), e.g. to drop
+                     a rejected code or reload a page
+
+        Returns:
+            The action's return value
+
+        Raises:
+            The last error, if it is fatal or the attempts are used up
+        """
+        attempts = self.attempts_for(step)
+        self._count(step)["runs"] += 1
+        attempt = 1
+        while True:
+            try:
+                with span(f"retry.{step}", attempt=attempt):
+                    result = action()
+            except Exception as e:
+                if not self._should_retry(step, e, attempt, attempts):
+                    raise
+                (self.clock or time).sleep(self.delay(attempt))
+                if recover is not None:
+                    recover(e)
+                attempt += 1
+                continue
+            if attempt > 1:
+                self._count(step)["recovered"] += 1
+            return result
+
+    async def run_async(self, step, action, recover=None):
+        """run() for a coroutine function action (and optional coroutine function recover)"""
+        attempts = self.attempts_for(step)
+        self._count(step)["runs"] += 1
+        attempt = 1
+        while True:
+            try:
+                with span(f"retry.{step}", attempt=attempt):
+                    result = await action()
+            except Exception as e:
+                if not self._should_retry(step, e, attempt, attempts):
+                    raise
+                await asyncio.sleep(self.delay(attempt))
+                if recover is not None:
+                    await recover(e)
+                attempt += 1
+                continue
+            if attempt > 1:
+                self._count(step)["recovered"] += 1
+            return result
+
+    def merge(self, counts):
+        """Add the step counters of another policy (e.g. of an xdist worker) to this one's"""
+        for step, step_counts in counts.items():
+            totals = self._count(step)
+            for key, value in step_counts.items():
+                totals[key] += value
+
+    def report(self):
+        """Return a printable table of the steps that were retried or failed"""
+        rows = [(step, counts) for step, counts in sorted(self.counts.items())
+                if counts["retries"] or counts["failed"]]
+        if not rows:
+            return ""
+        lines = [f"{'step':<30} {'runs':>5} {'retries':>8} {'recovered':>10} {'failed':>7}"]
+        for step, counts in rows:
+            lines.append(f"{step:<30} {counts['runs']:>5} {counts['retries']:>8} "
+                         f"{counts['recovered']:>10} {counts['failed']:>7}")
+        return "\n".join(lines)
+
+
+_policy = None
+
+
+def get_retry_policy():
+    """Return the process-wide retry policy"""
+    global _policy
+    if _policy is None:
+        _policy = RetryPolicy()
+    return _policy
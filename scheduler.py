@@ -0,0 +1,363 @@
+"""
+Duration-aware Test Scheduling
+pytest plugin (loaded from conftest.py) that records every test's duration
+and outcome across runs, orders the next run longest-first or failed-first,
+drops tests collected twice from copies of a module ("FileroomLogin copy.py"),
+splits the suite into balanced shards for several machines and reports the
+predicted against the actual wall time
+
+    pytest --schedule longest     # longest first: shortest makespan with -n (--dist load)
+    pytest --schedule failed      # last run's failures first (shortest first), then new tests
+    pytest --shard 2/3            # the second of three shards (see shards.py to run and merge them)
+"""
+
+import heapq
+import json
+import os
+import re
+import time
+
+import pytest
+
+from process_lock import FileLock
+
+try:
+    from config import SCHEDULER_CONFIG
+except ImportError:
+    SCHEDULER_CONFIG = {}
+
+
+# Weight of the newest duration in the smoothed per-test duration
+SMOOTHING = 0.5
+
+# " copy", " copy 2", " - Copy", " (2)", "_copy2" ... (or several, " - Copy (2)") appended to a
+# duplicated module name; "copy" must follow a separator and end the word ("deepcopy", "FileCopy",
+# "copying" are names, not suffixes)
+COPY_SUFFIX = re.compile(r"((\s+-\s+copy|\scopy|_copy)(?![a-z])(\s*\d+)?|\s\(\d+\))+$", re.IGNORECASE)
+
+
+class DurationHistory:
+    """Smoothed duration (seconds) and last outcome per test id, persisted between runs"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = self._read()
+        self.new_entries = {}
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def duration(self, nodeid):
+        entry = self.entries.get(nodeid)
+        return entry["duration"] if entry else None
+
+    def outcome(self, nodeid):
+        entry = self.entries.get(nodeid)
+        return entry["outcome"] if entry else None
+
+    def record(self, nodeid, duration, outcome):
+        self.new_entries[nodeid] = {"duration": duration, "outcome": outcome}
+
+    def save(self):
+        """Merge this run's results into the file (safe with parallel sessions)"""
+        if not self.new_entries:
+            return
+        try:
+            with FileLock(f"{self.path}.lock", timeout=30):
+                merged = self._read()
+                for nodeid, entry in self.new_entries.items():
+                    previous = merged.get(nodeid)
+                    duration = entry["duration"]
+                    if previous:
+                        duration = SMOOTHING * duration + (1 - SMOOTHING) * previous["duration"]
+                    merged[nodeid] = {"duration": round(duration, 3), "outcome": entry["outcome"],
+                                      "runs": (previous or {}).get("runs", 0) + 1}
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(merged, f, indent=2, sort_keys=True)
+            self.new_entries = {}
+        except (OSError, TimeoutError) as e:
+            print(f"Could not write test durations {self.path}: {str(e)}")
+
+
+def _identity(item):
+    """
+    Identity of a test for de-duplication: its name (with parameters) in a
+    module whose name has copy suffixes removed
+    """
+    stem = os.path.splitext(os.path.basename(str(item.path)))[0]
+    return os.path.dirname(str(item.path)), COPY_SUFFIX.sub("", stem), item.name
+
+
+def dedupe(items):
+    """
+    Split items into the ones to run and duplicates of an already kept test;
+    the test from the module without a copy suffix (shortest name) wins
+
+    Returns:
+        tuple: (kept items in collection order, duplicate items)
+    """
+    winners = {}
+    for item in items:
+        identity = _identity(item)
+        current = winners.get(identity)
+        if current is None or len(str(item.path)) < len(str(current.path)):
+            winners[identity] = item
+    kept = [item for item in items if winners[_identity(item)] is item]
+    duplicates = [item for item in items if winners[_identity(item)] is not item]
+    return kept, duplicates
+
+
+def estimate(history, nodeids):
+    """Known durations, with the median of the known ones for tests without history"""
+    known = sorted(duration for duration in (history.duration(nodeid) for nodeid in nodeids)
+                   if duration is not None)
+    default = known[len(known) // 2] if known else 0.0
+    return {nodeid: history.duration(nodeid) if history.duration(nodeid) is not None else default
+            for nodeid in nodeids}
+
+
+def order(items, history, mode):
+    """
+    Reorder items in place
+
+    Args:
+        items: Collected items
+        history: DurationHistory
+        mode: "longest" (descending duration, unknown tests as the median),
+              "failed" (previous failures shortest first, then new tests, then the rest),
+              or "file" (unchanged)
+    """
+    if mode == "file":
+        return
+    durations = estimate(history, [item.nodeid for item in items])
+    if mode == "longest":
+        items.sort(key=lambda item: -durations[item.nodeid])
+    elif mode == "failed":
+        def _rank(item):
+            outcome = history.outcome(item.nodeid)
+            if outcome == "failed":
+                return 0, durations[item.nodeid]
+            return (1 if outcome is None else 2), 0
+        items.sort(key=_rank)
+
+
+def predict_makespan(durations, workers):
+    """Wall time of running `durations` longest-first on `workers` parallel workers (LPT)"""
+    loads = [0.0] * max(1, workers)
+    for duration in sorted(durations, reverse=True):
+        heapq.heapreplace(loads, loads[0] + duration)
+    return max(loads)
+
+
+# Fixtures backed by a cached authenticated session (conftest.py): tests sharing one run on one shard
+SESSION_FIXTURES = {"fileroom_page": "fileroom", "scd_page": "scd"}
+
+# Factory behind the page fixtures above (so in their fixture closure): only a test using it
+# without either of them is grouped by it
+SESSION_FACTORY_FIXTURE = "authenticated_context"
+
+
+def parse_shard(value):
+    """
+    Parse "i/N" (1-based)
+
+    Raises:
+        ValueError: If the value is not a valid shard
+    """
+    match = re.fullmatch(r"(\d+)/(\d+)", value or "")
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"--shard expects i/N with 1 <= i <= N, got {value!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def _sessions(item):
+    """Names of the cached sessions / explicit shard groups a test belongs to"""
+    names = {f"session:{name}" for fixture, name in SESSION_FIXTURES.items() if fixture in item.fixturenames}
+    if not names and SESSION_FACTORY_FIXTURE in item.fixturenames:
+        names.add(f"session:{SESSION_FACTORY_FIXTURE}")
+    marker = item.get_closest_marker("shard_group")
+    if marker is not None and marker.args:
+        names.add(f"group:{marker.args[0]}")
+    return names
+
+
+def shard_groups(items):
+    """
+    Group items that have to run on the same shard: tests sharing a cached
+    session (or a shard_group marker), transitively; every other test is its own group
+
+    Returns:
+        list: Lists of items, in collection order of their first item
+    """
+    parent = {}
+
+    def _root(name):
+        while parent.setdefault(name, name) != name:
+            name = parent[name]
+        return name
+
+    for item in items:
+        names = sorted(_sessions(item))
+        for name in names[1:]:
+            parent[_root(name)] = _root(names[0])
+
+    groups = {}
+    for item in items:
+        names = sorted(_sessions(item))
+        key = _root(names[0]) if names else item.nodeid
+        groups.setdefault(key, []).append(item)
+    return list(groups.values())
+
+
+def assign_shards(items, history, count):
+    """
+    Bin-pack test groups onto `count` shards by recorded duration: largest
+    group first onto the least loaded shard. Deterministic for the same
+    collection and history, so every shard computes the same split.
+
+    Returns:
+        tuple: ({nodeid: shard number (1-based)}, [predicted seconds per shard])
+    """
+    durations = estimate(history, [item.nodeid for item in items])
+    groups = [(sum(durations[item.nodeid] for item in group), index, group)
+              for index, group in enumerate(shard_groups(items))]
+    loads = [(0.0, shard) for shard in range(1, count + 1)]
+    heapq.heapify(loads)
+    assignment = {}
+    totals = [0.0] * count
+    # Unknown history gives every test the same estimate: fall back to balancing the test count
+    for total, _, group in sorted(groups, key=lambda entry: (-(entry[0] or len(entry[2])), entry[1])):
+        load, shard = heapq.heappop(loads)
+        weight = total or len(group)
+        heapq.heappush(loads, (load + weight, shard))
+        totals[shard - 1] += total
+        for item in group:
+            assignment[item.nodeid] = shard
+    return assignment, totals
+
+
+def _workers(config):
+    workers = getattr(config.option, "numprocesses", None)
+    if getattr(config.option, "dist", "no") == "no" or not isinstance(workers, int) or workers < 1:
+        return 1
+    return workers
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--schedule",
+        choices=("file", "longest", "failed"),
+        default=None,
+        help="Test order: file (default), longest first, or previously failed first (see scheduler.py)",
+    )
+    parser.addoption(
+        "--shard",
+        default=None,
+        metavar="i/N",
+        help="Run only shard i of N, balanced by recorded durations (see scheduler.py / shards.py)",
+    )
+    parser.addoption(
+        "--durations-file",
+        default=None,
+        metavar="PATH",
+        help="Per-test durations / outcomes file (default: SCHEDULER_CONFIG history_file)",
+    )
+    parser.addoption(
+        "--keep-copied-tests",
+        action="store_true",
+        default=False,
+        help="Run tests collected again from copies of a module (e.g. 'FileroomLogin copy.py')",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "shard_group(name): run every test of the group on the same shard")
+    shard = config.getoption("--shard")
+    if shard is not None:
+        try:
+            parse_shard(shard)
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
+    config.pluginmanager.register(Scheduler(config), "duration_scheduler")
+
+
+class Scheduler:
+    """Per-session plugin state; under xdist the controller records and reports, workers order"""
+
+    def __init__(self, config):
+        self.config = config
+        self.mode = config.getoption("--schedule") or SCHEDULER_CONFIG.get("order", "file")
+        self.keep_duplicates = config.getoption("--keep-copied-tests") or SCHEDULER_CONFIG.get("keep_copied_tests", False)
+        self.history = DurationHistory(config.getoption("--durations-file")
+                                       or SCHEDULER_CONFIG.get("history_file", ".test_durations.json"))
+        self.is_worker = hasattr(config, "workerinput")
+        self.start = time.monotonic()
+        self.durations = {}
+        self.outcomes = {}
+        self.duplicates = 0
+        self.shard = parse_shard(config.getoption("--shard")) if config.getoption("--shard") else None
+        self.shard_totals = None
+        self.result = None
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config, items):
+        if not self.keep_duplicates:
+            kept, duplicates = dedupe(items)
+            if duplicates:
+                items[:] = kept
+                config.hook.pytest_deselected(items=duplicates)
+                self.duplicates = len(duplicates)
+        if self.shard is not None:
+            number, count = self.shard
+            assignment, self.shard_totals = assign_shards(items, self.history, count)
+            other_shards = [item for item in items if assignment[item.nodeid] != number]
+            if other_shards:
+                items[:] = [item for item in items if assignment[item.nodeid] == number]
+                config.hook.pytest_deselected(items=other_shards)
+        order(items, self.history, self.mode)
+
+    def pytest_runtest_logreport(self, report):
+        if self.is_worker:
+            return
+        self.durations[report.nodeid] = self.durations.get(report.nodeid, 0.0) + report.duration
+        if report.failed:
+            self.outcomes[report.nodeid] = "failed"
+        elif report.when == "call" or report.skipped:
+            self.outcomes.setdefault(report.nodeid, report.outcome)
+
+    def pytest_sessionfinish(self):
+        if self.is_worker or not self.durations:
+            return
+        known = any(self.history.duration(nodeid) is not None for nodeid in self.durations)
+        estimates = estimate(self.history, list(self.durations))
+        self.result = {
+            "actual": time.monotonic() - self.start,
+            "predicted": predict_makespan(estimates.values(), _workers(self.config)) if known else None,
+            "serial": sum(self.durations.values()),
+        }
+        for nodeid, duration in self.durations.items():
+            # Setup errors never reach the call phase: count them as failures
+            self.history.record(nodeid, duration, self.outcomes.get(nodeid, "failed"))
+        self.history.save()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.result is None:
+            return
+        terminalreporter.write_sep("-", "test schedule")
+        line = f"order: {self.mode}, workers: {_workers(self.config)}"
+        if self.shard is not None:
+            line += f", shard {self.shard[0]}/{self.shard[1]}"
+        if self.duplicates:
+            line += f", duplicate tests dropped: {self.duplicates}"
+        terminalreporter.write_line(line)
+        if self.shard_totals:
+            loads = " / ".join(f"{total:.1f}s" for total in self.shard_totals)
+            terminalreporter.write_line(f"recorded test time per shard: {loads}")
+        predicted = (f"predicted {self.result['predicted']:.1f}s" if self.result["predicted"] is not None
+                     else "no recorded durations to predict from")
+        terminalreporter.write_line(f"wall time: {predicted}, actual {self.result['actual']:.1f}s "
+                                    f"(sum of test durations {self.result['serial']:.1f}s)")
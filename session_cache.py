@@ -0,0 +1,96 @@
+"""
+Authenticated Session Cache
+Persists Playwright storage_state per target (application name and host) so
+the SSO + PingID MFA login only has to run once until the cached session expires
+"""
+
+import json
+import os
+import time
+from urllib.parse import urlparse
+
+try:
+    from config import SESSION_CACHE_CONFIG
+except ImportError:
+    SESSION_CACHE_CONFIG = {}
+
+
+DEFAULT_CACHE_DIR = ".auth"
+DEFAULT_TTL_SECONDS = 3600
+
+
+class SessionCache:
+    """Stores and loads Playwright storage_state files keyed by target (see AuthTarget.cache_key) or host"""
+
+    def __init__(self, cache_dir=None, ttl_seconds=None):
+        """
+        Initialize the session cache
+
+        Args:
+            cache_dir: Directory for cached state files (optional, defaults to config)
+            ttl_seconds: Lifetime of a cached session in seconds (optional, defaults to config)
+        """
+        self.cache_dir = cache_dir or SESSION_CACHE_CONFIG.get("cache_dir", DEFAULT_CACHE_DIR)
+        self.ttl_seconds = ttl_seconds or SESSION_CACHE_CONFIG.get("ttl_seconds", DEFAULT_TTL_SECONDS)
+
+    @staticmethod
+    def host_for(url):
+        """Return the host[:port] part of a URL (or the value itself if it is already a host)"""
+        return urlparse(url).netloc or url
+
+    def path_for(self, key):
+        """Return the cache file path for a cache key or host"""
+        safe_key = self.host_for(key).replace(":", "_")
+        return os.path.join(self.cache_dir, f"{safe_key}.json")
+
+    def load(self, key):
+        """
+        Load a cached storage_state
+
+        Args:
+            key: Cache key (AuthTarget.cache_key), target host or URL
+
+        Returns:
+            dict: The storage_state, or None if missing, unreadable or expired
+        """
+        path = self.path_for(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() >= entry.get("expires_at", 0):
+            self.invalidate(key)
+            return None
+
+        return entry.get("storage_state")
+
+    def save(self, key, storage_state):
+        """
+        Save a storage_state with the configured TTL
+
+        Args:
+            key: Cache key (AuthTarget.cache_key), target host or URL
+            storage_state: State returned by BrowserContext.storage_state()
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        now = time.time()
+        entry = {
+            "key": self.host_for(key),
+            "created_at": now,
+            "expires_at": now + self.ttl_seconds,
+            "storage_state": storage_state,
+        }
+        path = self.path_for(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, key):
+        """Remove the cached state for a cache key or host"""
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
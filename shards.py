@@ -0,0 +1,220 @@
+"""
+Sharded Runs
+Runs the suite as N `pytest --shard i/N` processes (the split is computed
+by scheduler.py from recorded durations) and merges what the shards
+produce: Allure results, per-test durations and step latencies
+
+Every shard must see the same .test_durations.json, or shards disagree on
+the split; on CI restore the merged file of the previous run before starting
+the shards, then merge each shard's artifacts:
+
+    python shards.py run 3 CalculatorApp.py                  # 3 local shard processes, then merge
+    python shards.py merge ci/shard-1 ci/shard-2 ci/shard-3  # directories holding each shard's
+                                                             # allure-results/ and timing files
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from timeouts import MAX_SAMPLES
+
+try:
+    from config import SCHEDULER_CONFIG
+except ImportError:
+    SCHEDULER_CONFIG = {}
+
+try:
+    from config import TIMEOUT_CONFIG
+except ImportError:
+    TIMEOUT_CONFIG = {}
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DURATIONS_FILE = SCHEDULER_CONFIG.get("history_file", ".test_durations.json")
+LATENCIES_FILE = TIMEOUT_CONFIG.get("history_file", ".step_latencies.json")
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def merge_allure(sources, output):
+    """
+    Copy every shard's Allure result files into one results directory
+    (result files have unique names, so the shards never collide)
+
+    Returns:
+        int: Number of files copied
+    """
+    os.makedirs(output, exist_ok=True)
+    copied = 0
+    for source in sources:
+        if not os.path.isdir(source) or os.path.abspath(source) == os.path.abspath(output):
+            continue
+        for name in os.listdir(source):
+            path = os.path.join(source, name)
+            if os.path.isfile(path):
+                shutil.copy2(path, os.path.join(output, name))
+                copied += 1
+    return copied
+
+
+def merge_durations(base, shards):
+    """
+    Merge per-test durations: each test keeps the entry of the shard that ran
+    it most recently (highest run count), else the base entry
+
+    Args:
+        base: Durations every shard started from
+        shards: Durations written by each shard
+    """
+    merged = dict(base or {})
+    for entries in shards:
+        for nodeid, entry in (entries or {}).items():
+            if entry.get("runs", 0) > merged.get(nodeid, {}).get("runs", 0):
+                merged[nodeid] = entry
+    return merged
+
+
+def _new_samples(base, values):
+    """Samples a shard appended to its copy of the base list (lists keep only the newest MAX_SAMPLES)"""
+    for overlap in range(min(len(base), len(values)), 0, -1):
+        if base[-overlap:] == values[:overlap]:
+            return values[overlap:]
+    return values
+
+
+def merge_latencies(base, shards):
+    """
+    Merge step latency samples: the samples every shard added to the base,
+    appended in shard order and trimmed to the newest MAX_SAMPLES per step
+    """
+    base = base or {}
+    merged = {step: list(values) for step, values in base.items()}
+    for samples in shards:
+        for step, values in (samples or {}).items():
+            added = _new_samples(base.get(step, []), values)
+            merged[step] = (merged.get(step, []) + added)[-MAX_SAMPLES:]
+    return merged
+
+
+def _in_root(path):
+    """A path from the config resolved against the repository root, where pytest runs and reads it"""
+    return os.path.join(ROOT, path)
+
+
+def merge(shard_dirs, allure_output=None):
+    """
+    Merge shard artifacts into the repository's Allure results and timing
+    files (the existing timing files are the base the shards started from)
+
+    Args:
+        shard_dirs: Directories holding each shard's allure-results/ and timing files
+        allure_output: Merged results directory (optional, defaults to allure-results/ in the repository)
+    """
+    allure_output = allure_output or _in_root("allure-results")
+    copied = merge_allure([os.path.join(directory, "allure-results") for directory in shard_dirs],
+                          allure_output)
+    print(f"Allure: {copied} result files from {len(shard_dirs)} shard(s) -> {allure_output}")
+
+    for name, merge_function in ((DURATIONS_FILE, merge_durations), (LATENCIES_FILE, merge_latencies)):
+        shards = [_read_json(os.path.join(directory, os.path.basename(name))) for directory in shard_dirs]
+        shards = [data for data in shards if data]
+        if not shards:
+            continue
+        path = _in_root(name)
+        _write_json(path, merge_function(_read_json(path), shards))
+        print(f"Timings: merged {len(shards)} shard file(s) into {path}")
+
+
+def run(count, pytest_args, shard_root=None):
+    """
+    Run `count` shards as separate local pytest processes, like separate
+    machines, and merge them
+
+    Each shard gets its own copy of the durations file, so a shard that
+    finishes early cannot change the split seen by one still collecting;
+    the copies are merged back afterwards. Step latencies are shared (their
+    updates are merged under a file lock).
+
+    Args:
+        count: Number of shards
+        pytest_args: Extra pytest arguments, relative to the repository root
+        shard_root: Per-shard results / logs directory (optional, defaults to shards/ in the repository)
+
+    Returns:
+        int: 0 if every shard passed, else the first non-zero pytest exit code
+    """
+    # Absolute, since the shard processes run from the repository root
+    shard_root = os.path.abspath(shard_root or _in_root("shards"))
+    base_durations = _in_root(DURATIONS_FILE)
+    processes = []
+    shard_dirs = []
+    start = time.monotonic()
+    for number in range(1, count + 1):
+        shard_dir = os.path.join(shard_root, f"shard-{number}")
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        os.makedirs(shard_dir)
+        shard_dirs.append(shard_dir)
+        durations = os.path.join(shard_dir, os.path.basename(DURATIONS_FILE))
+        if os.path.exists(base_durations):
+            shutil.copy2(base_durations, durations)
+        command = [sys.executable, "-m", "pytest", f"--shard={number}/{count}", f"--durations-file={durations}",
+                   f"--alluredir={os.path.join(shard_dir, 'allure-results')}", *pytest_args]
+        log = open(os.path.join(shard_dir, "pytest.log"), "w", encoding="utf-8")
+        processes.append((number, subprocess.Popen(command, cwd=ROOT, stdout=log, stderr=subprocess.STDOUT), log))
+
+    exit_code = 0
+    for number, process, log in processes:
+        code = process.wait()
+        log.close()
+        # 5 = this shard got no tests (more shards than test groups)
+        status = "ok" if code in (0, 5) else f"exit code {code}"
+        print(f"shard {number}/{count}: {status} (log: {log.name})")
+        if code not in (0, 5) and not exit_code:
+            exit_code = code
+    print(f"{count} shard(s) finished in {time.monotonic() - start:.1f}s")
+
+    shutil.rmtree(_in_root("allure-results"), ignore_errors=True)
+    merge(shard_dirs)
+    return exit_code
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run and merge test shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run N shards as local processes and merge them")
+    run_parser.add_argument("count", type=int)
+    run_parser.add_argument("pytest_args", nargs=argparse.REMAINDER, help="Extra pytest arguments")
+    run_parser.add_argument("--shard-root", default=None,
+                            help="Per-shard results / logs directory (default: shards/ in the repository)")
+    merge_parser = commands.add_parser("merge", help="Merge shard artifact directories")
+    merge_parser.add_argument("shard_dirs", nargs="+")
+    merge_parser.add_argument("--allure-output", default=None,
+                              help="Merged Allure results directory (default: allure-results/ in the repository)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.count < 1:
+            parser.error("count must be at least 1")
+        return run(args.count, args.pytest_args, args.shard_root)
+    merge(args.shard_dirs, args.allure_output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
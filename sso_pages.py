@@ -0,0 +1,235 @@
+"""
+SSO Login Page Objects
+One tuned implementation of the shared SSO + PingID login flow, with
+app specific subclasses for the entry locators and post-MFA steps
+"""
+
+from abc import ABC, abstractmethod
+
+import allure
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from instrumentation import span
+from retry import MFACodeRejected, MFACodeUnavailable, get_retry_policy
+from timeouts import get_policy
+
+
+class SSOLoginPage(ABC):
+    """Shared SSO flow: Continue, email, employee ID, password, PingID passcode"""
+
+    name = "sso"
+    url = None
+
+    def __init__(self, page: Page, timeouts=None, retries=None):
+        """
+        Build every locator once so the flow does not re-create them per step
+
+        Args:
+            page: Playwright page to drive
+            timeouts: TimeoutPolicy for per-step budgets (optional, defaults to the shared policy)
+            retries: RetryPolicy for per-step retries (optional, defaults to the shared policy)
+        """
+        self.page = page
+        self.timeouts = timeouts or get_policy()
+        self.retries = retries or get_retry_policy()
+        self.body = page.locator("body")
+        self.password_input = page.locator("#password")
+        self.sign_on_button = page.locator("#signOnButton")
+        self.passcode_input = page.locator(".passcode-input")
+        self.passcode_submit = page.locator("input[value='Sign On']")
+
+        self.continue_button = None
+        self.email_input = None
+        self.email_submit = None
+        self.employee_id_input = None
+        self.remember_username = None
+        self.build_entry_locators(page)
+
+        self.details = []
+
+    @abstractmethod
+    def build_entry_locators(self, page: Page):
+        """Create the app specific locators for the first SSO pages"""
+
+    def record(self, name, value):
+        """Collect a detail for the single summary attachment written by login()"""
+        self.details.append(f"{name}: {value}")
+
+    def open(self):
+        """Navigate to the application entry URL"""
+        self.page.goto(self.url)
+        self.record("Initial URL", self.page.url)
+
+    def check_remember_username(self):
+        self.remember_username.check()
+
+    def submit_identity(self, credentials):
+        """Continue to SSO and submit the email address"""
+        self.continue_button.click()
+        self.email_input.fill(credentials["email"])
+        self.record("Email Entered", credentials["email"])
+        self.email_submit.click()
+
+    def submit_credentials(self, credentials):
+        """Enter employee ID and password and press Sign On"""
+        self.employee_id_input.fill(credentials["employee_id"])
+        self.record("Employee ID", credentials["employee_id"])
+        self.password_input.fill(credentials["password"])
+        self.check_remember_username()
+        self.sign_on_button.click(force=True)
+
+    def complete_mfa(self, mfa_provider):
+        """
+        Fetch a PingID code and submit it on the passcode page
+
+        Raises:
+            MFACodeUnavailable: If the provider does not return a code
+            MFACodeRejected: If the passcode page is still shown after submitting
+        """
+        if getattr(mfa_provider, "just_in_time", False):
+            # PingID was prepared in the background: only generate the code once it can be typed
+            self.passcode_input.wait_for(state="visible")
+            mfa_code = mfa_provider()
+        else:
+            mfa_code = mfa_provider()
+            self.passcode_input.wait_for(state="visible")
+        if not mfa_code:
+            raise MFACodeUnavailable("Failed to retrieve MFA code from PingID")
+        self.record("MFA Code Retrieved", mfa_code)
+
+        self.passcode_input.fill(mfa_code)
+        self.body.click()
+        self.passcode_submit.click()
+        try:
+            self.passcode_input.wait_for(state="hidden")
+        except PlaywrightTimeoutError as e:
+            raise MFACodeRejected("Passcode page still shown after submitting the MFA code") from e
+
+    @staticmethod
+    def recover_mfa(mfa_provider, error):
+        """Before an MFA retry: drop the last code so the provider generates a new one"""
+        invalidate = getattr(mfa_provider, "invalidate", None)
+        if invalidate is not None:
+            invalidate()
+
+    def run_step(self, step, profile, action, recover=None):
+        """
+        Run one tracked phase of the flow, retried on transient errors as the
+        retry policy allows (only the failing phase runs again)
+
+        Args:
+            step: Phase name, prefixed with the page name for timings and retry counts
+            profile: Timeout profile of the phase
+            action: Zero-argument callable performing the phase
+            recover: Callable(exception) run before a retry (optional)
+        """
+        name = f"{self.name}.{step}"
+
+        def attempt():
+            with self.timeouts.track(self.page, name, profile):
+                return action()
+
+        return self.retries.run(name, attempt, recover=recover)
+
+    def after_mfa(self):
+        """App specific steps once the SSO round trip is complete"""
+
+    def login(self, credentials, mfa_provider=None, post_mfa=None):
+        """
+        Run the full login flow
+
+        Args:
+            credentials: Dict with email, employee_id and password
+            mfa_provider: Callable returning an MFA code (optional, defaults to an MFAPrefetch
+                          started here so PingID launches while the browser navigates)
+            post_mfa: Callable run after MFA instead of after_mfa() (optional)
+        """
+        prefetch = None
+        if mfa_provider is None:
+            from mfa_prefetch import MFAPrefetch
+            mfa_provider = prefetch = MFAPrefetch().start()
+
+        run = self.run_step
+        try:
+            with span("Open application and continue to SSO"):
+                run("open", "navigation", self.open)
+                run("submit_identity", "sso_redirect", lambda: self.submit_identity(credentials))
+
+            with span("Submit SSO credentials"):
+                run("submit_credentials", "sso_redirect", lambda: self.submit_credentials(credentials))
+
+            with span("Handle PingID MFA authentication"):
+                run("mfa", "mfa_wait", lambda: self.complete_mfa(mfa_provider),
+                    recover=lambda error: self.recover_mfa(mfa_provider, error))
+
+            with span("Complete application sign-in"):
+                run("after_mfa", "navigation", post_mfa or self.after_mfa)
+        finally:
+            if prefetch is not None:
+                prefetch.close()
+            allure.attach("\n".join(self.details),
+                          name="Login Details",
+                          attachment_type=allure.attachment_type.TEXT)
+
+
+class FileroomLoginPage(SSOLoginPage):
+    """Fileroom production login with domain selection"""
+
+    name = "fileroom"
+    url = "https://production.sureprep.com/"
+    listing_url = "https://production.sureprep.com/Fileroom/Fileroom/Listing"
+
+    def __init__(self, page: Page, domain="Automation-01", timeouts=None, retries=None):
+        super().__init__(page, timeouts, retries)
+        self.domain = domain
+        self.domain_select = page.locator("#SelectedDomainID")
+        self.domain_submit = page.locator("#btnSubmit")
+
+    def build_entry_locators(self, page: Page):
+        self.continue_button = page.locator(".Cont-Btn")
+        self.email_input = page.locator("#username")
+        self.email_submit = page.locator("._button-login-id")
+        self.employee_id_input = page.locator("#username")
+        self.remember_username = page.locator(".remember-username")
+
+    def after_mfa(self):
+        """Select and submit the Fileroom domain"""
+        self.domain_select.select_option(value=self.domain)
+        self.record("Selected Domain", self.domain)
+        self.domain_submit.click()
+
+
+class SCDLoginPage(SSOLoginPage):
+    """SCD Dashboard QAT login with location selection"""
+
+    name = "scd"
+    url = "https://qat-scdashboard.sureprep.com/"
+    home_url = "https://qat-scdashboard.sureprep.com/dashboard/home"
+
+    def __init__(self, page: Page, location="Test", timeouts=None, retries=None):
+        super().__init__(page, timeouts, retries)
+        self.location = location
+        self.location_dropdown = page.locator(".k-select")
+        self.location_option = page.get_by_role("option", name=location)
+        self.location_submit = page.locator(".mdl-button__ripple-container")
+
+    def build_entry_locators(self, page: Page):
+        self.continue_button = page.get_by_role("link", name="CONTINUE")
+        self.email_input = page.get_by_role("textbox", name="Email")
+        self.email_submit = page.get_by_role("button", name="Sign in")
+        self.employee_id_input = page.get_by_role("textbox", name="ex. 6036943, C603694, X696046")
+        self.remember_username = page.locator("label div").filter(has_text="Remember my username").locator("div")
+
+    def check_remember_username(self):
+        # Custom checkbox: the visible div has to be clicked
+        self.remember_username.click()
+
+    def after_mfa(self):
+        """Select and submit the SCD location"""
+        self.location_dropdown.click()
+        self.location_option.click()
+        self.record("Selected Location", self.location)
+        # Wait for the navigation the submit triggers instead of a fixed 5 s
+        with self.page.expect_navigation():
+            self.location_submit.click()
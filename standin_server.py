@@ -0,0 +1,280 @@
+"""
+Local stand-in SSO server
+Issues and validates session cookies so the session cache and login
+fixtures can be exercised without production.sureprep.com or PingID,
+and serves Fileroom / SCD style SSO pages for the login tests
+(--auth-standin) and the login benchmark
+"""
+
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from playwright.sync_api import Page
+
+from login_flows import AuthTarget
+
+
+SESSION_COOKIE = "standin_session"
+
+LOGIN_PAGE = b"""<!DOCTYPE html>
+<html>
+<head><title>Stand-in SSO</title></head>
+<body>
+  <form method="post" action="/login">
+    <input id="username" name="username">
+    <input id="password" name="password" type="password">
+    <input class="passcode-input" name="passcode">
+    <button id="signOnButton" type="submit">Sign On</button>
+  </form>
+</body>
+</html>
+"""
+
+HOME_PAGE = b"""<!DOCTYPE html>
+<html>
+<head>
+  <title>Stand-in Home</title>
+  <script src="/static/analytics.js"></script>
+</head>
+<body>
+  <h1 id="welcome">Signed in</h1>
+  <img src="/static/logo.png" alt="logo">
+</body>
+</html>
+"""
+
+
+def _page(title, body):
+    return f"""<!DOCTYPE html>
+<html>
+<head><title>{title}</title></head>
+<body>
+{body}
+</body>
+</html>
+""".encode()
+
+
+def _passcode_page(app):
+    return _page("Stand-in PingID", f"""  <form method="post" action="/{app}/verify">
+    <input class="passcode-input" name="passcode">
+    <input type="submit" value="Sign On">
+  </form>""")
+
+
+# SSO pages mirroring the locators used by sso_pages.FileroomLoginPage / SCDLoginPage,
+# so the real page objects can be driven (and benchmarked) against this server
+FLOW_PAGES = {
+    "/fileroom/": _page("Stand-in Fileroom", '  <a class="Cont-Btn" href="/fileroom/identity">Continue</a>'),
+    "/fileroom/identity": _page("Stand-in SSO", """  <form action="/fileroom/password">
+    <input id="username" name="email">
+    <button class="_button-login-id" type="submit">Next</button>
+  </form>"""),
+    "/fileroom/password": _page("Stand-in SSO", """  <form action="/fileroom/passcode">
+    <input id="username" name="employee_id">
+    <input id="password" name="password" type="password">
+    <input class="remember-username" type="checkbox">
+    <button id="signOnButton" type="submit">Sign On</button>
+  </form>"""),
+    "/fileroom/passcode": _passcode_page("fileroom"),
+    "/fileroom/domain": _page("Stand-in Fileroom", """  <form action="/fileroom/Fileroom/Listing">
+    <select id="SelectedDomainID" name="domain"><option value="Automation-01">Automation-01</option></select>
+    <button id="btnSubmit" type="submit">Submit</button>
+  </form>"""),
+    "/scd/": _page("Stand-in SCD", '  <a href="/scd/identity">CONTINUE</a>'),
+    "/scd/identity": _page("Stand-in SSO", """  <form action="/scd/password">
+    <input aria-label="Email" name="email">
+    <button type="submit">Sign in</button>
+  </form>"""),
+    "/scd/password": _page("Stand-in SSO", """  <form action="/scd/passcode">
+    <input aria-label="ex. 6036943, C603694, X696046" name="employee_id">
+    <input id="password" name="password" type="password">
+    <label><div>Remember my username<div style="width:12px;height:12px;border:1px solid"></div></div></label>
+    <button id="signOnButton" type="submit">Sign On</button>
+  </form>"""),
+    "/scd/passcode": _passcode_page("scd"),
+    "/scd/location": _page("Stand-in SCD", """  <span class="k-select" onclick="document.getElementById('locations').hidden = false">Location</span>
+  <ul id="locations" role="listbox" hidden><li role="option" onclick="this.parentNode.hidden = true">Test</li></ul>
+  <a class="mdl-button" href="/scd/dashboard/home"><span class="mdl-button__ripple-container">Submit</span></a>"""),
+}
+
+# Pages that need a session (HOME_PAGE unless listed), and where a verified passcode leads
+PROTECTED_PATHS = ("/home", "/fileroom/Fileroom/Listing", "/scd/dashboard/home")
+PROTECTED_PAGES = {
+    "/scd/dashboard/home": _page("Stand-in SCD Dashboard", """  <button aria-label="Toggle navigation">Menu</button>
+  <a href="#verification">Test Verification</a>
+  <a href="#queue">Manager Assignment Queue</a>
+  <button>Settings</button>
+  <button onclick="location.href = '/scd/'">Logout</button>"""),
+}
+AFTER_MFA = {"/fileroom/verify": "/fileroom/domain", "/scd/verify": "/scd/location"}
+
+
+# Non-essential asset served for every /static/ URL (exercises lean mode filtering)
+STATIC_ASSET = b"\x00" * 20000
+
+
+class StandInServer:
+    """Threaded HTTP server that emulates an SSO protected application"""
+
+    def __init__(self, host="127.0.0.1", port=0, session_ttl=300):
+        """
+        Initialize the stand-in server
+
+        Args:
+            host: Interface to bind (defaults to loopback)
+            port: Port to bind (0 picks a free port)
+            session_ttl: Seconds a server-side session stays valid
+        """
+        self.session_ttl = session_ttl
+        self.sessions = {}
+        self.login_count = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """Start serving on a background thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server and release the port"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def issue_session(self):
+        """Create a new session token"""
+        token = secrets.token_hex(16)
+        with self._lock:
+            self.sessions[token] = time.time() + self.session_ttl
+            self.login_count += 1
+        return token
+
+    def is_valid(self, token):
+        """Check whether a session token exists and has not expired"""
+        with self._lock:
+            expires_at = self.sessions.get(token)
+        return expires_at is not None and time.time() < expires_at
+
+    def revoke_all(self):
+        """Reject every issued session (simulates a server-side logout)"""
+        with self._lock:
+            self.sessions.clear()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _session_token(self):
+                for part in self.headers.get("Cookie", "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == SESSION_COOKIE:
+                        return value
+                return None
+
+            def _send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _start_session(self, location):
+                token = server.issue_session()
+                self._send(302, headers={
+                    "Location": location,
+                    "Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; HttpOnly",
+                })
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path.startswith("/static/"):
+                    self._send(200, STATIC_ASSET)
+                elif path in FLOW_PAGES:
+                    self._send(200, FLOW_PAGES[path])
+                elif path in PROTECTED_PATHS:
+                    if server.is_valid(self._session_token()):
+                        self._send(200, PROTECTED_PAGES.get(path, HOME_PAGE))
+                    else:
+                        self._send(302, headers={"Location": "/"})
+                else:
+                    self._send(200, LOGIN_PAGE)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode())
+                if self.path == "/login" and form.get("username"):
+                    self._start_session("/home")
+                elif self.path in AFTER_MFA and re.fullmatch(r"\d{6}", form.get("passcode", [""])[0]):
+                    self._start_session(AFTER_MFA[self.path])
+                else:
+                    self._send(401, LOGIN_PAGE)
+
+        return Handler
+
+
+def standin_login(page: Page, base_url):
+    """Walk the stand-in login form"""
+    page.goto(base_url)
+    page.locator("#username").fill("standin-user")
+    page.locator("#password").fill("standin-password")
+    page.locator(".passcode-input").fill("000000")
+    page.locator("#signOnButton").click()
+    page.wait_for_url(f"{base_url}home")
+
+
+# Accepted by the stand-in flows, which check no passwords
+STANDIN_CREDENTIALS = {
+    "email": "standin@example.com",
+    "employee_id": "0000000",
+    "password": "standin-password",
+}
+
+
+def standin_mfa_code():
+    """MFA provider for the stand-in flows, which accept any 6 digit passcode"""
+    return "000000"
+
+
+def standin_urls(server):
+    """URL overrides pointing the Fileroom / SCD page objects at the stand-in flows (see login_flows.app_page)"""
+    return {
+        "fileroom": {"url": f"{server.url}fileroom/", "listing_url": f"{server.url}fileroom/Fileroom/Listing"},
+        "scd": {"url": f"{server.url}scd/", "home_url": f"{server.url}scd/dashboard/home"},
+    }
+
+
+def standin_target(server):
+    """Build an AuthTarget pointing at a running stand-in server"""
+    return AuthTarget(
+        name="standin",
+        base_url=server.url,
+        check_url=f"{server.url}home",
+        login=lambda page: standin_login(page, server.url),
+    )
+
+
+if __name__ == "__main__":
+    server = StandInServer(port=8765).start()
+    print(f"Stand-in SSO server running at {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,201 @@
+"""
+Startup Profile
+Measures what test collection costs: import time per module (from
+python -X importtime) and the collection time of `pytest --collect-only`,
+flags desktop automation modules that should only load on first MFA use,
+and compares the run with a stored baseline
+
+Usage:
+    python startup_profile.py                        # report (all test files)
+    python startup_profile.py CalculatorApp.py       # profile collecting a subset
+    python startup_profile.py --save-baseline
+    python startup_profile.py --check                # exit 1 on a collection time regression
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+try:
+    from config import STARTUP_PROFILE_CONFIG
+except ImportError:
+    STARTUP_PROFILE_CONFIG = {}
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Loaded on first MFA / desktop use only; importing any of them during collection is a regression
+LAZY_MODULES = ("pywinauto", "comtypes", "pyperclip", "win32api", "win32gui", "pingid_automation")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+COLLECTED_IN = re.compile(r"in ([\d.]+)s")
+
+
+def run_collection(pytest_args=()):
+    """
+    Run `pytest --collect-only` under -X importtime
+
+    Output capturing is disabled (-s), otherwise pytest swallows the import
+    times written while the test modules are collected.
+
+    Returns:
+        tuple: (importtime stderr, stdout, wall seconds, pytest exit code)
+    """
+    command = [sys.executable, "-X", "importtime", "-m", "pytest", "--collect-only", "-q", "-s",
+               "-p", "no:cacheprovider", *pytest_args]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    return completed.stderr, completed.stdout, time.perf_counter() - start, completed.returncode
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output
+
+    Returns:
+        list: (module, self_us, cumulative_us, depth) in import order
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def _local_modules():
+    return {name[:-3] for name in os.listdir(ROOT) if name.endswith(".py")}
+
+
+def profile(pytest_args=()):
+    """
+    Profile one collection run
+
+    Returns:
+        dict: wall_ms, collect_ms, import_ms, per-package and per-local-module import
+              times (ms, self time summed), eager lazy modules and the pytest exit code
+    """
+    stderr, stdout, wall, returncode = run_collection(pytest_args)
+    entries = parse_importtime(stderr)
+    local = _local_modules()
+
+    packages, modules = {}, {}
+    for module, self_us, cumulative_us, _ in entries:
+        root = module.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us / 1000
+        if root in local:
+            # Cumulative: what importing this repo module pulled in
+            modules[module] = max(modules.get(module, 0), cumulative_us / 1000)
+
+    collected = COLLECTED_IN.findall(stdout.strip().splitlines()[-1] if stdout.strip() else "")
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "pytest_args": list(pytest_args),
+        "exit_code": returncode,
+        "wall_ms": round(wall * 1000, 1),
+        "collect_ms": round(float(collected[-1]) * 1000, 1) if collected else None,
+        "import_ms": round(sum(self_us for _, self_us, _, _ in entries) / 1000, 1),
+        "packages": {name: round(ms, 2) for name, ms in sorted(packages.items(), key=lambda item: -item[1])},
+        "local_modules": {name: round(ms, 2) for name, ms in sorted(modules.items(), key=lambda item: -item[1])},
+        "eager_lazy_modules": sorted({module.split(".")[0] for module, _, _, _ in entries} & set(LAZY_MODULES)),
+    }
+
+
+def compare(current, baseline, threshold, min_delta_ms):
+    """
+    Compare a profile with a baseline
+
+    Returns:
+        list: (metric, baseline_ms, current_ms) for every regressed metric
+    """
+    regressions = []
+    for metric in ("collect_ms", "wall_ms", "import_ms"):
+        before, after = baseline.get(metric), current.get(metric)
+        if before is None or after is None:
+            continue
+        if after > before * (1 + threshold) and after - before >= min_delta_ms:
+            regressions.append((metric, before, after))
+    return regressions
+
+
+def format_report(result, top=15, baseline=None):
+    """Return a printable startup report"""
+    def _line(label, metric):
+        value = result.get(metric)
+        text = f"{value:9.1f}ms" if value is not None else f"{'-':>11}"
+        base = (baseline or {}).get(metric)
+        return f"  {label:<22} {text}" + (f"   (baseline {base:.1f}ms)" if base is not None else "")
+
+    lines = [
+        _line("pytest wall time", "wall_ms"),
+        _line("collection", "collect_ms"),
+        _line("imports (self total)", "import_ms"),
+        "",
+        f"  Top {top} packages by import time (ms, self):",
+    ]
+    lines += [f"    {name:<36} {ms:9.2f}" for name, ms in list(result["packages"].items())[:top]]
+    lines += ["", "  Repo modules (ms, cumulative):"]
+    lines += [f"    {name:<36} {ms:9.2f}" for name, ms in result["local_modules"].items()]
+    if result["eager_lazy_modules"]:
+        lines += ["", f"  Imported during collection but should be lazy: {', '.join(result['eager_lazy_modules'])}"]
+    return "\n".join(lines)
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile test collection and startup imports")
+    parser.add_argument("pytest_args", nargs="*", help="Test files / pytest options to collect (default: all)")
+    parser.add_argument("--top", type=int, default=15, help="Packages listed in the report")
+    parser.add_argument("--runs", type=int, default=STARTUP_PROFILE_CONFIG.get("runs", 3),
+                        help="Collection runs; the fastest one is reported")
+    parser.add_argument("--output", default=STARTUP_PROFILE_CONFIG.get("output_file", "startup_profile.json"))
+    parser.add_argument("--baseline", default=STARTUP_PROFILE_CONFIG.get("baseline_file", "startup_baseline.json"))
+    parser.add_argument("--threshold", type=float, default=STARTUP_PROFILE_CONFIG.get("regression_threshold", 0.3))
+    parser.add_argument("--min-delta-ms", type=float, default=STARTUP_PROFILE_CONFIG.get("min_delta_ms", 100))
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit 1 if collection regressed against the baseline or a lazy module was imported")
+    args = parser.parse_args(argv)
+
+    # Fastest of a few runs: the first one also pays for cold disk caches / .pyc compilation
+    runs = [profile(args.pytest_args) for _ in range(max(1, args.runs))]
+    result = min(runs, key=lambda run: run["wall_ms"])
+    baseline = _read_json(args.baseline)
+    regressions = compare(result, baseline, args.threshold, args.min_delta_ms) if baseline else []
+    result["regressions"] = [{"metric": metric, "baseline_ms": before, "ms": after}
+                             for metric, before, after in regressions]
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Startup profile (fastest of {len(runs)} collection runs):\n{format_report(result, args.top, baseline)}")
+    if result["exit_code"] not in (0, 5):
+        print(f"  pytest --collect-only exited with {result['exit_code']}")
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    for metric, before, after in regressions:
+        print(f"REGRESSION: {metric} {after:.1f}ms vs baseline {before:.1f}ms (threshold {args.threshold:.0%})")
+    if not args.check:
+        return 0
+    return 1 if regressions or result["eager_lazy_modules"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
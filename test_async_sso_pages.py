@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from async_sso_pages import login_concurrently
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    async def new_page(self):
+        return object()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    async def new_context(self):
+        self.contexts.append(FakeContext())
+        return self.contexts[-1]
+
+
+class FakeLoginPage:
+    url = None
+
+    def __init__(self, page, fail=False, delay=0.0):
+        self.fail = fail
+        self.delay = delay
+
+    async def login(self, credentials, mfa_provider=None):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("passcode rejected")
+
+
+def _logins(*page_args):
+    return [{"page_class": FakeLoginPage, "credentials": {}, **args} for args in page_args]
+
+
+def test_logins_run_concurrently_and_keep_their_contexts():
+    browser = FakeBrowser()
+    sessions = asyncio.run(login_concurrently(browser, _logins({"delay": 0.01}, {})))
+    assert [context for context, _ in sessions] == browser.contexts
+    assert not any(context.closed for context in browser.contexts)
+
+
+def test_a_failed_login_closes_every_context():
+    browser = FakeBrowser()
+    # The failing login finishes first, while the slower one is still running
+    with pytest.raises(RuntimeError, match="passcode rejected"):
+        asyncio.run(login_concurrently(browser, _logins({"delay": 0.05}, {"fail": True})))
+    assert len(browser.contexts) == 2
+    assert all(context.closed for context in browser.contexts)
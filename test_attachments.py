@@ -0,0 +1,87 @@
+import io
+import sys
+import threading
+
+import allure
+import pytest
+
+import attachments
+from attachments import AttachmentManager, AttachmentWarning, _downscale
+
+
+@pytest.fixture
+def attached(monkeypatch):
+    written = []
+    monkeypatch.setattr(attachments.allure, "attach",
+                        lambda body, name, attachment_type: written.append((name, body, attachment_type)))
+    return written
+
+
+def test_heavy_attachments_of_passing_tests_are_never_captured(attached):
+    manager = AttachmentManager(sample_rate=0.0)
+    captures = []
+    manager.text("URL", "https://example.com")
+    manager.capture("screenshot", lambda: captures.append(None) or b"jpeg", allure.attachment_type.JPG)
+
+    manager.resolve(failed=False)
+    manager.flush()
+    assert captures == []
+    assert [name for name, _, _ in attached] == ["Test Details"]
+
+
+def test_failed_tests_are_processed_off_the_test_thread(attached):
+    manager = AttachmentManager()
+    threads = []
+
+    def process(data):
+        threads.append(threading.current_thread().name)
+        return data.upper()
+
+    manager.capture("dump", lambda: b"controls", allure.attachment_type.TEXT, process=process)
+    manager.resolve(failed=True)
+    manager.flush()
+    assert attached == [("dump", b"CONTROLS", allure.attachment_type.TEXT)]
+    assert threads[0].startswith("attachments")
+    assert manager.ready == [] and manager.texts == []
+
+
+def test_sampled_passing_tests_keep_heavy_attachments(attached):
+    manager = AttachmentManager(sample_rate=0.5, rng=lambda: 0.25)
+    manager.capture("dump", lambda: b"controls", allure.attachment_type.TEXT)
+    manager.resolve(failed=False)
+    manager.flush()
+    assert [name for name, _, _ in attached] == ["dump"]
+
+
+def test_processing_failure_warns_and_attaches_the_original(attached):
+    manager = AttachmentManager()
+
+    def process(data):
+        raise OSError("cannot identify image file")
+
+    manager.capture("screenshot", lambda: b"jpeg", allure.attachment_type.JPG, process=process)
+    manager.resolve(failed=True)
+    with pytest.warns(AttachmentWarning, match="screenshot: cannot identify image file"):
+        manager.flush()
+    assert attached == [("screenshot", b"jpeg", allure.attachment_type.JPG)]
+
+
+def _png(width, height):
+    image = pytest.importorskip("PIL.Image").new("RGB", (width, height), "white")
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def test_wide_screenshots_are_downscaled_with_pillow():
+    narrow = _png(800, 100)
+    assert _downscale(narrow, 1280, 60) == narrow
+
+    from PIL import Image
+    downscaled = Image.open(io.BytesIO(_downscale(_png(2560, 200), 1280, 60)))
+    assert (downscaled.format, downscaled.size) == ("JPEG", (1280, 100))
+
+
+def test_screenshots_are_kept_as_is_without_pillow(monkeypatch):
+    monkeypatch.setitem(sys.modules, "PIL", None)
+    assert _downscale(b"not even an image", 1280, 60) == b"not even an image"
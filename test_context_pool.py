@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+
+from context_pool import RESTORE_LOCAL_STORAGE, ContextPool, format_report, merge_counters
+
+
+class FakePage:
+    def __init__(self):
+        self.visited = []
+        self.scripts = []
+        self.routes = []
+
+    def is_closed(self):
+        return False
+
+    def close(self):
+        pass
+
+    def goto(self, url):
+        self.visited.append(url)
+
+    def evaluate(self, script, arg):
+        self.scripts.append((script, arg))
+
+    def route(self, url, handler):
+        self.routes.append(url)
+
+    def unroute(self, url, handler):
+        self.routes.remove(url)
+
+
+class FakeContext:
+    """BrowserContext of Playwright before 1.59: no set_storage_state()"""
+
+    def __init__(self, origins=(), fail_reset=False):
+        self.pages = [FakePage()]
+        self.origins = [{"origin": origin, "localStorage": []} for origin in origins]
+        self.fail_reset = fail_reset
+        self.cookies = ["stale"]
+        self.closed = False
+
+    def new_page(self):
+        self.pages.append(FakePage())
+        return self.pages[-1]
+
+    def unroute_all(self, behavior=None):
+        if self.fail_reset:
+            raise RuntimeError("Target page, context or browser has been closed")
+
+    def clear_permissions(self):
+        pass
+
+    def set_extra_http_headers(self, headers):
+        pass
+
+    def set_offline(self, offline):
+        pass
+
+    def storage_state(self):
+        return {"cookies": self.cookies, "origins": self.origins}
+
+    def clear_cookies(self):
+        self.cookies = []
+
+    def add_cookies(self, cookies):
+        self.cookies += cookies
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def _pool(*contexts):
+    contexts = list(contexts)
+    browser = SimpleNamespace(new_context=lambda **kwargs: contexts.pop(0))
+    return ContextPool(browser, size=2, max_reuse=5)
+
+
+def test_reset_without_set_storage_state_restores_cookies_and_local_storage():
+    context = FakeContext(origins=["https://fileroom.example"])
+    pool = _pool(context)
+    pool.release(pool.acquire())
+    state = {"cookies": ["session"],
+             "origins": [{"origin": "https://scd.example", "localStorage": [{"name": "token", "value": "t"}]}]}
+
+    assert pool.acquire(state) is context
+    page = context.pages[0]
+    assert context.cookies == ["session"]
+    # The origin the last test used is cleared, the one in the state is restored
+    assert page.scripts == [(RESTORE_LOCAL_STORAGE, []), (RESTORE_LOCAL_STORAGE, [{"name": "token", "value": "t"}])]
+    assert page.visited == ["https://fileroom.example/", "https://scd.example/", "about:blank"]
+    assert page.routes == []
+    assert pool.stats()["hits"] == 1
+
+
+def test_reset_failures_show_in_the_report():
+    broken, fresh = FakeContext(fail_reset=True), FakeContext()
+    pool = _pool(broken, fresh)
+    pool.release(pool.acquire())
+
+    assert pool.acquire() is fresh
+    assert broken.closed
+    stats = pool.stats()
+    assert (stats["hits"], stats["misses"], stats["reset_failures"]) == (0, 2, 1)
+    assert "reset failed 1 time(s)" in pool.report()
+    assert "RuntimeError: Target page, context or browser has been closed" in pool.report()
+
+
+def test_worker_counters_merge_into_one_report():
+    first, second = _pool(FakeContext()), _pool(FakeContext(fail_reset=True), FakeContext())
+    for pool in (first, second):
+        pool.release(pool.acquire())
+        pool.acquire()
+
+    counters = merge_counters(merge_counters(None, first.export()), second.export())
+    assert (counters["hits"], counters["misses"], counters["reset_failures"]) == (1, 3, 1)
+    assert "contexts: 1 reused / 3 created (hit rate 25%)" in format_report(counters)
+    assert "reset failed 1 time(s)" in format_report(counters)
@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+
+import pytest
+
+import desktop_backend
+import pingid_automation
+import ui_snapshot
+from desktop_backend import ElementNotFound, FakeBackend
+from pingid_automation import PINGID_LOCATORS, PingIDAutomation
+from waits import FakeClock
+
+
+@pytest.fixture
+def backend():
+    return FakeBackend()
+
+
+@pytest.fixture
+def pingid(backend, tmp_path, monkeypatch):
+    # The locator cache is written to the working directory
+    monkeypatch.chdir(tmp_path)
+    return PingIDAutomation(exe_path="PingID.exe", pin="1234", timeout=5, clock=FakeClock(), backend=backend)
+
+
+def test_launch_opens_the_recorded_window(backend):
+    process = backend.launch(r"C:\Program Files\Ping Identity\PingID\PingID.exe")
+    [window] = backend.windows(process_id=process.pid)
+    assert window.window_text() == "PingID"
+    assert process.poll() is None
+
+    window.close()
+    assert backend.windows() == []
+    assert process.poll() == 0
+
+
+def test_launch_without_a_recorded_tree(backend):
+    with pytest.raises(FileNotFoundError):
+        backend.launch("Unknown.exe")
+
+
+def test_hidden_controls_are_not_found_until_revealed(backend):
+    backend.launch("PingID.exe")
+    window = backend.window(title="PingID").wrapper_object()
+    code_spec = window.child_window(auto_id="JavaFX50")
+    assert not code_spec.exists()
+    with pytest.raises(ElementNotFound):
+        code_spec.wrapper_object()
+
+    window.child_window(title="Copy", control_type="Button").wrapper_object()
+    assert not window.child_window(title="Copy").is_enabled()
+    window.child_window(title="Next", control_type="Button").click()
+    code = code_spec.window_text()
+    assert len(code) == 6 and code.isdigit()
+    assert window.child_window(title="Copy").is_enabled()
+
+
+def test_copy_button_fills_the_clipboard(backend):
+    backend.launch("PingID.exe")
+    window = backend.window(title="PingID").wrapper_object()
+    window.child_window(title="Next").click()
+    window.child_window(title="Copy").click()
+    assert backend.read_clipboard() == window.child_window(auto_id="JavaFX50").window_text()
+
+
+@pytest.mark.parametrize("code_source", ["text", "clipboard"])
+def test_get_mfa_code_against_the_fake_tree(pingid, backend, code_source):
+    pingid.code_source = code_source
+    code = pingid.get_mfa_code()
+    assert code is not None and len(code) == 6
+    assert backend.keystrokes == len("1234")
+    # The window is closed after reading the code
+    assert backend.windows() == []
+
+
+def test_warm_codes_are_fresh_and_keep_the_window_open(pingid, backend):
+    pingid.code_source = "text"
+    first = pingid.get_mfa_code_warm()
+    second = pingid.get_mfa_code_warm()
+    assert first and second and first != second
+    assert len(backend.windows()) == 1
+
+
+def test_snapshot_diff_shows_only_changed_controls(backend):
+    backend.launch("PingID.exe")
+    window = backend.window(title="PingID")
+    before = ui_snapshot.capture(window, exe="PingID.exe")
+    assert before["exe"] == "PingID.exe"
+    assert before["children"][1]["path"] == "Window[0]/Edit[0]"
+
+    window.child_window(title="Next").click()
+    changes = ui_snapshot.diff(before, ui_snapshot.capture(window))
+
+    assert set(changes["added"]) == {"#JavaFX50"}
+    assert changes["removed"] == {}
+    assert changes["changed"] == {"#JavaFX32": {"enabled": (False, True)}}
+
+
+def test_snapshot_round_trips_as_a_fake_tree(backend, tmp_path):
+    backend.launch("PingID.exe")
+    path = str(tmp_path / "pingid_snapshot.json")
+    ui_snapshot.save(ui_snapshot.capture(backend.window(title="PingID"), exe="PingID.exe"), path)
+
+    replayed = FakeBackend(trees=[path])
+    replayed.launch("PingID.exe")
+    assert ui_snapshot.diff(ui_snapshot.load(path), ui_snapshot.capture(replayed.window(title="PingID"))) == \
+        {"added": {}, "removed": {}, "changed": {}}
+
+
+def test_check_locators_against_a_snapshot(backend):
+    backend.launch("PingID.exe")
+    window = backend.window(title="PingID")
+    window.child_window(title="Next").click()
+    results = ui_snapshot.check_locators(ui_snapshot.capture(window), PINGID_LOCATORS)
+
+    assert results["pin_input"] == ["edit_found_index_0", "auto_id_JavaFX42", "descendants_edit"]
+    assert results["copy_button"] == ["title_Copy", "auto_id_JavaFX32"]
+    assert results["code_text"] == ["auto_id_JavaFX50", "text_matching_code"]
+
+
+def test_check_locators_reports_missing_controls():
+    snapshot = {"control_type": "Window", "title": "PingID", "children": [{"control_type": "Edit"}]}
+    results = ui_snapshot.check_locators(snapshot, PINGID_LOCATORS)
+    assert results["pin_input"]
+    assert results["next_button"] == []
+    assert "MISS next_button: no strategy matches" in ui_snapshot.format_locator_check(results)
+
+
+def test_selected_backend_is_the_default(monkeypatch):
+    # monkeypatch restores a backend selected with --desktop-backend afterwards
+    monkeypatch.setattr(desktop_backend, "_selected", None)
+    monkeypatch.setattr(desktop_backend, "_backends", {})
+    monkeypatch.setenv("DESKTOP_BACKEND", "uia")
+    desktop_backend.select_backend("fake")
+    assert desktop_backend.backend_name() == "fake"
+    assert isinstance(desktop_backend.get_backend(), FakeBackend)
+
+    desktop_backend.select_backend(None)
+    assert desktop_backend.backend_name() == "uia"
+
+
+def test_fake_backend_needs_no_pingid_config(backend, tmp_path, monkeypatch):
+    monkeypatch.setattr(pingid_automation, "PINGID_CONFIG", {})
+    monkeypatch.chdir(tmp_path)
+    pingid = PingIDAutomation(backend=backend, clock=FakeClock())
+    assert pingid.exe_path == "PingID.exe"
+    assert pingid.get_mfa_code()
+
+
+def test_uia_backend_requires_exe_path_and_pin(monkeypatch):
+    monkeypatch.setattr(pingid_automation, "PINGID_CONFIG", {})
+    with pytest.raises(ValueError, match="exe_path"):
+        PingIDAutomation(backend=SimpleNamespace(name="uia"))
+    assert PingIDAutomation(exe_path="PingID.exe", pin="1234", backend=SimpleNamespace(name="uia")).pin == "1234"
@@ -0,0 +1,26 @@
+import pytest
+
+from har_replay import RecordedCodesExhausted, RecordingMFAProvider, ReplayMFAProvider, har_paths
+
+
+def test_recorded_codes_replay_in_order(tmp_path):
+    codes = iter(["111111", "222222"])
+    _, codes_path = har_paths("FileroomLogin-test_fileroomLogin", har_dir=str(tmp_path / "har"))
+    recording = RecordingMFAProvider(lambda: next(codes), codes_path)
+    assert [recording(), recording()] == ["111111", "222222"]
+    recording.save()
+
+    replay = ReplayMFAProvider(codes_path)
+    assert [replay(), replay()] == ["111111", "222222"]
+    with pytest.raises(RecordedCodesExhausted, match=r"MFA code #3 .* recorded 2"):
+        replay()
+
+
+def test_replay_without_recorded_codes_uses_the_default_code(tmp_path):
+    assert ReplayMFAProvider(str(tmp_path / "missing.mfa.json"))() == "000000"
+
+
+def test_nothing_is_saved_without_codes(tmp_path):
+    codes_path = tmp_path / "har" / "flow.mfa.json"
+    RecordingMFAProvider(lambda: None, str(codes_path)).save()
+    assert not codes_path.exists()
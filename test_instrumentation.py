@@ -0,0 +1,35 @@
+from contextlib import nullcontext
+
+import pytest
+
+from instrumentation import SummaryExporter, Tracer
+
+
+def _run(tracer, name, fail=False):
+    with pytest.raises(RuntimeError) if fail else nullcontext():
+        with tracer.span(name):
+            if fail:
+                raise RuntimeError(name)
+
+
+def test_summary_counts_spans_and_failures():
+    exporter = SummaryExporter()
+    tracer = Tracer([exporter])
+    _run(tracer, "login")
+    _run(tracer, "login", fail=True)
+    assert len(exporter.durations["login"]) == 2
+    assert exporter.failures == {"login": 1}
+    assert exporter.table().splitlines()[1].split()[:2] == ["login", "2"]
+
+
+def test_worker_summaries_merge_into_the_controller():
+    worker, controller = SummaryExporter(), SummaryExporter(max_samples=3)
+    worker_tracer = Tracer([worker])
+    for _ in range(2):
+        _run(worker_tracer, "mfa", fail=True)
+    _run(Tracer([controller]), "mfa")
+
+    controller.merge(worker.export())
+    controller.merge(worker.export())
+    assert len(controller.durations["mfa"]) == 3
+    assert controller.failures == {"mfa": 4}
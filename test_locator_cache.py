@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from locator_cache import LocatorCache, LocatorResolver
+from waits import FakeClock, WaitTimeoutError
+
+
+class Strategies:
+    """Lookup strategies recording the order they are tried in"""
+
+    def __init__(self, found_by):
+        self.found_by = set(found_by)
+        self.tried = []
+
+    def __call__(self, name):
+        def locate(root):
+            self.tried.append(name)
+            return f"control via {name}" if name in self.found_by else None
+        return name, locate
+
+
+def _resolver(strategies, cache):
+    return LocatorResolver({"copy_button": [strategies("title"), strategies("auto_id"), strategies("tree_walk")]},
+                           cache)
+
+
+def test_cached_strategy_is_tried_first(tmp_path):
+    path = str(tmp_path / "locators.json")
+    strategies = Strategies(found_by={"auto_id"})
+    assert _resolver(strategies, LocatorCache(path, "1.0")).find(None, "copy_button") == "control via auto_id"
+    assert strategies.tried == ["title", "auto_id"]
+
+    strategies.tried.clear()
+    assert _resolver(strategies, LocatorCache(path, "1.0")).find(None, "copy_button") == "control via auto_id"
+    assert strategies.tried == ["auto_id"]
+
+
+def test_miss_invalidates_and_falls_back_to_every_strategy(tmp_path):
+    path = str(tmp_path / "locators.json")
+    cache = LocatorCache(path, "1.0")
+    cache.record("copy_button", "auto_id")
+    strategies = Strategies(found_by=())
+
+    with pytest.raises(WaitTimeoutError):
+        _resolver(strategies, cache).resolve(None, "copy_button", timeout=1, clock=FakeClock())
+    assert strategies.tried[:3] == ["auto_id", "title", "tree_walk"]
+    assert LocatorCache(path, "1.0").get("copy_button") is None
+
+    # The app changed: another strategy wins and is cached
+    strategies.found_by = {"tree_walk"}
+    strategies.tried.clear()
+    assert _resolver(strategies, cache).find(None, "copy_button") == "control via tree_walk"
+    assert strategies.tried == ["title", "auto_id", "tree_walk"]
+    assert LocatorCache(path, "1.0").get("copy_button") == "tree_walk"
+
+
+def test_entries_are_keyed_by_app_version(tmp_path):
+    path = str(tmp_path / "locators.json")
+    LocatorCache(path, "1.0").record("copy_button", "auto_id")
+
+    upgraded = LocatorCache(path, "2.0")
+    assert upgraded.get("copy_button") is None
+    assert LocatorCache(path, "1.0").get("copy_button") == "auto_id"
+
+    upgraded.record("copy_button", "title")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"2.0": {"copy_button": "title"}}
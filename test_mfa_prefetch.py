@@ -0,0 +1,70 @@
+import pytest
+
+import pingid_automation
+from desktop_backend import FakeBackend
+from mfa_prefetch import MFAPrefetch
+from pingid_automation import PingIDAutomation, pingid_lock
+from waits import FakeClock
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(pingid_automation, "PINGID_CONFIG",
+                        {"lock_file": str(tmp_path / "pingid.lock"), "lock_timeout": 1})
+    return FakeBackend()
+
+
+def _prefetch(backend):
+    pingid = PingIDAutomation(exe_path="PingID.exe", pin="1234", timeout=5, clock=FakeClock(), backend=backend)
+    return MFAPrefetch(pingid=pingid, use_service=False)
+
+
+def test_warm_up_does_not_hold_the_lock_while_the_browser_navigates(backend):
+    prefetch = _prefetch(backend).start()
+    try:
+        prefetch._prepared.result(timeout=5)
+        assert len(backend.windows()) == 1
+        # Another worker can take PingID while this test is still in the SSO pages
+        other = pingid_lock()
+        assert other.try_acquire()
+        other.release()
+
+        assert prefetch.result(timeout=5)
+        assert backend.windows() == []
+    finally:
+        prefetch.close()
+
+
+def test_busy_pingid_is_not_warmed_up_and_the_code_is_read_once_free(backend):
+    other = pingid_lock()
+    assert other.try_acquire()
+    prefetch = _prefetch(backend).start()
+    try:
+        assert prefetch._prepared.result(timeout=5)
+        assert backend.windows() == []
+        other.release()
+
+        assert prefetch.result(timeout=5)
+    finally:
+        prefetch.close()
+
+
+def test_close_shuts_an_unused_warm_window(backend):
+    prefetch = _prefetch(backend).start()
+    prefetch._prepared.result(timeout=5)
+    assert len(backend.windows()) == 1
+    prefetch.close()
+    assert backend.windows() == []
+
+
+def test_invalidate_generates_a_new_code(backend):
+    prefetch = _prefetch(backend).start()
+    try:
+        first = prefetch.result(timeout=5)
+        assert prefetch.result(timeout=5) == first
+        prefetch.invalidate()
+        second = prefetch.result(timeout=5)
+        assert second and second != first
+    finally:
+        prefetch.close()
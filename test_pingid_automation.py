@@ -0,0 +1,92 @@
+from desktop_backend import FakeBackend, FakeElement
+from pingid_automation import PingIDAutomation
+from waits import FakeClock
+
+
+class LateCopyButton:
+    """Copy button whose first clicks happen before PingID rendered the code"""
+
+    def __init__(self, backend, code, ready_after):
+        self.backend = backend
+        self.code = code
+        self.ready_after = ready_after
+        self.clicks = 0
+
+    def click(self):
+        self.clicks += 1
+        if self.clicks >= self.ready_after:
+            self.backend.clipboard = self.code
+
+
+def _automation(backend):
+    return PingIDAutomation(exe_path="PingID.exe", pin="1234", timeout=5, clock=FakeClock(), backend=backend)
+
+
+def test_read_code_clicks_copy_until_the_clipboard_changes():
+    backend = FakeBackend()
+    backend.clipboard = "stale clipboard"
+    button = LateCopyButton(backend, "123 456", ready_after=3)
+
+    assert _automation(backend)._read_code(None, button) == "123456"
+    assert button.clicks == 3
+
+
+class CodeSequenceButton:
+    """Copy button copying the codes PingID shows, one per click (the last one repeats)"""
+
+    def __init__(self, backend, codes):
+        self.backend = backend
+        self.codes = list(codes)
+
+    def click(self):
+        self.backend.clipboard = self.codes.pop(0) if len(self.codes) > 1 else self.codes[0]
+
+
+def test_code_from_a_previous_instance_is_not_handed_out_again(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    backend = FakeBackend()
+    code = _automation(backend).get_mfa_code()
+    assert code
+
+    # automate_pingid_mfa() uses a new instance per login while PingID still shows the old code
+    backend.clipboard = "copied in between"
+    button = CodeSequenceButton(backend, [code, code, "654321"])
+    assert _automation(backend)._read_code(None, button) == "654321"
+    assert button.codes == ["654321"]
+
+
+def test_read_code_ignores_the_previous_code_left_in_the_clipboard():
+    backend = FakeBackend()
+    automation = _automation(backend)
+    automation.last_code = "111111"
+    backend.clipboard = "111111"
+    button = LateCopyButton(backend, "222222", ready_after=2)
+
+    assert automation._read_code(None, button) == "222222"
+
+
+def test_code_text_is_looked_up_once_and_then_polled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    backend = FakeBackend()
+    automation = _automation(backend)
+    automation.code_source = "text"
+    backend.launch("PingID.exe")
+    dlg = backend.window(title="PingID").wrapper_object()
+    dlg.child_window(title="Next").click()
+
+    # PingID still shows the code handed out last time for a few polls
+    code_element = dlg.find("JavaFX50")
+    automation.last_code = code_element.title
+    texts = iter([code_element.title] * 20 + ["654321"])
+    reads = []
+    monkeypatch.setattr(code_element, "window_text", lambda: reads.append(None) or next(texts))
+    walks = []
+    descendants = FakeElement.descendants
+    monkeypatch.setattr(FakeElement, "descendants", lambda self, **criteria: walks.append(self) or
+                        descendants(self, **criteria))
+
+    assert automation._read_code(dlg, copy_button=None) == "654321"
+    assert len(reads) == 21
+    # Only the lookup walks the tree (plus the nested calls of that one walk)
+    lookups = [element for element in walks if element is dlg]
+    assert len(lookups) <= 2
@@ -0,0 +1,76 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pingid_service import PingIDService, request_mfa_code, service_available
+
+
+class CountingCodeSource:
+    """Code source recording how many calls overlap"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.max_active = max(self.max_active, self.active)
+            code = f"{self.calls:06d}"
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return code
+
+
+@pytest.fixture
+def start_service():
+    services = []
+
+    def _start(code_source):
+        services.append(PingIDService(code_source=code_source, port=0).start())
+        return services[-1].address
+
+    yield _start
+    for service in services:
+        service.stop()
+
+
+def test_concurrent_requests_are_served_one_at_a_time(start_service):
+    source = CountingCodeSource()
+    host, port = start_service(source)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        codes = list(pool.map(lambda _: request_mfa_code(host, port, timeout=5), range(4)))
+
+    assert sorted(codes) == ["000001", "000002", "000003", "000004"]
+    assert source.max_active == 1
+    assert service_available(host, port)
+
+
+def test_service_available_is_false_when_nothing_listens():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    assert not service_available("127.0.0.1", port)
+
+
+def test_code_source_failure_reaches_the_client(start_service):
+    def broken_source():
+        raise RuntimeError("PingID window not found")
+
+    host, port = start_service(broken_source)
+    with socket.create_connection((host, port), timeout=5) as sock, sock.makefile("rwb") as stream:
+        stream.write(b'{"cmd": "code"}\n')
+        stream.flush()
+        assert stream.readline() == b'{"error": "PingID window not found"}\n'
+
+    start = time.monotonic()
+    assert request_mfa_code(host, port, timeout=5) is None
+    assert time.monotonic() - start < 5
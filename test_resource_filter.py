@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from resource_filter import ResourceFilter
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type):
+        self.request = SimpleNamespace(url=url, resource_type=resource_type)
+        self.action = None
+
+    def abort(self):
+        self.action = "abort"
+
+    def fallback(self):
+        self.action = "fallback"
+
+    def continue_(self):
+        self.action = "continue"
+
+
+def test_blocked_requests_are_aborted_and_counted():
+    resource_filter = ResourceFilter()
+    for url, resource_type in (("https://sso.example.com/logo.png", "image"),
+                               ("https://www.google-analytics.com/collect", "xhr")):
+        route = FakeRoute(url, resource_type)
+        resource_filter._handle(route)
+        assert route.action == "abort"
+    assert resource_filter.blocked == 2
+    assert resource_filter.blocked_by_type == {"image": 1, "xhr": 1}
+
+
+def test_allowed_requests_fall_back_to_earlier_routes():
+    # continue_() would bypass HAR replay and other routes registered before the filter
+    resource_filter = ResourceFilter()
+    route = FakeRoute("https://production.sureprep.com/", "document")
+    resource_filter._handle(route)
+    assert route.action == "fallback"
+    assert resource_filter.allowed == 1
+
+
+def test_allow_patterns_win_over_blocked_types():
+    resource_filter = ResourceFilter(rules={"block_types": ["image"], "block_patterns": [],
+                                            "allow_patterns": ["*/captcha/*"]})
+    route = FakeRoute("https://sso.example.com/captcha/challenge.png", "image")
+    resource_filter._handle(route)
+    assert route.action == "fallback"
@@ -0,0 +1,45 @@
+import pytest
+
+from retry import MFACodeUnavailable, RetryPolicy
+from waits import FakeClock
+
+
+def _flaky(failures):
+    calls = []
+
+    def action():
+        calls.append(None)
+        if len(calls) <= failures:
+            raise MFACodeUnavailable("no code yet")
+        return "123456"
+    return action
+
+
+def test_transient_errors_are_retried_and_counted():
+    policy = RetryPolicy(steps={"mfa": 3}, clock=FakeClock())
+    assert policy.run("fileroom.mfa", _flaky(2)) == "123456"
+    assert policy.counts["fileroom.mfa"] == {"runs": 1, "retries": 2, "recovered": 1, "failed": 0}
+
+
+def test_fatal_errors_are_not_retried():
+    policy = RetryPolicy(steps={"mfa": 3}, clock=FakeClock())
+
+    def action():
+        raise ValueError("unknown app")
+
+    with pytest.raises(ValueError):
+        policy.run("fileroom.mfa", action)
+    assert policy.counts["fileroom.mfa"]["failed"] == 1
+    assert policy.counts["fileroom.mfa"]["retries"] == 0
+
+
+def test_worker_counts_merge_into_the_controller_report():
+    worker, controller = RetryPolicy(steps={"mfa": 2}, clock=FakeClock()), RetryPolicy(clock=FakeClock())
+    worker.run("scd.mfa", _flaky(1))
+    with pytest.raises(MFACodeUnavailable):
+        worker.run("scd.mfa", _flaky(2))
+
+    controller.merge(worker.counts)
+    controller.merge(worker.counts)
+    assert controller.counts["scd.mfa"] == {"runs": 4, "retries": 4, "recovered": 2, "failed": 2}
+    assert controller.report().splitlines()[1].split() == ["scd.mfa", "4", "4", "2", "2"]
@@ -0,0 +1,136 @@
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from scheduler import (COPY_SUFFIX, DurationHistory, assign_shards, dedupe, estimate, order, predict_makespan,
+                       shard_groups)
+
+
+def _item(path, name, fixtures=(), group=None):
+    marker = SimpleNamespace(args=(group,)) if group else None
+    return SimpleNamespace(path=Path(path), name=name, nodeid=f"{path}::{name}",
+                           fixturenames=list(fixtures),
+                           get_closest_marker=lambda marker_name: marker if marker_name == "shard_group" else None)
+
+
+@pytest.fixture
+def history(tmp_path):
+    path = tmp_path / ".test_durations.json"
+    path.write_text(json.dumps({
+        "a.py::slow": {"duration": 9.0, "outcome": "passed", "runs": 3},
+        "a.py::fast": {"duration": 1.0, "outcome": "failed", "runs": 3},
+        "a.py::medium": {"duration": 4.0, "outcome": "failed", "runs": 1},
+        "a.py::steady": {"duration": 2.0, "outcome": "passed", "runs": 2},
+    }))
+    return DurationHistory(str(path))
+
+
+def _names(items):
+    return [item.name for item in items]
+
+
+def test_estimate_uses_the_median_for_unknown_tests(history):
+    durations = estimate(history, ["a.py::slow", "a.py::fast", "a.py::medium", "a.py::new"])
+    assert durations == {"a.py::slow": 9.0, "a.py::fast": 1.0, "a.py::medium": 4.0, "a.py::new": 4.0}
+
+
+def test_order_longest_first(history):
+    items = [_item("a.py", name) for name in ("fast", "new", "slow", "steady")]
+    order(items, history, "longest")
+    # "new" has no history: it sorts as the median (2.0), after "steady" in collection order
+    assert _names(items) == ["slow", "new", "steady", "fast"]
+
+
+def test_order_failed_first_then_new_tests(history):
+    items = [_item("a.py", name) for name in ("slow", "new", "medium", "steady", "fast")]
+    order(items, history, "failed")
+    assert _names(items) == ["fast", "medium", "new", "slow", "steady"]
+
+
+def test_order_file_keeps_collection_order(history):
+    items = [_item("a.py", name) for name in ("fast", "slow")]
+    order(items, history, "file")
+    assert _names(items) == ["fast", "slow"]
+
+
+def test_dedupe_drops_tests_from_copied_modules():
+    original = _item("tests/FileroomLogin.py", "test_login")
+    copies = [_item("tests/FileroomLogin copy.py", "test_login"),
+              _item("tests/FileroomLogin - Copy (2).py", "test_login"),
+              _item("tests/FileroomLogin_copy2.py", "test_login")]
+    other_directory = _item("other/FileroomLogin.py", "test_login")
+    other_test = _item("tests/FileroomLogin copy.py", "test_logout")
+
+    kept, duplicates = dedupe([copies[0], original, copies[1], other_directory, copies[2], other_test])
+    assert kept == [original, other_directory, other_test]
+    assert duplicates == copies
+
+
+@pytest.mark.parametrize("module, other", [("test_deepcopy.py", "test_deep.py"), ("FileCopy.py", "File.py"),
+                                           ("test_copying.py", "test.py")])
+def test_dedupe_keeps_modules_whose_name_ends_in_copy(module, other):
+    items = [_item(f"tests/{module}", "test_it"), _item(f"tests/{other}", "test_it")]
+    assert dedupe(items) == (items, [])
+
+
+@pytest.mark.parametrize("stem", ["FileroomLogin copy", "FileroomLogin copy 2", "FileroomLogin - Copy",
+                                  "FileroomLogin - Copy (2)", "FileroomLogin (3)", "FileroomLogin_copy2"])
+def test_copy_suffixes_are_stripped(stem):
+    assert COPY_SUFFIX.sub("", stem) == "FileroomLogin"
+
+
+def test_predict_makespan_longest_first():
+    assert predict_makespan([3, 3, 2, 2, 2], 2) == 7
+    assert predict_makespan([5, 1], 4) == 5
+    assert predict_makespan([1, 2], 0) == 3
+
+
+def _session_items():
+    fixtures = {"fileroom": ("fileroom_page", "authenticated_context", "page"),
+                "scd": ("scd_page", "authenticated_context", "page")}
+    return ([_item("FileroomLogin.py", f"test_fileroom_{index}", fixtures["fileroom"]) for index in range(3)]
+            + [_item("SCDLogin.py", f"test_scd_{index}", fixtures["scd"]) for index in range(3)]
+            + [_item("AsyncLogin.py", "test_factory", ("authenticated_context",)),
+               _item("CalculatorApp.py", "test_add", ("calculator",), group="desktop"),
+               _item("CalculatorApp.py", "test_subtract", ("calculator",), group="desktop"),
+               _item("CalculatorApp.py", "test_plain")])
+
+
+def test_shard_groups_split_by_host_not_by_the_shared_factory():
+    groups = [_names(group) for group in shard_groups(_session_items())]
+    assert groups == [["test_fileroom_0", "test_fileroom_1", "test_fileroom_2"],
+                      ["test_scd_0", "test_scd_1", "test_scd_2"],
+                      ["test_factory"], ["test_add", "test_subtract"], ["test_plain"]]
+
+
+def test_shard_groups_join_through_a_shared_group():
+    items = [_item("a.py", "fileroom", ("fileroom_page",), group="cross"),
+             _item("a.py", "scd", ("scd_page",), group="cross"),
+             _item("a.py", "scd_only", ("scd_page",))]
+    assert [_names(group) for group in shard_groups(items)] == [["fileroom", "scd", "scd_only"]]
+
+
+def test_assign_shards_balances_recorded_durations(tmp_path):
+    items = _session_items()
+    durations = {item.nodeid: {"duration": 1.0, "outcome": "passed", "runs": 1} for item in items}
+    durations.update({f"SCDLogin.py::test_scd_{index}": {"duration": 5.0, "outcome": "passed", "runs": 1}
+                      for index in range(3)})
+    path = tmp_path / ".test_durations.json"
+    path.write_text(json.dumps(durations))
+
+    assignment, totals = assign_shards(items, DurationHistory(str(path)), 2)
+    # 15s of SCD tests alone; the 3s fileroom group and the 4s of other tests share the second shard
+    assert {assignment[item.nodeid] for item in items[3:6]} == {1}
+    assert {assignment[item.nodeid] for item in items if item not in items[3:6]} == {2}
+    assert totals == [15.0, 7.0]
+    assert assign_shards(items, DurationHistory(str(path)), 2)[0] == assignment
+
+
+def test_assign_shards_without_history_balances_test_counts(tmp_path):
+    items = _session_items()
+    assignment, totals = assign_shards(items, DurationHistory(str(tmp_path / "missing.json")), 3)
+    counts = [list(assignment.values()).count(shard) for shard in (1, 2, 3)]
+    assert sorted(counts) == [3, 3, 4]
+    assert totals == [0.0, 0.0, 0.0]
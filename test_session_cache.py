@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+
+from login_flows import build_targets
+from session_cache import SessionCache
+from standin_server import StandInServer, standin_target, standin_urls
+
+
+@pytest.fixture
+def server():
+    server = StandInServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def session_cache(tmp_path):
+    return SessionCache(cache_dir=str(tmp_path))
+
+
+@pytest.fixture
+def auth_targets(server):
+    return {"standin": standin_target(server)}
+
+
+@pytest.fixture
+def authenticated_context(request, browser_type):
+    """The conftest.py factory, skipped when Playwright has no browser installed"""
+    if not os.path.exists(browser_type.executable_path):
+        pytest.skip(f"{browser_type.name} is not installed (python -m playwright install)")
+    return request.getfixturevalue("authenticated_context")
+
+
+def _expire(cache, key):
+    path = cache.path_for(key)
+    with open(path, encoding="utf-8") as f:
+        entry = json.load(f)
+    entry["expires_at"] = 0
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+
+
+def test_cache_entries_expire(session_cache):
+    session_cache.save("fileroom@127.0.0.1:8000", {"cookies": [], "origins": []})
+    assert session_cache.load("fileroom@127.0.0.1:8000") == {"cookies": [], "origins": []}
+
+    _expire(session_cache, "fileroom@127.0.0.1:8000")
+    assert session_cache.load("fileroom@127.0.0.1:8000") is None
+    assert not os.path.exists(session_cache.path_for("fileroom@127.0.0.1:8000"))
+
+
+def test_standin_targets_sharing_a_host_get_their_own_cache_entry(server, session_cache):
+    targets = build_targets(standin_urls(server))
+    assert targets["fileroom"].host == targets["scd"].host
+    assert session_cache.path_for(targets["fileroom"].cache_key) != session_cache.path_for(targets["scd"].cache_key)
+
+
+def test_second_login_reuses_the_cached_session(server, authenticated_context):
+    first = authenticated_context("standin")
+    second = authenticated_context("standin")
+    assert second is not first
+    assert server.login_count == 1
+
+
+def test_expired_cache_logs_in_again(server, session_cache, auth_targets, authenticated_context):
+    authenticated_context("standin")
+    _expire(session_cache, auth_targets["standin"].cache_key)
+
+    authenticated_context("standin")
+    assert server.login_count == 2
+
+
+def test_rejected_session_logs_in_again(server, session_cache, auth_targets, authenticated_context):
+    authenticated_context("standin")
+    server.revoke_all()
+
+    context = authenticated_context("standin")
+    assert server.login_count == 2
+    assert auth_targets["standin"].is_authenticated(context.pages[0])
+    assert session_cache.load(auth_targets["standin"].cache_key) is not None
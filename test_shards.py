@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+import shards
+from shards import merge_allure, merge_durations, merge_latencies
+from timeouts import MAX_SAMPLES
+
+
+def test_merge_durations_keeps_the_entry_of_the_shard_that_ran_the_test():
+    base = {"a.py::one": {"duration": 1.0, "outcome": "passed", "runs": 2},
+            "a.py::two": {"duration": 2.0, "outcome": "passed", "runs": 2}}
+    first = {**base, "a.py::one": {"duration": 1.5, "outcome": "failed", "runs": 3}}
+    second = {**base, "a.py::two": {"duration": 2.5, "outcome": "passed", "runs": 3},
+              "a.py::new": {"duration": 0.5, "outcome": "passed", "runs": 1}}
+
+    assert merge_durations(base, [first, second]) == {
+        "a.py::one": {"duration": 1.5, "outcome": "failed", "runs": 3},
+        "a.py::two": {"duration": 2.5, "outcome": "passed", "runs": 3},
+        "a.py::new": {"duration": 0.5, "outcome": "passed", "runs": 1},
+    }
+    assert merge_durations(None, [None, first]) == first
+
+
+def test_merge_latencies_appends_only_the_new_samples_of_each_shard():
+    base = {"fileroom.mfa": [1.0, 2.0]}
+    first = {"fileroom.mfa": [1.0, 2.0, 3.0], "scd.mfa": [5.0]}
+    second = {"fileroom.mfa": [1.0, 2.0, 4.0]}
+
+    assert merge_latencies(base, [first, second]) == {"fileroom.mfa": [1.0, 2.0, 3.0, 4.0], "scd.mfa": [5.0]}
+
+
+def test_merge_latencies_with_full_sample_lists():
+    base = {"step": [float(value) for value in range(MAX_SAMPLES)]}
+    # A full list dropped its oldest sample for the new one
+    shard = {"step": base["step"][1:] + [100.0]}
+
+    merged = merge_latencies(base, [shard, shard])
+    assert merged["step"][-2:] == [100.0, 100.0]
+    assert len(merged["step"]) == MAX_SAMPLES
+
+
+def test_merge_allure_copies_every_shard_file(tmp_path):
+    for number in (1, 2):
+        results = tmp_path / f"shard-{number}" / "allure-results"
+        results.mkdir(parents=True)
+        (results / f"{number}-result.json").write_text("{}")
+    output = tmp_path / "allure-results"
+
+    sources = [str(tmp_path / name / "allure-results") for name in ("shard-1", "shard-2", "missing")]
+    assert merge_allure(sources + [str(output)], str(output)) == 2
+    assert sorted(os.listdir(output)) == ["1-result.json", "2-result.json"]
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A trivial test directory standing in for the repository root, and a different working directory"""
+    root = tmp_path / "project"
+    root.mkdir()
+    (root / "conftest.py").write_text('pytest_plugins = ("scheduler",)\n')
+    (root / "test_trivial.py").write_text("import pytest\n\n\n@pytest.mark.parametrize('number', range(4))\n"
+                                          "def test_number(number):\n    pass\n")
+    monkeypatch.setattr(shards, "ROOT", str(root))
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(shards.__file__)),
+                                                                   os.environ.get("PYTHONPATH")])))
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    return root
+
+
+def test_run_shards_as_processes_and_merge_them(project):
+    assert shards.run(2, ["-p", "no:cacheprovider", "test_trivial.py"]) == 0
+
+    with open(project / shards.DURATIONS_FILE, encoding="utf-8") as f:
+        durations = json.load(f)
+    assert sorted(durations) == [f"test_trivial.py::test_number[{number}]" for number in range(4)]
+    results = [name for name in os.listdir(project / "allure-results") if name.endswith("-result.json")]
+    assert len(results) == 4
+    for number in (1, 2):
+        with open(project / "shards" / f"shard-{number}" / "pytest.log", encoding="utf-8") as f:
+            assert "2 passed" in f.read()
+    # Nothing is written relative to the caller's working directory
+    assert os.listdir(".") == []
@@ -0,0 +1,35 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from timeouts import TimeoutPolicy
+
+
+def _page():
+    return SimpleNamespace(set_default_timeout=lambda timeout: None,
+                           set_default_navigation_timeout=lambda timeout: None)
+
+
+@pytest.fixture
+def history_path(tmp_path):
+    path = tmp_path / ".step_latencies.json"
+    path.write_text(json.dumps({"fileroom.mfa": [1000.0] * 5}))
+    return str(path)
+
+
+def test_history_tightens_the_step_budget(history_path):
+    policy = TimeoutPolicy(history_path=history_path, multiplier=2, floor_ms=500)
+    assert policy.timeout_for("mfa_wait", "fileroom.mfa") == 2000
+    assert policy.timeout_for("mfa_wait", "scd.mfa") == 60000
+
+
+@pytest.mark.parametrize("record", [True, False])
+def test_tracked_steps_are_recorded_unless_disabled(history_path, record):
+    policy = TimeoutPolicy(history_path=history_path, record=record)
+    with policy.track(_page(), "fileroom.mfa", "mfa_wait"):
+        pass
+    policy.save()
+
+    with open(history_path, encoding="utf-8") as f:
+        assert len(json.load(f)["fileroom.mfa"]) == (6 if record else 5)
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+from instrumentation import Tracer
+from trace_buffer import TraceChunkExporter, TraceRingBuffer
+
+
+class FakeTracing:
+    """BrowserContext.tracing writing `chunk_size` bytes per exported chunk"""
+
+    def __init__(self, chunk_size=100):
+        self.chunk_size = chunk_size
+        self.calls = []
+        self.chunks = 0
+
+    def start(self, **options):
+        self.calls.append("start")
+
+    def start_chunk(self):
+        self.calls.append("start_chunk")
+
+    def stop_chunk(self, path=None):
+        self.calls.append("stop_chunk" if path is None else "export_chunk")
+        if path is not None:
+            self.chunks += 1
+            with open(path, "wb") as f:
+                f.write(bytes([self.chunks]) * self.chunk_size)
+
+    def stop(self):
+        self.calls.append("stop")
+
+
+def _buffer(chunk_size=100, **options):
+    return TraceRingBuffer(SimpleNamespace(tracing=FakeTracing(chunk_size)), **options).start()
+
+
+def test_oldest_chunks_beyond_max_chunks_are_dropped():
+    buffer = _buffer(max_chunks=3)
+    for step in ("open", "sso", "password", "mfa", "landing"):
+        buffer.roll(step)
+
+    assert [title for title, _ in buffer.chunks] == ["password", "mfa", "landing"]
+    assert [data[0] for _, data in buffer.chunks] == [3, 4, 5]
+    assert buffer.dropped == 2
+
+
+def test_chunks_beyond_max_bytes_are_dropped_but_the_newest_is_kept():
+    buffer = _buffer(chunk_size=400_000, max_chunks=10, max_mb=1)
+    for step in ("open", "sso", "password"):
+        buffer.roll(step)
+    assert [title for title, _ in buffer.chunks] == ["sso", "password"]
+    assert buffer.size == 800_000
+
+    big = _buffer(chunk_size=2_000_000, max_mb=1)
+    big.roll("open")
+    assert [title for title, _ in big.chunks] == ["open"]
+
+
+def test_failed_test_keeps_its_chunks():
+    buffer = _buffer()
+    buffer.roll("sso")
+    chunks = buffer.stop(keep=True)
+
+    assert [title for title, _ in chunks] == ["sso", "until the end of the test"]
+    assert buffer.context.tracing.calls[-2:] == ["export_chunk", "stop"]
+
+
+def test_passing_test_discards_its_chunks():
+    buffer = _buffer()
+    buffer.roll("sso")
+
+    assert buffer.stop(keep=False) == []
+    assert buffer.context.tracing.calls[-2:] == ["stop_chunk", "stop"]
+    # Later steps of the same test record nothing
+    buffer.roll("teardown")
+    assert list(buffer.chunks) == []
+
+
+def test_only_top_level_spans_roll_the_chunk():
+    buffer = _buffer()
+    tracer = Tracer([TraceChunkExporter(buffer, depth=0)])
+    with tracer.span("fileroom.login"):
+        with tracer.span("fileroom.sso"):
+            pass
+        with tracer.span("fileroom.mfa"):
+            pass
+    with tracer.span("fileroom.landing"):
+        pass
+
+    assert [title for title, _ in buffer.chunks] == ["fileroom.login", "fileroom.landing"]
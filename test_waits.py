@@ -0,0 +1,60 @@
+import pytest
+
+from waits import FakeClock, StepTimer, WaitTimeoutError, wait_until
+
+
+def test_fake_clock_sleep_advances_time():
+    clock = FakeClock(start=10.0)
+    clock.sleep(0.5)
+    clock.advance(1.0)
+    assert clock.monotonic() == 11.5
+    assert clock.sleeps == [0.5]
+
+
+def test_wait_until_returns_first_truthy_value():
+    clock = FakeClock()
+    values = iter([None, 0, "", "123456"])
+    assert wait_until(lambda: next(values), timeout=5, clock=clock) == "123456"
+    assert len(clock.sleeps) == 3
+
+
+def test_wait_until_backs_off_up_to_max_interval():
+    clock = FakeClock()
+    with pytest.raises(WaitTimeoutError):
+        wait_until(lambda: False, timeout=3, initial_interval=0.1, max_interval=0.4, backoff=2, clock=clock)
+    assert clock.sleeps[:4] == [0.1, 0.2, 0.4, 0.4]
+    assert clock.monotonic() == pytest.approx(3)
+
+
+def test_wait_until_treats_exceptions_as_not_yet():
+    clock = FakeClock()
+    calls = []
+
+    def predicate():
+        calls.append(clock.monotonic())
+        if len(calls) < 3:
+            raise LookupError("control not found")
+        return True
+
+    assert wait_until(predicate, timeout=5, clock=clock) is True
+    assert len(calls) == 3
+
+
+def test_wait_until_timeout_reports_description_and_last_error():
+    def predicate():
+        raise LookupError("control not found")
+
+    with pytest.raises(WaitTimeoutError, match=r"Timed out after 1s waiting for copy button .*control not found"):
+        wait_until(predicate, timeout=1, description="copy button", clock=FakeClock())
+
+
+def test_step_timer_budget():
+    clock = FakeClock()
+    timer = StepTimer(budget=1.0, clock=clock)
+    with timer.step("launch"):
+        clock.advance(0.75)
+    with timer.step("pin"):
+        clock.advance(0.5)
+    assert timer.steps == [("launch", 0.75), ("pin", 0.5)]
+    assert timer.over_budget
+    assert "EXCEEDED" in timer.report()
@@ -0,0 +1,63 @@
+import pytest
+
+from waits import FakeClock
+from window_watcher import FakeWindow, FakeWindowProvider, WindowWatcher
+
+
+class FakeProcess:
+    def __init__(self, pid, exits_after=None, clock=None):
+        self.pid = pid
+        self.exits_after = exits_after
+        self.clock = clock
+
+    def poll(self):
+        if self.exits_after is not None and self.clock.monotonic() >= self.exits_after:
+            return 0
+        return None
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def provider(clock):
+    return FakeWindowProvider(clock=clock)
+
+
+def _watcher(provider, clock):
+    return WindowWatcher(provider, initial_interval=0.1, max_interval=0.4, backoff=2, clock=clock)
+
+
+def test_window_of_the_launched_process_wins(provider, clock):
+    other = FakeWindow("PingID", process_id=1)
+    owned = FakeWindow("PingID", process_id=42)
+    provider.add_window(other)
+    provider.add_window(owned, after=0.25)
+
+    assert _watcher(provider, clock).wait_for_window(5, process=FakeProcess(42)) is owned
+    assert clock.monotonic() == pytest.approx(0.3)
+
+
+def test_title_match_after_the_launcher_exits(provider, clock):
+    provider.add_window(FakeWindow("Notepad", process_id=7))
+    handed_off = FakeWindow("PingID", process_id=8)
+    provider.add_window(handed_off, after=1.0)
+    launcher = FakeProcess(42, exits_after=0.5, clock=clock)
+
+    assert _watcher(provider, clock).wait_for_window(5, process=launcher) is handed_off
+    assert clock.monotonic() >= 1.0
+
+
+def test_title_is_ignored_while_the_process_is_alive(provider, clock):
+    provider.add_window(FakeWindow("PingID", process_id=8))
+    assert _watcher(provider, clock).find_window(process_id=42) is None
+    assert _watcher(provider, clock).find_window(process_id=42, process_alive=False).pid == 8
+
+
+def test_backoff_until_the_timeout(provider, clock):
+    assert _watcher(provider, clock).wait_for_window(2, process=FakeProcess(42)) is None
+    assert clock.sleeps[:4] == [0.1, 0.2, 0.4, 0.4]
+    assert clock.monotonic() == pytest.approx(2)
+    assert provider.calls == len(clock.sleeps) + 1
@@ -0,0 +1,172 @@
+"""
+Timeout Policy
+Named timeout profiles (navigation, SSO redirect, MFA wait, UI action)
+configured in one place, tightened per step from recorded p95 latencies,
+with fail-fast reporting of the step that blew its budget
+"""
+
+import json
+import math
+import time
+from contextlib import contextmanager
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from instrumentation import span
+from process_lock import FileLock
+
+try:
+    from config import TIMEOUT_CONFIG
+except ImportError:
+    TIMEOUT_CONFIG = {}
+
+
+# Upper bounds in milliseconds; derived deadlines never exceed these
+DEFAULT_PROFILES = {
+    "navigation": 30000,
+    "sso_redirect": 45000,
+    "mfa_wait": 60000,
+    "ui_action": 10000,
+}
+
+MAX_SAMPLES = 50
+
+
+class StepBudgetExceeded(AssertionError):
+    """Raised when a tracked step does not finish within its timeout budget"""
+
+
+def percentile(samples, pct):
+    """Return the nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class LatencyHistory:
+    """Recent per-step durations (ms), persisted between runs"""
+
+    def __init__(self, path):
+        self.path = path
+        self.samples = self._read()
+        self.new_samples = {}
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def add(self, step, duration_ms):
+        for store in (self.samples, self.new_samples):
+            values = store.setdefault(step, [])
+            values.append(round(duration_ms, 1))
+            del values[:-MAX_SAMPLES]
+
+    def p95(self, step, min_samples):
+        values = self.samples.get(step, [])
+        if len(values) < min_samples:
+            return None
+        return percentile(values, 95)
+
+    def save(self):
+        """Merge this process's new samples into the file (safe with parallel workers)"""
+        if not self.new_samples:
+            return
+        try:
+            with FileLock(f"{self.path}.lock", timeout=30):
+                merged = self._read()
+                for step, values in self.new_samples.items():
+                    merged[step] = (merged.get(step, []) + values)[-MAX_SAMPLES:]
+                with open(self.path, "w", encoding="utf-8") as f:
+                    json.dump(merged, f, indent=2)
+            self.new_samples = {}
+        except (OSError, TimeoutError) as e:
+            print(f"Could not write latency history {self.path}: {str(e)}")
+
+
+class TimeoutPolicy:
+    """Resolves per-step timeouts from named profiles and latency history"""
+
+    def __init__(self, profiles=None, history_path=None, multiplier=None, floor_ms=None, min_samples=None,
+                 record=True):
+        """
+        Initialize the policy (every argument defaults to TIMEOUT_CONFIG)
+
+        Args:
+            profiles: Dict of profile name -> maximum timeout in ms
+            history_path: JSON file with recorded step latencies
+            multiplier: Safety factor applied to a step's p95
+            floor_ms: Smallest timeout ever derived from history
+            min_samples: Samples needed before history tightens a step
+            record: Add the durations of tracked steps to the history (False for runs
+                    whose timings say nothing about the live system, e.g. HAR replay)
+        """
+        self.profiles = {**DEFAULT_PROFILES, **TIMEOUT_CONFIG.get("profiles", {}), **(profiles or {})}
+        self.multiplier = multiplier or TIMEOUT_CONFIG.get("p95_multiplier", 2.0)
+        self.floor_ms = floor_ms or TIMEOUT_CONFIG.get("floor_ms", 2000)
+        self.min_samples = min_samples or TIMEOUT_CONFIG.get("min_samples", 5)
+        self.history = LatencyHistory(history_path or TIMEOUT_CONFIG.get("history_file", ".step_latencies.json"))
+        self.record = record
+
+    def timeout_for(self, profile, step=None):
+        """
+        Return the timeout in ms for a step
+
+        Steps with enough history get max(floor, p95 * multiplier), capped at
+        the profile's configured maximum; others get the profile maximum.
+        """
+        limit = self.profiles[profile]
+        p95 = self.history.p95(step, self.min_samples) if step else None
+        if p95 is None:
+            return limit
+        return int(min(limit, max(self.floor_ms, p95 * self.multiplier)))
+
+    @contextmanager
+    def track(self, page, step, profile):
+        """
+        Run a block with the page timeouts set to the step's budget and
+        record its duration; a Playwright timeout is reported as the step
+        that exceeded its budget
+
+        Raises:
+            StepBudgetExceeded: If the block hit the budget
+        """
+        budget = self.timeout_for(profile, step)
+        page.set_default_timeout(budget)
+        page.set_default_navigation_timeout(budget)
+        start = time.monotonic()
+        try:
+            with span(step, profile=profile, budget_ms=budget):
+                yield budget
+        except PlaywrightTimeoutError as e:
+            p95 = self.history.p95(step, self.min_samples)
+            history_note = f", historical p95 {p95:.0f}ms" if p95 is not None else ""
+            raise StepBudgetExceeded(
+                f"Step '{step}' exceeded its {budget}ms budget ({profile} profile{history_note})"
+            ) from e
+        else:
+            if self.record:
+                self.history.add(step, (time.monotonic() - start) * 1000)
+        finally:
+            self.apply_defaults(page)
+
+    def apply_defaults(self, page):
+        """Set the page-wide defaults used outside tracked steps"""
+        page.set_default_timeout(self.profiles["ui_action"])
+        page.set_default_navigation_timeout(self.profiles["navigation"])
+
+    def save(self):
+        self.history.save()
+
+
+_policy = None
+
+
+def get_policy():
+    """Return the process-wide timeout policy"""
+    global _policy
+    if _policy is None:
+        _policy = TimeoutPolicy()
+    return _policy
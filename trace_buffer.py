@@ -0,0 +1,148 @@
+"""
+Failure-only Playwright Tracing
+Records a Playwright trace of a browser context in chunks, one per
+top-level step (instrumentation span), keeps only the newest chunks in a
+size-capped in-memory ring buffer and attaches them to Allure only when the
+test fails; passing tests discard their trace
+"""
+
+import os
+import tempfile
+from collections import deque
+
+import allure
+
+from instrumentation import _on_test_thread, get_tracer
+
+try:
+    from config import TRACE_BUFFER_CONFIG
+except ImportError:
+    TRACE_BUFFER_CONFIG = {}
+
+
+class TraceRingBuffer:
+    """Chunked tracing of one context; chunks are zip bytes held in memory"""
+
+    def __init__(self, context, max_chunks=None, max_mb=None, screenshots=None, snapshots=None):
+        """
+        Initialize the buffer (arguments default to TRACE_BUFFER_CONFIG)
+
+        Args:
+            context: Playwright BrowserContext to trace
+            max_chunks: Newest step chunks kept
+            max_mb: Total size cap of the kept chunks; the oldest are dropped first
+            screenshots: Record screencast frames
+            snapshots: Record DOM snapshots
+        """
+        self.context = context
+        self.max_chunks = max_chunks or TRACE_BUFFER_CONFIG.get("max_chunks", 8)
+        self.max_bytes = int((max_mb or TRACE_BUFFER_CONFIG.get("max_mb", 50)) * 1024 * 1024)
+        self.screenshots = TRACE_BUFFER_CONFIG.get("screenshots", True) if screenshots is None else screenshots
+        self.snapshots = TRACE_BUFFER_CONFIG.get("snapshots", True) if snapshots is None else snapshots
+        self.chunks = deque()
+        self.dropped = 0
+        self.active = False
+
+    @property
+    def size(self):
+        return sum(len(data) for _, data in self.chunks)
+
+    def start(self):
+        """Start tracing and the first chunk; returns self"""
+        self.context.tracing.start(screenshots=self.screenshots, snapshots=self.snapshots)
+        self.context.tracing.start_chunk()
+        self.active = True
+        return self
+
+    def _export_chunk(self):
+        """Stop the current chunk and return its zip bytes"""
+        handle, path = tempfile.mkstemp(suffix=".zip", prefix="trace-chunk-")
+        os.close(handle)
+        try:
+            self.context.tracing.stop_chunk(path=path)
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    def _keep(self, title, data):
+        self.chunks.append((title, data))
+        while len(self.chunks) > self.max_chunks or (len(self.chunks) > 1 and self.size > self.max_bytes):
+            self.chunks.popleft()
+            self.dropped += 1
+
+    def roll(self, title):
+        """Close the current chunk into the buffer under `title` (the step it ends with) and start the next one"""
+        if not self.active:
+            return
+        try:
+            self._keep(title, self._export_chunk())
+            self.context.tracing.start_chunk()
+        except Exception:
+            # Context closed underneath us: nothing more to record
+            self.active = False
+
+    def stop(self, keep):
+        """
+        Stop tracing
+
+        Args:
+            keep: Export the last chunk into the buffer (True) or discard everything
+
+        Returns:
+            list: (title, zip bytes) of the kept chunks, oldest first
+        """
+        if self.active:
+            self.active = False
+            try:
+                if keep:
+                    self._keep("until the end of the test", self._export_chunk())
+                else:
+                    self.context.tracing.stop_chunk()
+                self.context.tracing.stop()
+            except Exception:
+                pass
+        if not keep:
+            self.chunks.clear()
+        return list(self.chunks)
+
+    def attach(self):
+        """Write the kept chunks to the Allure results (open them with `playwright show-trace`)"""
+        first = self.dropped + 1
+        for index, (title, data) in enumerate(self.chunks, start=first):
+            allure.attach(data, name=f"Playwright trace {index}: {title}",
+                          attachment_type=allure.attachment_type.ZIP)
+        if self.dropped:
+            allure.attach(f"{self.dropped} older trace chunk(s) dropped (max_chunks={self.max_chunks}, "
+                          f"max_mb={self.max_bytes / 1024 / 1024:g})",
+                          name="Playwright trace (truncated)", attachment_type=allure.attachment_type.TEXT)
+
+
+class TraceChunkExporter:
+    """Instrumentation exporter that starts a new trace chunk after every top-level step"""
+
+    def __init__(self, buffer, depth=None):
+        self.buffer = buffer
+        self.depth = TRACE_BUFFER_CONFIG.get("chunk_depth", 0) if depth is None else depth
+
+    def on_start(self, span):
+        pass
+
+    def on_end(self, span):
+        # The sync Playwright API may only be used from the test thread
+        if span.depth == self.depth and _on_test_thread():
+            self.buffer.roll(span.name)
+
+    def close(self):
+        pass
+
+
+def trace_context(context):
+    """
+    Start a ring-buffered trace of a context, chunked per top-level span
+
+    Returns:
+        tuple: (TraceRingBuffer, exporter to remove with get_tracer().remove_exporter())
+    """
+    buffer = TraceRingBuffer(context).start()
+    return buffer, get_tracer().add_exporter(TraceChunkExporter(buffer))
@@ -0,0 +1,248 @@
+"""
+UI Snapshots
+Captures a desktop window's control tree once into a structured JSON file
+(control type, auto_id, title, path), diffs later captures against it so
+only the changed controls are shown, and checks locator definitions such as
+PINGID_LOCATORS against a stored snapshot without the app running
+
+Snapshots use the recorded tree format of desktop_backend.FakeBackend, so a
+snapshot with an "exe" key can be dropped into desktop_trees/ as it is
+
+    python ui_snapshot.py diff old.json new.json
+    python ui_snapshot.py check pingid_snapshot.json
+"""
+
+import json
+import os
+import sys
+
+from desktop_backend import FakeElement
+
+FIELDS = ("control_type", "title", "auto_id", "class_name", "enabled", "visible")
+
+
+def _describe(control):
+    """Return the FIELDS of a pywinauto wrapper or a fake element"""
+    info = getattr(control, "element_info", None)
+    if info is not None:
+        control_type, auto_id, class_name = info.control_type, info.automation_id, info.class_name
+    else:
+        control_type, auto_id, class_name = control.control_type, control.auto_id, control.class_name
+    return {
+        "control_type": control_type or "Custom",
+        "title": control.window_text() or "",
+        "auto_id": auto_id or "",
+        "class_name": class_name or "",
+        "enabled": bool(control.is_enabled()),
+        "visible": bool(control.is_visible()),
+    }
+
+
+def capture(window, depth=None, exe=None):
+    """
+    Walk a window's control tree once
+
+    Args:
+        window: Window wrapper or specification (pywinauto or desktop_backend fake)
+        depth: Maximum depth below the window (optional, defaults to the whole tree)
+        exe: Executable name stored with the snapshot (optional)
+
+    Returns:
+        dict: Nested nodes with FIELDS, "path" and "children"
+    """
+    if hasattr(window, "wrapper_object"):
+        window = window.wrapper_object()
+
+    def _walk(control, path, level):
+        node = _describe(control)
+        node["path"] = path
+        children = control.children() if hasattr(control, "children") else []
+        if children and (depth is None or level < depth):
+            seen = {}
+            node["children"] = []
+            for child in children:
+                child_node = _describe(child)
+                index = seen.get(child_node["control_type"], 0)
+                seen[child_node["control_type"]] = index + 1
+                node["children"].append(
+                    _walk(child, f"{path}/{child_node['control_type']}[{index}]", level + 1))
+        return node
+
+    snapshot = _walk(window, f"{_describe(window)['control_type']}[0]", 0)
+    if exe:
+        snapshot = {"exe": exe, **snapshot}
+    return snapshot
+
+
+def save(snapshot, path):
+    """Write a snapshot as JSON"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+
+
+def load(path):
+    """Read a snapshot, or None if there is none"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def flatten(snapshot):
+    """
+    Return the controls of a snapshot keyed for diffing: by auto_id when the
+    control has one (stable when siblings are added), else by path
+    """
+    controls = {}
+
+    def _walk(node):
+        control = {field: node.get(field) for field in FIELDS}
+        control["path"] = node.get("path", "")
+        key = f"#{control['auto_id']}" if control["auto_id"] else control["path"]
+        controls.setdefault(key, control)
+        for child in node.get("children", []):
+            _walk(child)
+
+    _walk(snapshot)
+    return controls
+
+
+def diff(old, new):
+    """
+    Compare two snapshots
+
+    Returns:
+        dict: "added" and "removed" (key -> control), "changed" (key -> {field: (old, new)})
+    """
+    before, after = flatten(old), flatten(new)
+    changed = {}
+    for key in before.keys() & after.keys():
+        fields = {field: (before[key][field], after[key][field])
+                  for field in FIELDS + ("path",) if before[key][field] != after[key][field]}
+        if fields:
+            changed[key] = fields
+    return {
+        "added": {key: after[key] for key in after.keys() - before.keys()},
+        "removed": {key: before[key] for key in before.keys() - after.keys()},
+        "changed": changed,
+    }
+
+
+def _label(control):
+    return f"{control['control_type']} '{control['title']}' auto_id=\"{control['auto_id']}\" ({control['path']})"
+
+
+def format_diff(changes):
+    """Return a printable diff, one line per changed control"""
+    lines = []
+    for key in sorted(changes["removed"]):
+        lines.append(f"- {_label(changes['removed'][key])}")
+    for key in sorted(changes["added"]):
+        lines.append(f"+ {_label(changes['added'][key])}")
+    for key in sorted(changes["changed"]):
+        fields = ", ".join(f"{field}: {old!r} -> {new!r}" for field, (old, new) in changes["changed"][key].items())
+        lines.append(f"~ {key}: {fields}")
+    return "\n".join(lines) if lines else "No control changes"
+
+
+def format_tree(snapshot):
+    """Return a compact indented listing of a snapshot"""
+    lines = []
+
+    def _walk(node, level):
+        state = "" if node.get("enabled", True) else " (disabled)"
+        lines.append(f"{'   ' * level}{node['control_type']} - '{node.get('title', '')}'"
+                     f"    auto_id=\"{node.get('auto_id', '')}\"{state}")
+        for child in node.get("children", []):
+            _walk(child, level + 1)
+
+    _walk(snapshot, 0)
+    return "\n".join(lines)
+
+
+def check_locators(snapshot, locators):
+    """
+    Run locator strategies against a snapshot
+
+    Args:
+        snapshot: Snapshot dict
+        locators: Dict of control name -> list of (strategy name, callable(root)),
+                  e.g. pingid_automation.PINGID_LOCATORS
+
+    Returns:
+        dict: control name -> names of the strategies that find the control
+    """
+    root = FakeElement(snapshot, backend=None, process_id=0)
+    results = {}
+    for control_name, strategies in locators.items():
+        results[control_name] = []
+        for strategy_name, locate in strategies:
+            try:
+                found = locate(root) is not None
+            except Exception:
+                found = False
+            if found:
+                results[control_name].append(strategy_name)
+    return results
+
+
+def format_locator_check(results):
+    return "\n".join(f"{'OK  ' if found else 'MISS'} {control_name}: {', '.join(found) or 'no strategy matches'}"
+                     for control_name, found in results.items())
+
+
+def inspect(window, path, depth=None, exe=None, locators=None, full=False):
+    """
+    Capture a window, print what changed since the stored snapshot (or the
+    whole tree on the first capture) and replace the stored snapshot
+
+    Args:
+        window: Window wrapper or specification
+        path: Stored snapshot file
+        depth: Maximum depth below the window (optional)
+        exe: Executable name stored with the snapshot (optional)
+        locators: Locator definitions to check against the new capture (optional)
+        full: Print the whole tree even when a stored snapshot exists
+
+    Returns:
+        dict: The diff against the stored snapshot, or None on the first capture
+    """
+    snapshot = capture(window, depth=depth, exe=exe)
+    previous = load(path)
+    changes = None
+    if previous is None or full:
+        print(format_tree(snapshot))
+    if previous is not None:
+        changes = diff(previous, snapshot)
+        print(f"\nChanges since {path}:")
+        print(format_diff(changes))
+    if locators:
+        print("\nLocators:")
+        print(format_locator_check(check_locators(snapshot, locators)))
+    save(snapshot, path)
+    print(f"\nSnapshot saved to {path}")
+    return changes
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "diff":
+        old, new = load(sys.argv[2]), load(sys.argv[3])
+        if old is None or new is None:
+            sys.exit(f"Could not read {sys.argv[2] if old is None else sys.argv[3]}")
+        changes = diff(old, new)
+        print(format_diff(changes))
+        sys.exit(1 if any(changes.values()) else 0)
+    elif len(sys.argv) == 3 and sys.argv[1] == "check":
+        from pingid_automation import PINGID_LOCATORS
+        snapshot = load(sys.argv[2])
+        if snapshot is None:
+            sys.exit(f"Could not read {sys.argv[2]}")
+        results = check_locators(snapshot, PINGID_LOCATORS)
+        print(format_locator_check(results))
+        sys.exit(0 if all(results.values()) else 1)
+    else:
+        sys.exit(__doc__)
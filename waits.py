@@ -0,0 +1,140 @@
+"""
+Condition-based waits and step timing
+Replaces fixed time.sleep calls with polling a predicate under a deadline,
+and records how long each step of a flow takes against a latency budget
+"""
+
+import time
+from contextlib import contextmanager
+
+from instrumentation import span
+
+
+class WaitTimeoutError(Exception):
+    """Raised when a wait_until predicate does not become true before its deadline"""
+
+
+class SystemClock:
+    """Real monotonic clock"""
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class FakeClock:
+    """Deterministic clock for tests: sleep() advances time instantly"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+def wait_until(predicate, timeout, description="condition", initial_interval=0.05,
+               max_interval=0.5, backoff=1.5, clock=None):
+    """
+    Poll a predicate with exponential backoff until it returns a truthy value
+
+    Exceptions raised by the predicate count as "not yet", so lookups of
+    controls that do not exist yet can be used directly as predicates.
+
+    Args:
+        predicate: Zero-argument callable
+        timeout: Maximum seconds to wait
+        description: Human readable condition name used in the timeout error
+        initial_interval: First poll delay in seconds
+        max_interval: Upper bound for the poll delay in seconds
+        backoff: Factor the poll delay grows by after each miss
+        clock: Clock with monotonic() and sleep() (optional, defaults to real time)
+
+    Returns:
+        The first truthy value returned by the predicate
+
+    Raises:
+        WaitTimeoutError: If the predicate is still falsy when the deadline passes
+    """
+    clock = clock or SYSTEM_CLOCK
+    deadline = clock.monotonic() + timeout
+    interval = initial_interval
+    last_error = None
+
+    while True:
+        try:
+            result = predicate()
+            if result:
+                return result
+        except Exception as e:
+            last_error = e
+
+        remaining = deadline - clock.monotonic()
+        if remaining <= 0:
+            message = f"Timed out after {timeout}s waiting for {description}"
+            if last_error is not None:
+                message += f" (last error: {last_error})"
+            raise WaitTimeoutError(message)
+        clock.sleep(min(interval, remaining))
+        interval = min(interval * backoff, max_interval)
+
+
+class StepTimer:
+    """Records per-step durations of a flow and compares them with a total budget"""
+
+    def __init__(self, budget=None, clock=None, prefix=""):
+        """
+        Initialize the timer
+
+        Args:
+            budget: Total seconds the flow is expected to take (optional)
+            clock: Clock with monotonic() (optional, defaults to real time)
+            prefix: Prepended to step names for the instrumentation spans (e.g. "pingid.")
+        """
+        self.budget = budget
+        self.clock = clock or SYSTEM_CLOCK
+        self.prefix = prefix
+        self.steps = []
+
+    def reset(self):
+        """Forget recorded steps (e.g. before the next request of a long-lived flow)"""
+        self.steps = []
+
+    @contextmanager
+    def step(self, name):
+        """Time the enclosed block as a named step (also recorded as a span)"""
+        start = self.clock.monotonic()
+        try:
+            with span(f"{self.prefix}{name}"):
+                yield
+        finally:
+            self.steps.append((name, self.clock.monotonic() - start))
+
+    @property
+    def total(self):
+        return sum(duration for _, duration in self.steps)
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.total > self.budget
+
+    def report(self):
+        """Return a printable breakdown of where the time was spent"""
+        lines = [f"  {name:<20} {duration:7.3f}s" for name, duration in self.steps]
+        total_line = f"  {'total':<20} {self.total:7.3f}s"
+        if self.budget is not None:
+            total_line += f" (budget {self.budget:.1f}s{', EXCEEDED' if self.over_budget else ''})"
+        lines.append(total_line)
+        return "\n".join(lines)
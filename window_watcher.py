@@ -0,0 +1,129 @@
+"""
+Window Watcher
+Resolves a desktop application's main window as soon as it appears,
+preferring windows owned by the launched process (by PID)
+"""
+
+from desktop_backend import get_backend
+from waits import SYSTEM_CLOCK, WaitTimeoutError, wait_until
+
+
+DEFAULT_TITLE_KEYWORDS = ("PingID", "Ping")
+
+
+class FakeWindow:
+    """Minimal stand-in for a pywinauto window wrapper"""
+
+    def __init__(self, title, process_id=None, handle=None):
+        self.title = title
+        self.pid = process_id
+        self.handle = handle if handle is not None else id(self)
+
+    def window_text(self):
+        return self.title
+
+    def process_id(self):
+        return self.pid
+
+
+class FakeWindowProvider:
+    """In-memory window provider where windows appear after a scheduled delay"""
+
+    def __init__(self, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.started_at = self.clock.monotonic()
+        self.scheduled = []
+        self.calls = 0
+
+    def add_window(self, window, after=0.0):
+        """Make a window visible `after` seconds from provider creation"""
+        self.scheduled.append((after, window))
+
+    def windows(self, process_id=None):
+        self.calls += 1
+        elapsed = self.clock.monotonic() - self.started_at
+        visible = [window for after, window in self.scheduled if elapsed >= after]
+        if process_id is None:
+            return visible
+        return [window for window in visible if window.process_id() == process_id]
+
+
+class WindowWatcher:
+    """Waits for a window to appear with a tight, adaptive polling backoff"""
+
+    def __init__(self, provider=None, initial_interval=0.05, max_interval=0.5, backoff=1.5, clock=None):
+        """
+        Initialize the watcher
+
+        Args:
+            provider: Object with a windows(process_id=None) method (defaults to the desktop backend)
+            initial_interval: First poll delay in seconds
+            max_interval: Upper bound for the poll delay in seconds
+            backoff: Factor the poll delay grows by after each miss
+            clock: Clock used for waiting (optional, defaults to real time)
+        """
+        self.provider = provider or get_backend()
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.clock = clock
+
+    @staticmethod
+    def _matches(window, title_keywords):
+        try:
+            window_text = window.window_text()
+        except Exception:
+            return False
+        return any(keyword in window_text for keyword in title_keywords)
+
+    def find_window(self, process_id=None, title_keywords=DEFAULT_TITLE_KEYWORDS, process_alive=True):
+        """
+        Look for a matching window once
+
+        Windows owned by `process_id` are checked first. If the launched process
+        has already exited (e.g. a launcher that hands off to another process),
+        all top-level windows are searched by title instead.
+
+        Returns:
+            The matching window wrapper, or None
+        """
+        if process_id is not None:
+            owned = self.provider.windows(process_id=process_id)
+            for window in owned:
+                if self._matches(window, title_keywords):
+                    return window
+            if owned:
+                return owned[0]
+            if process_alive:
+                return None
+
+        for window in self.provider.windows():
+            if self._matches(window, title_keywords):
+                return window
+        return None
+
+    def wait_for_window(self, timeout, process=None, title_keywords=DEFAULT_TITLE_KEYWORDS):
+        """
+        Wait until a matching window appears
+
+        Args:
+            timeout: Maximum seconds to wait
+            process: subprocess.Popen of the launched application (optional)
+            title_keywords: Substrings accepted in the window title
+
+        Returns:
+            The matching window wrapper, or None if the timeout expired
+        """
+        process_id = process.pid if process is not None else None
+
+        def _find():
+            process_alive = process is None or process.poll() is None
+            return self.find_window(process_id, title_keywords, process_alive)
+
+        try:
+            return wait_until(_find, timeout, description="application window",
+                              initial_interval=self.initial_interval,
+                              max_interval=self.max_interval, backoff=self.backoff,
+                              clock=self.clock)
+        except WaitTimeoutError:
+            return None